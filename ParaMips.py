@@ -1,126 +1,321 @@
+from codigo_intermediario import BRANCH_OPS, Op, render
+
 registers = [f"$t{i}" for i in range(8)]  # 8 registradores disponíveis
-register_map = {}  # Mapear temporários para registradores
-memory_map = {}  # Mapear variáveis para endereços de memória
-current_memory_address = 0
-mips_code = []
-
-def allocate_register(temp):
-    """Atribui um registrador a um temporário ou variável."""
-    global current_memory_address
-
-    if temp.isdigit():  # Se é uma constante literal
-        return temp
-
-    if temp in register_map:  # Se já está mapeado para um registrador
-        return register_map[temp]
-
-    # Procurar registradores livres
-    for reg in registers:
-        if reg not in register_map.values():
-            register_map[temp] = reg
-            return reg
-
-    # Se todos os registradores estão ocupados, desalocar o primeiro mapeado
-    spilled_var = list(register_map.keys())[0]
-    spilled_reg = register_map[spilled_var]
-    if spilled_var not in memory_map:
-        memory_map[spilled_var] = current_memory_address
-        current_memory_address += 4
-    #mips_code.append(f"sw {spilled_reg}, {memory_map[spilled_var]}($sp)")
-    del register_map[spilled_var]
-
-    # Alocar o registrador desalocado para o novo temporário/variável
-    register_map[temp] = spilled_reg
-    return spilled_reg
+
+# Instrução MIPS de cada operação entre registradores
+_ARITHMETIC = {Op.ADD: "add", Op.SUB: "sub", Op.AND: "and"}
+
+
+def is_constant(operand):
+    """Se o operando do código intermediário é uma constante inteira (12, -4)."""
+    return operand.isdigit() or (operand[:1] == "-" and operand[1:].isdigit())
+
+
+def _power_of_two(operand):
+    """n se o operando é a constante 2^n (1, 2, 4, ..., 2^30); senão None."""
+    if not operand.isdigit():
+        return None
+    value = int(operand)
+    if value == 0 or value & (value - 1) or value >= 1 << 31:
+        return None
+    return value.bit_length() - 1
+
+
+class MipsConverter:
+    """Conversor de código intermediário para MIPS; cada instância guarda o próprio estado."""
+
+    def __init__(self):
+        self.register_map = {}  # Mapear temporários para registradores
+        self.memory_map = {}  # Mapear variáveis para endereços de memória
+        self.current_memory_address = 0
+        self.mips_code = []
+        self.spill_count = 0  # Quantas vezes um registrador precisou ser desalocado
+        self.saved_states = []  # Estado de fora das funções, empilhado no início de cada uma
+        self.param_count = 0  # Argumentos já passados para a próxima chamada
+        converters = {
+            Op.FUNCTION: self.convert_function,
+            Op.END_FUNCTION: self.convert_end_function,
+            Op.DECLARE: self.convert_declare,
+            Op.DECLARE_VECTOR: self.convert_declare,
+            Op.DIRECTIVE: self.convert_directive,
+            Op.LABEL: self.convert_label,
+            Op.GOTO: self.convert_goto,
+            Op.IF_FALSE: self.convert_if_false,
+            Op.COPY: self.convert_copy,
+            Op.LOAD_INDEX: self.convert_load_index,
+            Op.STORE_INDEX: self.convert_store_index,
+            Op.ADDRESS: self.convert_address,
+            Op.ADDRESS_INDEX: self.convert_address_index,
+            Op.LOAD: self.convert_load,
+            Op.STORE: self.convert_store,
+            Op.PARAM: self.convert_param,
+            Op.CALL: self.convert_call,
+            Op.RETURN: self.convert_return,
+        }
+        converters.update(dict.fromkeys(_ARITHMETIC, self.convert_arithmetic))
+        converters.update(dict.fromkeys((Op.EQ, Op.NE, Op.LT, Op.LE, Op.GT, Op.GE), self.convert_comparison))
+        converters.update(dict.fromkeys(BRANCH_OPS.values(), self.convert_branch))
+        converters[Op.MUL] = self.convert_multiply
+        converters[Op.DIV] = converters[Op.MOD] = self.convert_divide
+        # Conversor de cada operação, indexado pelo código
+        self._converters = [converters[op] for op in Op]
+
+    def allocate_register(self, temp):
+        """Atribui um registrador a um temporário ou variável."""
+        register_map = self.register_map
+        memory_map = self.memory_map
+
+        if is_constant(temp):  # Se é uma constante literal
+            return temp
+
+        if temp in register_map:  # Se já está mapeado para um registrador
+            return register_map[temp]
+
+        # Procurar registradores livres
+        for reg in registers:
+            if reg not in register_map.values():
+                register_map[temp] = reg
+                return reg
+
+        # Se todos os registradores estão ocupados, desalocar o primeiro mapeado
+        self.spill_count += 1
+        spilled_var = list(register_map.keys())[0]
+        spilled_reg = register_map[spilled_var]
+        if spilled_var not in memory_map:
+            memory_map[spilled_var] = self.current_memory_address
+            self.current_memory_address += 4
+        #mips_code.append(f"sw {spilled_reg}, {memory_map[spilled_var]}($sp)")
+        del register_map[spilled_var]
+
+        # Alocar o registrador desalocado para o novo temporário/variável
+        register_map[temp] = spilled_reg
+        return spilled_reg
+
+    def reset(self):
+        """Volta ao estado inicial, sem código gerado."""
+        self.mips_code = []
+        self.register_map = {}
+        self.memory_map = {}
+        self.current_memory_address = 0
+        self.spill_count = 0
+        self.saved_states = []
+        self.param_count = 0
+
+    def process_intermediate_to_mips(self, intermediate_code):
+        """Converte o código intermediário (IntermediateCode) para MIPS simplificado."""
+        self.reset()
+        self.convert(intermediate_code)
+        return "\n".join(self.mips_code)
+
+    def convert(self, intermediate_code):
+        """Converte as instruções dadas, continuando do estado atual (registradores e memória).
+
+        Cada instrução vai para o conversor da sua operação, pela tabela indexada
+        pelo código (codigo_intermediario.Op)."""
+        converters = self._converters
+        for op, a, b, c in intermediate_code:
+            converters[op](op, a, b, c)
+
+    def convert_function(self, op, name, params, return_type):
+        # Cada função começa com todos os registradores livres; o estado de
+        # fora dela é restaurado no end_function
+        self.saved_states.append((self.register_map, self.memory_map, self.current_memory_address))
+        self.register_map = {}
+        self.memory_map = {}
+        self.current_memory_address = 0
+        self.mips_code.append(f"{name}:")
+
+    def convert_end_function(self, op, name, b, c):
+        if self.saved_states:
+            self.register_map, self.memory_map, self.current_memory_address = self.saved_states.pop()
+
+    def convert_param(self, op, value, b, c):
+        # Argumento de chamada: os quatro primeiros vão em $a0-$a3
+        if value.startswith('"') or self.param_count >= 4:
+            self.mips_code.append(f"# {render(op, value)}")  # Sem segmento de dados nem pilha de argumentos
+        elif is_constant(value):
+            self.mips_code.append(f"addi $a{self.param_count}, $zero, {value}")
+        else:
+            self.mips_code.append(f"addi $a{self.param_count}, {self.allocate_register(value)}, 0")
+        self.param_count += 1
+
+    def convert_call(self, op, dest, function, count):
+        self.param_count = 0
+        self.mips_code.append(f"jal {function}")
+        self.mips_code.append(f"addi {self.allocate_register(dest)}, $v0, 0")
+
+    def convert_copy(self, op, dest, src, c):
+        reg_dest = self.allocate_register(dest)
+        if is_constant(src):  # Se é um número
+            self.mips_code.append(f"addi {reg_dest}, $zero, {src}")
+        else:  # Se é uma variável ou registrador
+            self.mips_code.append(f"addi {reg_dest}, {self.allocate_register(src)}, 0")
+
+    # Não há memória para vetores nem endereços de variáveis (as variáveis vivem em
+    # registradores): o elemento v[i] e os endereços &x e &v[i] são tratados como
+    # mais um valor com registrador próprio, identificado pelo texto
+    def convert_load_index(self, op, dest, base, index):
+        self.convert_copy(op, dest, f"{base}[{index}]", None)
+
+    def convert_store_index(self, op, base, index, value):
+        self.convert_copy(op, f"{base}[{index}]", value, None)
+
+    def convert_address(self, op, dest, name, c):
+        self.convert_copy(op, dest, f"&{name}", None)
+
+    def convert_address_index(self, op, dest, base, index):
+        self.convert_copy(op, dest, f"&{base}[{index}]", None)
+
+    def convert_arithmetic(self, op, dest, src1, src2):
+        """a = b + c, a = b - c e a = b and c."""
+        mips_code = self.mips_code
+        reg_dest = self.allocate_register(dest)
+        reg_src1 = self.allocate_register(src1)
+        if is_constant(src2):
+            # src2 é uma constante
+            if op == Op.ADD:
+                mips_code.append(f"addi {reg_dest}, {reg_src1}, {src2}")
+            elif op == Op.SUB:
+                mips_code.append(f"addi {reg_dest}, {reg_src1}, {-int(src2)}")
+        else:
+            # src2 é um registrador ou variável
+            mips_code.append(f"{_ARITHMETIC[op]} {reg_dest}, {reg_src1}, {self.allocate_register(src2)}")
+
+    def _operand(self, value, scratch):
+        """Registrador com o valor do operando; constantes vão para o registrador
+        auxiliar scratch ($t8 ou $t9), e o zero usa $zero."""
+        if not is_constant(value):
+            return self.allocate_register(value)
+        if int(value) == 0:
+            return "$zero"
+        self.mips_code.append(f"addi {scratch}, $zero, {value}")
+        return scratch
+
+    def convert_comparison(self, op, dest, src1, src2):
+        """a = b op c com op relacional: dest recebe 1 ou 0."""
+        mips_code = self.mips_code
+        reg_dest = self.allocate_register(dest)
+        left = self._operand(src1, "$t8")
+        right = self._operand(src2, "$t9")
+        if op == Op.LT:
+            mips_code.append(f"slt {reg_dest}, {left}, {right}")
+        elif op == Op.GT:
+            mips_code.append(f"slt {reg_dest}, {right}, {left}")
+        elif op == Op.LE:  # a <= b é !(b < a)
+            mips_code.append(f"slt {reg_dest}, {right}, {left}")
+            mips_code.append(f"xori {reg_dest}, {reg_dest}, 1")
+        elif op == Op.GE:  # a >= b é !(a < b)
+            mips_code.append(f"slt {reg_dest}, {left}, {right}")
+            mips_code.append(f"xori {reg_dest}, {reg_dest}, 1")
+        elif op == Op.EQ:  # a ^ b é zero só se a == b
+            mips_code.append(f"xor {reg_dest}, {left}, {right}")
+            mips_code.append(f"sltiu {reg_dest}, {reg_dest}, 1")
+        else:
+            mips_code.append(f"xor {reg_dest}, {left}, {right}")
+            mips_code.append(f"sltu {reg_dest}, $zero, {reg_dest}")
+
+    def convert_branch(self, op, src1, src2, label):
+        """if a op b goto c: beq/bne direto, ou slt em $t8 seguido de bne/beq."""
+        mips_code = self.mips_code
+        left = self._operand(src1, "$t8")
+        right = self._operand(src2, "$t9")
+        if op == Op.IF_EQ:
+            mips_code.append(f"beq {left}, {right}, {label}")
+        elif op == Op.IF_NE:
+            mips_code.append(f"bne {left}, {right}, {label}")
+        else:
+            # a < b e a >= b comparam (a, b); a > b e a <= b comparam (b, a)
+            if op in (Op.IF_LT, Op.IF_GE):
+                mips_code.append(f"slt $t8, {left}, {right}")
+            else:
+                mips_code.append(f"slt $t8, {right}, {left}")
+            branch = "bne" if op in (Op.IF_LT, Op.IF_GT) else "beq"
+            mips_code.append(f"{branch} $t8, $zero, {label}")
+
+    def convert_multiply(self, op, dest, src1, src2):
+        """a = b * c: mult e mflo, ou sll quando c é uma potência de 2."""
+        mips_code = self.mips_code
+        reg_dest = self.allocate_register(dest)
+        shift = _power_of_two(src2)
+        if shift is not None and not is_constant(src1):
+            reg_src1 = self.allocate_register(src1)
+            if shift:
+                mips_code.append(f"sll {reg_dest}, {reg_src1}, {shift}")
+            else:
+                mips_code.append(f"addi {reg_dest}, {reg_src1}, 0")
+            return
+        left = self._operand(src1, "$t8")
+        right = self._operand(src2, "$t9")
+        mips_code.append(f"mult {left}, {right}")
+        mips_code.append(f"mflo {reg_dest}")
+
+    def convert_divide(self, op, dest, src1, src2):
+        """a = b / c e a = b % c: div com mflo (quociente) ou mfhi (resto).
+
+        Com c potência de 2, a divisão vira sra, e o resto um andi (até 2^16).
+        Como no C, o quociente é truncado em direção a zero: antes do
+        deslocamento, um dividendo negativo recebe o viés 2^n - 1, calculado em
+        $t8 a partir do sinal (sra 31 dá -1 ou 0, e srl 32 - n deixa os n bits)."""
+        mips_code = self.mips_code
+        reg_dest = self.allocate_register(dest)
+        shift = _power_of_two(src2)
+        if shift is not None and not is_constant(src1) and (op == Op.DIV or shift <= 16):
+            reg_src1 = self.allocate_register(src1)
+            if op == Op.MOD and not shift:  # b % 1
+                mips_code.append(f"addi {reg_dest}, $zero, 0")
+            elif not shift:  # b / 1
+                mips_code.append(f"addi {reg_dest}, {reg_src1}, 0")
+            else:
+                mips_code.append(f"sra $t8, {reg_src1}, 31")
+                mips_code.append(f"srl $t8, $t8, {32 - shift}")
+                if op == Op.DIV:
+                    mips_code.append(f"add $t8, {reg_src1}, $t8")
+                    mips_code.append(f"sra {reg_dest}, $t8, {shift}")
+                else:  # Resto: ((b + viés) & (2^n - 1)) - viés
+                    mips_code.append(f"add $t9, {reg_src1}, $t8")
+                    mips_code.append(f"andi $t9, $t9, {(1 << shift) - 1}")
+                    mips_code.append(f"sub {reg_dest}, $t9, $t8")
+            return
+        left = self._operand(src1, "$t8")
+        right = self._operand(src2, "$t9")
+        mips_code.append(f"div {left}, {right}")
+        mips_code.append(f"{'mflo' if op == Op.DIV else 'mfhi'} {reg_dest}")
+
+    def convert_if_false(self, op, condition, label, c):
+        self.mips_code.append(f"beq {self.allocate_register(condition)}, $zero, {label}")
+
+    def convert_goto(self, op, label, b, c):
+        self.mips_code.append(f"j {label}")
+
+    def convert_label(self, op, label, b, c):
+        self.mips_code.append(f"{label}:")
+
+    def convert_return(self, op, value, b, c):
+        if is_constant(value):
+            self.mips_code.append(f"addi $v0, $zero, {value}")
+        else:
+            self.mips_code.append(f"addi $v0, {self.allocate_register(value)}, 0")
+
+    def convert_declare(self, op, var_type, name, size):
+        self.memory_map[name] = self.current_memory_address
+        self.current_memory_address += 4
+
+    def convert_load(self, op, dest, pointer, c):
+        # Leitura de memória: dest = *pointer
+        reg_ptr = self.allocate_register(pointer)
+        reg_dest = self.allocate_register(dest)
+        self.mips_code.append(f"lw {reg_dest}, 0({reg_ptr})")
+
+    def convert_store(self, op, pointer, value, c):
+        # Escrita na memória: *pointer = value
+        reg_src = self.allocate_register(value)
+        reg_ptr = self.allocate_register(pointer)
+        self.mips_code.append(f"sw {reg_src}, 0({reg_ptr})")
+
+    def convert_directive(self, op, text, b, c):
+        self.mips_code.append(f"# {render(op, text)}")
+
 
 def process_intermediate_to_mips(intermediate_code):
     """Converte código intermediário para MIPS simplificado."""
-    global mips_code, register_map, memory_map, current_memory_address
-    mips_code = []
-    register_map = {}
-    memory_map = {}
-    current_memory_address = 0
-
-    for line in intermediate_code:
-        tokens = line.split()
-        if "=" in tokens:
-            # Atribuições
-            dest, _, src1, *rest = tokens
-            reg_dest = allocate_register(dest)
-
-            if len(rest) == 2:  # Operação binária
-                operator, src2 = rest
-                reg_src1 = allocate_register(src1)
-
-                if src2.isdigit():
-                    # src2 é uma constante
-                    if operator == "+":
-                        mips_code.append(f"addi {reg_dest}, {reg_src1}, {src2}")
-                    elif operator == "-":
-                        mips_code.append(f"addi {reg_dest}, {reg_src1}, -{src2}")
-                else:
-                    # src2 é um registrador ou variável
-                    reg_src2 = allocate_register(src2)
-                    if operator == "+":
-                        mips_code.append(f"add {reg_dest}, {reg_src1}, {reg_src2}")
-                    elif operator == "-":
-                        mips_code.append(f"sub {reg_dest}, {reg_src1}, {reg_src2}")
-                    elif operator == "and":
-                        mips_code.append(f"and {reg_dest}, {reg_src1}, {reg_src2}")
-                    elif operator == "or":
-                        mips_code.append(f"or {reg_dest}, {reg_src1}, {reg_src2}")
-
-            elif len(rest) == 0:  # Atribuição simples
-                if src1.isdigit():  # Se é um número
-                    mips_code.append(f"addi {reg_dest}, $zero, {src1}")
-                else:  # Se é uma variável ou registrador
-                    reg_src1 = allocate_register(src1)
-                    mips_code.append(f"addi {reg_dest}, {reg_src1}, 0")
-
-        elif "if_false" in line:
-            # Condições
-            _, temp, _, label = tokens
-            reg = allocate_register(temp)
-            mips_code.append(f"beq {reg}, $zero, {label}")
-
-        elif "goto" in line:
-            # Goto
-            _, label = tokens
-            mips_code.append(f"j {label}")
-
-        elif ":" in line:
-            # Rótulos
-            mips_code.append(line)
-
-        elif "return" in line:
-            # Retorno
-            _, temp = tokens
-            reg = allocate_register(temp)
-            mips_code.append(f"addi $v0, {reg}, 0")
-
-
-        elif "declare" in line:
-            # Declaração
-            _, var_type, var_name = tokens[:3]
-            memory_map[var_name] = current_memory_address
-            current_memory_address += 4
-
-        elif "load" in line:
-            # Leitura de memória: value = *ptr;
-            _, ptr, dest = tokens
-            reg_ptr = allocate_register(ptr)  # Registrador para o ponteiro
-            reg_dest = allocate_register(dest)  # Registrador para o destino
-            mips_code.append(f"lw {reg_dest}, 0({reg_ptr})")
-
-        elif "store" in line:
-            # Escrita na memória: *ptr = value;
-            _, src, ptr = tokens
-            reg_src = allocate_register(src)  # Registrador para o valor
-            reg_ptr = allocate_register(ptr)  # Registrador para o ponteiro
-            mips_code.append(f"sw {reg_src}, 0({reg_ptr})")
-
-        elif "directive" in line:
-            # Diretivas
-            mips_code.append(f"# {line}")
-
-    return "\n".join(mips_code)
+    return MipsConverter().process_intermediate_to_mips(intermediate_code)
@@ -1,4 +1,11 @@
-import ply.lex as lex
+import array
+import mmap
+import os
+import re
+
+import rastreamento
+
+_log = rastreamento.canal("lexico")
 
 # Lista de tokens
 tokens = (
@@ -56,115 +63,294 @@ tokens = (
     'RETURN',
 )
 
-# Regras para tokens
-t_COMMENT = r'//.*|/\*.*?\*/'
-t_COLON = r':'
-t_HASH = r'\#.*'
-t_DOT = r'\.'
-#t_IF = r'if'
-#t_ELSE = r'else'
-#t_SWITCH = r'switch'
-#t_WHILE = r'while'
-#t_FOR = r'for'
-#t_DO_WHILE = r'do_while'
-t_ASSIGN = r'='
-t_PLUS = r'\+'
-t_MINUS = r'-'
-t_TIMES = r'\*'
-t_DIVIDE = r'/'
-t_MOD = r'%'
-t_POW = r'\^'
-t_LT = r'<'
-t_GT = r'>'
-t_LE = r'<='
-t_GE = r'>='
-t_EQ = r'=='
-t_NE = r'!='
-t_TYPEDEF = r'typedef'
-t_LPAREN = r'\('
-t_RPAREN = r'\)'
-t_LBRACE = r'\{'
-t_RBRACE = r'\}'
-t_LBRACK = r'\['
-t_RBRACK = r'\]'
-t_COMMA = r','
-t_SEMICOLON = r';'
-t_STRING = r'"([^"\\]*(\\.[^"\\]*)*)"'
-t_NUMBER = r'\d+'
-t_AMPERSAND = r'&'
-t_AND = r'&&'
-t_PIPE = r'\|'
-t_OR = r'\|\|'
-t_CHARACTER = r"'([^'\\]*(\\.[^'\\]*)*)'"
-t_INT = r'int'
-t_FLOAT = r'float'
-t_VOID = r'void'
-t_CHAR = r'char'
-t_DOUBLE = r'double'
-t_POINTER = r'\*'
-t_TYPE = r'int|float|void|char|double'
-t_PLUS_PLUS = r'\+\+'
-t_MINUS_MINUS = r'--'
-t_PLUS_EQUAL = r'\+='
-t_MINUS_EQUAL = r'-='
-#t_RETURN = r'return'
-# Contador de linha
-def t_newline(t):
-    r'\n+'
-    t.lexer.lineno += len(t.value)
-
-
-# Ignorar espaços em branco e tabulações
-t_ignore = r' \t'
-
-
-# Regra para identificadores
-t_ID = r'[a-zA-Z_][a-zA-Z0-9_]*'
-
-def t_RETURN(t):
-    r'return'
-    return t
-
-def t_IF(t):
-    r'if'
-    return t
-
-def t_ELSE(t):
-    r'else'
-    return t
-
-def t_SWITCH(t):
-    r'switch'
-    return t
-
-def t_FOR(t):
-    r'for'
-    return t
-
-def t_WHILE(t):
-    r'while'
-    return t
-
-def t_DO(t):
-    r'do'
-    return t
-
-
-# Erros de caracteres ilegais
-def t_error(t):
-    print(f"Caractere ilegal '{t.value[0]}' na linha {t.lexer.lineno}")
-    t.lexer.skip(1)
+# Palavras reservadas e nomes de tipo. Um identificador é reconhecido de uma vez
+# só e depois classificado por esta tabela (assim "iffy" e "done" seguem como ID).
+keywords = {
+    'if': 'IF',
+    'else': 'ELSE',
+    'switch': 'SWITCH',
+    'while': 'WHILE',
+    'for': 'FOR',
+    'do': 'DO',
+    'return': 'RETURN',
+    'typedef': 'TYPEDEF',
+    'int': 'TYPE',
+    'float': 'TYPE',
+    'void': 'TYPE',
+    'char': 'TYPE',
+    'double': 'TYPE',
+}
+
+# Operadores e pontuação. A expressão regular é montada do maior para o menor,
+# então sempre vence o casamento mais longo ("<=" antes de "<", "++" antes de "+=").
+operators = {
+    '=': 'ASSIGN',
+    '+': 'PLUS',
+    '-': 'MINUS',
+    '*': 'TIMES',
+    '/': 'DIVIDE',
+    '%': 'MOD',
+    '^': 'POW',
+    '<': 'LT',
+    '>': 'GT',
+    '<=': 'LE',
+    '>=': 'GE',
+    '==': 'EQ',
+    '!=': 'NE',
+    '(': 'LPAREN',
+    ')': 'RPAREN',
+    '{': 'LBRACE',
+    '}': 'RBRACE',
+    '[': 'LBRACK',
+    ']': 'RBRACK',
+    ',': 'COMMA',
+    ';': 'SEMICOLON',
+    '&': 'AMPERSAND',
+    '&&': 'AND',
+    '|': 'PIPE',
+    '||': 'OR',
+    ':': 'COLON',
+    '.': 'DOT',
+    '++': 'PLUS_PLUS',
+    '--': 'MINUS_MINUS',
+    '+=': 'PLUS_EQUAL',
+    '-=': 'MINUS_EQUAL',
+}
+
+# Código numérico de cada tipo de token (posição na tupla tokens)
+TOKEN_IDS = {nome: codigo for codigo, nome in enumerate(tokens)}
+
+# Expressão regular mestre: uma alternativa por classe de lexema. A ordem dos
+# grupos define a prioridade; o último grupo captura um caractere ilegal.
+(_G_IGNORE, _G_NEWLINE, _G_COMMENT, _G_HASH, _G_STRING, _G_CHARACTER, _G_NUMBER, _G_ID,
+ _G_OPERATOR, _G_ERROR) = range(1, 11)
+_PATTERNS = [
+    r'([ \t\r]+)',
+    r'(\n+)',
+    r'(//.*|/\*.*?\*/)',
+    r'(\#.*)',
+    r'("[^"\\]*(?:\\.[^"\\]*)*")',
+    r"('[^'\\]*(?:\\.[^'\\]*)*')",
+    r'(\d+)',
+    r'([a-zA-Z_][a-zA-Z0-9_]*)',
+    "(" + "|".join(re.escape(op) for op in sorted(operators, key=len, reverse=True)) + ")",
+]
+_MASTER = re.compile("|".join(_PATTERNS + [r'(.)']))
+# Mesma expressão sobre bytes, para arquivos mapeados em memória; um caractere
+# ilegal fora do ASCII é consumido inteiro (sequência UTF-8 completa).
+_MASTER_BYTES = re.compile("|".join(_PATTERNS + [r'([\xc0-\xf7][\x80-\xbf]*|.)']).encode("latin-1"))
+
+# Tipo fixo de cada grupo da expressão mestre (ID e operadores usam as tabelas)
+_GROUP_TYPES = {
+    _G_COMMENT: TOKEN_IDS['COMMENT'],
+    _G_HASH: TOKEN_IDS['HASH'],
+    _G_STRING: TOKEN_IDS['STRING'],
+    _G_CHARACTER: TOKEN_IDS['CHARACTER'],
+    _G_NUMBER: TOKEN_IDS['NUMBER'],
+}
+_KEYWORD_IDS = {texto: TOKEN_IDS[nome] for texto, nome in keywords.items()}
+_OPERATOR_IDS = {texto: TOKEN_IDS[nome] for texto, nome in operators.items()}
+_ID_TYPE = TOKEN_IDS['ID']
+
+# Tabelas usadas por _scan para texto (str) e para arquivos mapeados (bytes)
+_TEXT_TABLES = (_MASTER, _KEYWORD_IDS, _OPERATOR_IDS)
+_BYTES_TABLES = (
+    _MASTER_BYTES,
+    {texto.encode(): codigo for texto, codigo in _KEYWORD_IDS.items()},
+    {texto.encode(): codigo for texto, codigo in _OPERATOR_IDS.items()},
+)
+
+
+class Token:
+    """Token entregue ao parser, montado sob demanda a partir de um TokenBuffer ou
+    de um TokenStream.
+
+    lexpos é o início do token: em caracteres do texto no TokenBuffer e em bytes do
+    arquivo no TokenStream, que não decodifica o arquivo inteiro (as duas posições
+    só coincidem em arquivos ASCII). lexer só é preenchido pelo PLY, no token do
+    erro de sintaxe (errtoken.lexer)."""
+    __slots__ = ("type", "value", "lineno", "lexpos", "lexer")
+
+    def __init__(self, type, value, lineno, lexpos):
+        self.type = type
+        self.value = value
+        self.lineno = lineno
+        self.lexpos = lexpos
+        self.lexer = None
+
+    def __repr__(self):
+        return f"Token({self.type},{self.value!r},{self.lineno},{self.lexpos})"
+
+
+class TokenBuffer:
+    """Tokens de um código-fonte guardados em vetores paralelos.
+
+    Cada posição i guarda o código do tipo, o intervalo [inicio, fim) do valor
+    dentro do texto e a linha; o valor só é recortado do texto quando pedido."""
+
+    def __init__(self, data):
+        self.data = data
+        self.types = array.array('B')
+        self.starts = array.array('q')
+        self.ends = array.array('q')
+        self.lines = array.array('q')
+
+    def __len__(self):
+        return len(self.types)
+
+    def append(self, type_id, start, end, lineno):
+        self.types.append(type_id)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lines.append(lineno)
+
+    def type(self, i):
+        return tokens[self.types[i]]
+
+    def value(self, i):
+        return self.data[self.starts[i]:self.ends[i]]
+
+    def dump(self):
+        """Imprime os tokens no mesmo formato usado pelo analisador léxico."""
+        data, types, starts, ends, lines = self.data, self.types, self.starts, self.ends, self.lines
+        for i in range(len(types)):
+            print(
+                f"Token: {tokens[types[i]]}, Valor: {data[starts[i]:ends[i]]}, Linha: {lines[i]}")
+
+    def token_function(self):
+        """Retorna a função de tokens consumida pelo parser (parser.parse(tokenfunc=...))."""
+        data, types, starts, ends, lines = self.data, self.types, self.starts, self.ends, self.lines
+        posicoes = iter(range(len(types)))
+
+        def token():
+            for i in posicoes:
+                return Token(tokens[types[i]], data[starts[i]:ends[i]], lines[i], starts[i])
+            return None
+
+        return token
+
+
+def _scan(data, tables):
+    """Percorre o texto (str ou bytes) e gera (tipo, início, fim, linha) de cada token."""
+    master, keyword_ids, operator_ids = tables
+    group_types = _GROUP_TYPES
+    lineno = 1
+    for m in master.finditer(data):
+        grupo = m.lastindex
+        if grupo == _G_IGNORE:
+            continue
+        if grupo == _G_ID:
+            type_id = keyword_ids.get(m.group(grupo), _ID_TYPE)
+        elif grupo == _G_OPERATOR:
+            type_id = operator_ids[m.group(grupo)]
+        elif grupo == _G_NEWLINE:
+            # Contador de linha
+            lineno += m.end() - m.start()
+            continue
+        elif grupo == _G_ERROR:
+            # Erros de caracteres ilegais
+            caractere = m.group(grupo)
+            if isinstance(caractere, bytes):
+                caractere = caractere.decode("utf-8", "replace")
+            _log.erro("Caractere ilegal '%s' na linha %s", caractere, lineno)
+            continue
+        else:
+            type_id = group_types[grupo]
+        start, end = m.span()
+        yield type_id, start, end, lineno
+
+
+def tokenize(data):
+    """Executa o analisador léxico uma única vez e devolve um TokenBuffer."""
+    buffer = TokenBuffer(data)
+    types, starts, ends, lines = buffer.types, buffer.starts, buffer.ends, buffer.lines
+    for type_id, start, end, lineno in _scan(data, _TEXT_TABLES):
+        types.append(type_id)
+        starts.append(start)
+        ends.append(end)
+        lines.append(lineno)
+    return buffer
+
+
+class TokenStream:
+    """Tokens de um arquivo lidos sob demanda a partir de um mapeamento em memória.
+
+    Nem o texto nem a lista de tokens são carregados inteiros: o arquivo é
+    mapeado (mmap) e a expressão mestre percorre os bytes diretamente, gerando um
+    token por vez. Como o mapeamento é contínuo, não há fronteiras de bloco e a
+    contagem de linhas é a mesma do texto completo. O lexpos dos tokens é a posição
+    em bytes no arquivo (Token). Cada percurso (tokens, dump, token_function, len)
+    faz a análise léxica de novo."""
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+
+    def tokens(self):
+        """Gera os objetos Token do arquivo, na ordem."""
+        with open(self.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for type_id, start, end, lineno in _scan(data, _BYTES_TABLES):
+                    yield Token(tokens[type_id], data[start:end].decode("utf-8"), lineno, start)
+
+    def __len__(self):
+        """Número de tokens do arquivo (percorre o arquivo sem montar os tokens)."""
+        with open(self.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return 0
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return sum(1 for _ in _scan(data, _BYTES_TABLES))
+
+    def dump(self):
+        """Imprime os tokens no mesmo formato usado pelo analisador léxico."""
+        for tok in self.tokens():
+            print(f"Token: {tok.type}, Valor: {tok.value}, Linha: {tok.lineno}")
+
+    def token_function(self):
+        """Retorna a função de tokens consumida pelo parser (parser.parse(tokenfunc=...))."""
+        proximo = self.tokens().__next__
+
+        def token():
+            try:
+                return proximo()
+            except StopIteration:
+                return None
+
+        return token
+
+
+class Lexer:
+    """Interface no estilo do PLY (input/token) sobre o TokenBuffer."""
+
+    def __init__(self):
+        self.lineno = 1
+        self._token = lambda: None
+
+    def input(self, data):
+        self.lineno = 1
+        self._token = tokenize(data).token_function()
+
+    def token(self):
+        tok = self._token()
+        if tok:
+            self.lineno = tok.lineno
+        return tok
+
 
 # Criar o analisador léxico
-lexer = lex.lex()
+lexer = Lexer()
+
 
 # Função para processar o código de entrada
 def process_code(data, k):
-    lexer.input(data)
+    """Gera os tokens do código e, se k != 0, imprime os tokens.
+
+    data pode ser o texto do programa (devolve um TokenBuffer) ou o caminho de um
+    arquivo como os.PathLike (devolve um TokenStream, lido sob demanda). Um arquivo
+    nunca é lido inteiro: a listagem percorre o TokenStream, e o parser o percorre
+    de novo (a análise léxica é feita duas vezes)."""
+    fonte = TokenStream(data) if isinstance(data, os.PathLike) else tokenize(data)
     if k != 0:
-        while True:
-            tok = lexer.token()
-            if not tok:
-                break
-            print(
-                f"Token: {tok.type}, Valor: {tok.value}, Linha: {tok.lineno}")
+        fonte.dump()
+    return fonte
@@ -1,17 +1,167 @@
+import arvore_sintatica as ast_nodes
+import rastreamento
 from symbol_table import SymbolTable
 
+_log = rastreamento.canal("semantico")
+
 def show_symbol_table(symbol_table):
-    """Exibe os símbolos em todos os escopos da tabela de símbolos."""
+    """Exibe os símbolos de todos os escopos da tabela, inclusive os já encerrados."""
     print("\n--- Tabela de Símbolos ---")
-    for i, scope in enumerate(reversed(symbol_table.current_scope)):
-        print(f"Escopo {len(symbol_table.current_scope) - i - 1}:")
-        if scope:
-            for name, attributes in scope.items():
+    for scope in symbol_table.scopes:  # Em ordem de criação: cada escopo antes dos filhos
+        parent = f" (dentro do escopo {scope.parent.id})" if scope.parent is not None else ""
+        print(f"Escopo {scope.id}{parent}:")
+        if scope.symbols:
+            for name, attributes in scope.symbols.items():
                 print(f"  Name: {name}, Attributes: {attributes}")
         else:
             print("  [Vazio]")
     print("--------------------------")
 
+class Type:
+    """Tipo de um valor na análise semântica.
+
+    Cada tipo existe uma única vez: as funções primitive_type, pointer_type,
+    vector_type e function_type devolvem sempre a mesma instância para os mesmos
+    argumentos, então tipos iguais são o mesmo objeto e são comparados com is. O
+    texto (str) é o usado nas mensagens e relatórios: int, pointer(int),
+    vector(int), function (int)."""
+    __slots__ = ("text",)
+    numeric = False
+    element = None  # Tipo do elemento, em ponteiros e vetores
+    return_type = None  # Tipo de retorno, em funções
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return repr(self.text)  # Como o texto, para que as tabelas impressas não mudem
+
+
+class PrimitiveType(Type):
+    __slots__ = ("name", "numeric")
+
+    def __init__(self, name):
+        self.name = name
+        self.numeric = name in ("int", "float", "char", "double")
+        self.text = name
+
+    def __reduce__(self):
+        return primitive_type, (self.name,)
+
+
+class PointerType(Type):
+    __slots__ = ("element",)
+
+    def __init__(self, element):
+        self.element = element
+        self.text = f"pointer({element})"
+
+    def __reduce__(self):
+        return pointer_type, (self.element,)
+
+
+class VectorType(Type):
+    __slots__ = ("element",)
+
+    def __init__(self, element):
+        self.element = element
+        self.text = f"vector({element})"
+
+    def __reduce__(self):
+        return vector_type, (self.element,)
+
+
+class FunctionType(Type):
+    __slots__ = ("return_type",)
+
+    def __init__(self, return_type):
+        self.return_type = return_type
+        self.text = f"function ({return_type})"
+
+    def __reduce__(self):
+        return function_type, (self.return_type,)
+
+
+# Instância única de cada tipo, pelo argumento do construtor
+_PRIMITIVES = {}
+_POINTERS = {}
+_VECTORS = {}
+_FUNCTIONS = {}
+
+
+def primitive_type(name):
+    """Tipo básico pelo nome do código (int, float, char, double, void, ...)."""
+    result = _PRIMITIVES.get(name)
+    if result is None:
+        result = _PRIMITIVES[name] = PrimitiveType(name)
+    return result
+
+
+def pointer_type(element):
+    result = _POINTERS.get(element)
+    if result is None:
+        result = _POINTERS[element] = PointerType(element)
+    return result
+
+
+def vector_type(element):
+    result = _VECTORS.get(element)
+    if result is None:
+        result = _VECTORS[element] = VectorType(element)
+    return result
+
+
+def function_type(return_type):
+    result = _FUNCTIONS.get(return_type)
+    if result is None:
+        result = _FUNCTIONS[return_type] = FunctionType(return_type)
+    return result
+
+
+INT_TYPE = primitive_type("int")
+FLOAT_TYPE = primitive_type("float")
+CHAR_TYPE = primitive_type("char")
+DOUBLE_TYPE = primitive_type("double")
+NUMERIC_TYPES = frozenset((INT_TYPE, FLOAT_TYPE, CHAR_TYPE, DOUBLE_TYPE))
+COMPARISON_TYPE = primitive_type("bool")
+
+# Tipo de cada literal (arvore_sintatica.Literal.literal_kind, definido na análise sintática)
+LITERAL_TYPES = {ast_nodes.INT: INT_TYPE, ast_nodes.FLOAT: FLOAT_TYPE, ast_nodes.STRING: pointer_type(CHAR_TYPE)}
+
+# Tipo do resultado de uma operação aritmética entre dois tipos numéricos
+_ARITHMETIC_RESULTS = {
+    (left, right): DOUBLE_TYPE if DOUBLE_TYPE in (left, right) else
+    FLOAT_TYPE if FLOAT_TYPE in (left, right) else INT_TYPE
+    for left in NUMERIC_TYPES for right in NUMERIC_TYPES}
+
+
+def element_type(value_type):
+    """Tipo do elemento de pointer(T) ou vector(T); None para os demais tipos."""
+    return value_type.element if value_type is not None else None
+
+
+def declared_type(type_name, pointer=False):
+    """Tipo de uma declaração: o tipo do código, ou ponteiro para ele."""
+    result = primitive_type(type_name)
+    return pointer_type(result) if pointer else result
+
+
+def describe(node):
+    """Texto curto de um nó para as mensagens de erro: a, v[], *p."""
+    if node.kind == ast_nodes.NAME:
+        return node.name
+    if node.kind == ast_nodes.INDEX:
+        return f"{describe(node.base)}[]"
+    if node.kind == ast_nodes.DEREF:
+        return f"*{describe(node.operand)}"
+    return ast_nodes.KIND_NAMES.get(node.kind, "?")
+
+
+def function_return_type(value_type):
+    """Tipo de retorno de um tipo de função."""
+    return value_type.return_type
+
+
 class SemanticAnalyzer:
     def __init__(self):
         self.symbol_table = SymbolTable()
@@ -19,99 +169,139 @@ class SemanticAnalyzer:
             "symbols": [],
             "errors": []
         }
+        self.shadowed = {}  # Quantas declarações de cada nome esconderam outra
+        # Visitador de cada tipo de nó, indexado pelo código do nó (arvore_sintatica)
+        visitors = {
+            ast_nodes.DECLARATION: self.visit_declaration,
+            ast_nodes.VECTOR_DECLARATION: self.visit_vector_declaration,
+            ast_nodes.FUNCTION_DECLARATION: self.visit_function_declaration,
+            ast_nodes.BLOCK: self.visit_block,
+            ast_nodes.EXPR_STMT: self.visit_expr_stmt,
+            ast_nodes.IF: self.visit_if,
+            ast_nodes.WHILE: self.visit_while,
+            ast_nodes.DO_WHILE: self.visit_do_while,
+            ast_nodes.FOR: self.visit_for,
+            ast_nodes.RETURN: self.visit_return,
+            ast_nodes.COMMENT: self.visit_comment,
+            ast_nodes.DIRECTIVE: self.visit_preprocessor_directive,
+            ast_nodes.NAME: self.visit_name,
+            ast_nodes.LITERAL: self.visit_literal,
+            ast_nodes.BINARY_OP: self.visit_binary_operator,
+            ast_nodes.COMPARISON: self.visit_comparison_operator,
+            ast_nodes.LOGICAL_AND: self.visit_logical_and,
+            ast_nodes.ASSIGN: self.visit_assign,
+            ast_nodes.UNARY_OP: self.visit_unary_operator,
+            ast_nodes.DEREF: self.visit_deref,
+            ast_nodes.ADDRESS_OF: self.visit_address_of,
+            ast_nodes.INDEX: self.visit_index,
+            ast_nodes.FUNCTION_CALL: self.visit_function_call,
+            ast_nodes.COMMA: self.visit_comma,
+        }
+        self._visitors = [visitors.get(kind, self.generic_visit) for kind in range(max(visitors) + 1)]
 
     def analyze(self, ast):
         """Percorre a AST e aplica regras semânticas."""
         for node in ast:
             try:
                 self.visit(node)
+            except RecursionError:
+                raise  # Limite do Python, não um erro do programa analisado
             except RuntimeError as e:
                 self.report["errors"].append(str(e))
 
     def visit(self, node):
-        """Método genérico para visitar nós da AST."""
-        print(f"Visiting node: {node}")  # Log de debug
+        """Visita um nó da AST; nas expressões, devolve o tipo do valor (ou None).
 
-        # Se o nó for um operador de comparação
-        if node[0] in ('<', '>', '==', '!=', '<=', '>='):
-            return self.visit_comparison_operator(node)
-
-        # Se o nó é uma string, pode ser um identificador (nome de variável)
-        if isinstance(node, str):  # Se o nó for uma string (nome de variável)
-            return self.symbol_table.get_symbol(node)["value"]
-
-        method_name = f"visit_{node[0]}"  # Ex: visit_declaration, visit_if, etc.
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
+        Os visitadores que têm filhos são geradores: entregam com yield cada filho
+        a visitar e recebem o tipo dele. arvore_sintatica.drive os executa com uma
+        pilha explícita, então a profundidade da AST não esbarra no limite de
+        recursão do Python."""
+        return ast_nodes.drive(node, self._visitors, self._trace if _log.debug else None)
 
+    def _trace(self, node):
+        _log.write("Visiting node: %s", node)  # Log de debug
 
     def generic_visit(self, node):
-        print(f"Warning: Nenhum visitador definido para o nó: {node[0]}")
+        if _log.info:
+            _log.write("Warning: Nenhum visitador definido para o nó: %s", ast_nodes.KIND_NAMES.get(node.kind))
         return None
 
+    def visit_statements(self, statements):
+        """Visita os comandos de um bloco em um escopo próprio."""
+        self.symbol_table.enter_scope()
+        try:
+            yield statements
+        finally:
+            self.symbol_table.exit_scope()
+
+    def declare(self, node, var_type, value=None):
+        """Declara o símbolo de uma declaração ou parâmetro e o anota no nó."""
+        name = node.name
+        attributes = {"type": var_type, "value": value}
+        count = None
+        if self.symbol_table.lookup(name) is not None:
+            # A declaração esconde outra do mesmo nome: o código intermediário usa um
+            # nome próprio para ela (x.1, x.2, ...), que não colide com nenhum do C
+            count = self.shadowed.get(name, 0) + 1
+            attributes["ir_name"] = f"{name}.{count}"
+        self.symbol_table.add_symbol(name, attributes)
+        if count is not None:  # Só uma declaração aceita gasta o número
+            self.shadowed[name] = count
+        node.symbol = attributes
+        self.report["symbols"].append({"name": name, "type": var_type, "value": value})
+        return {"name": name, "type": var_type, "value": value}
+
     def visit_preprocessor_directive(self, node):
         """Visita uma diretiva de pré-processador e a ignora."""
-        print(f"Ignorando diretiva de pré-processador: {node[1]}")
+        if _log.debug:
+            _log.write("Ignorando diretiva de pré-processador: %s", node.text)
 
     def visit_declaration(self, node):
-        """Visita uma declaração de variável, incluindo vetores e ponteiros."""
-        _, var_type, var_name = node[:3]
+        """Visita uma declaração de variável ou ponteiro."""
+        var_type = declared_type(node.type, node.pointer)
         value = None
 
-        # Verifica se o tipo é um vetor (ou qualquer outra estrutura especial)
-        if isinstance(var_name, tuple) and var_name[0] == 'vector':
-            vector_name = var_name[1]
-            # Aqui você pode adicionar a lógica específica para vetores
-            self.symbol_table.add_symbol(vector_name, {"type": f"vector({var_type})", "value": None})
-            self.report["symbols"].append({"name": vector_name, "type": f"vector({var_type})", "value": None})
-            return {"name": vector_name, "type": f"vector({var_type})", "value": None}
-
-        # Caso normal: variável simples
-        if len(node) == 4:  # Se houver valor de inicialização
-            try:
-                value = self.visit(node[3])
-            except:
-                value = node[3]
+        if node.init is not None:  # Se houver valor de inicialização
             # Verifica a compatibilidade de tipo
-            if not self.check_type_compatibility(var_type, value):
-                raise RuntimeError(f"Incompatibilidade de tipos ao inicializar '{var_name}'.")
+            if not self.check_type_compatibility(var_type, (yield node.init)):
+                raise RuntimeError(f"Incompatibilidade de tipos ao inicializar '{node.name}'.")
+            if node.init.kind == ast_nodes.LITERAL:
+                value = node.init.value
 
         # Adiciona o símbolo à tabela de símbolos
-        self.symbol_table.add_symbol(var_name, {"type": var_type, "value": value})
-        self.report["symbols"].append({"name": var_name, "type": var_type, "value": value})
-        return {"name": var_name, "type": var_type, "value": value}
-
+        return self.declare(node, var_type, value)
+
+    def visit_vector_declaration(self, node):
+        """Visita a declaração de um vetor, com tamanho ou lista de valores."""
+        element = declared_type(node.type, node.pointer)
+        if node.size is not None and (yield node.size) not in NUMERIC_TYPES:
+            raise RuntimeError(f"Erro de tipo: o tamanho do vetor '{node.name}' deve ser numérico.")
+        for value in node.values or ():
+            if not self.check_type_compatibility(element, (yield value)):
+                raise RuntimeError(f"Incompatibilidade de tipos ao inicializar '{node.name}'.")
+        return self.declare(node, vector_type(element))
 
     def visit_literal(self, node):
         """Visita um valor literal e retorna seu tipo."""
-        value = node  # Agora trata diretamente o valor (node é o valor literal)
-        if isinstance(value, str) and value.isdigit():
-            return int(value)  # Converte strings numéricas para inteiros
-        return value  # Retorna o valor se não for um número
+        return LITERAL_TYPES[node.literal_kind]
 
+    def visit_name(self, node):
+        """Visita o uso de uma variável, anota nele o símbolo resolvido e retorna seu tipo."""
+        symbol = node.symbol = self.symbol_table.get_symbol(node.name)
+        return symbol["type"]
 
     def check_type_compatibility(self, type1, type2):
-        """Verifica a compatibilidade de tipos."""
+        """Verifica se um valor do tipo type2 pode ser atribuído a type1."""
         if type1 is None or type2 is None:
             raise RuntimeError("Erro de compatibilidade: um dos tipos é None.")
 
-        # Tenta converter o tipo2 (valor) se for uma string representando um número
-        if isinstance(type2, str):
-            # Se for uma string representando um número inteiro
-            if type2.isdigit():
-                type2 = int(type2)
-            # Se for uma string representando um número de ponto flutuante
-            elif type2.replace('.', '', 1).isdigit() and type2.count('.') < 2:
-                type2 = float(type2)
-
-        # Verifica a compatibilidade de tipos
-        if isinstance(type2, int) and type1 == "int":
+        if type1 is type2:
             return True
-        elif isinstance(type2, float) and type1 == "float":
+        # Conversões entre os tipos numéricos são implícitas
+        if type1.numeric and type2.numeric:
             return True
-        elif isinstance(type2, str) and type1 == "str":
-            return True
-        return False
+        # Um vetor é passado (e atribuído) como ponteiro para o primeiro elemento
+        return type(type1) is PointerType and type1.element is type2.element
 
 
     def generate_report(self):
@@ -130,225 +320,192 @@ class SemanticAnalyzer:
 
     def visit_function_declaration(self, node):
         """Visita uma declaração de função."""
-        _, return_type, name, *params_and_block = node  # Ajusta para lidar com mais elementos
-        params = []
-        block = None
-
-        # Separa os parâmetros e o bloco de código
-        for item in params_and_block:
-            if item[0] == 'parameter':
-                params.append(item)
-            elif item[0] == 'block':
-                block = item
-
-        print(f"Visiting function declaration: {name} with return type {return_type}")
-        print(f"Parameters: {params}")
+        return_type = declared_type(node.return_type, node.pointer)
+        if _log.debug:
+            _log.write("Visiting function declaration: %s with return type %s", node.name, return_type)
+            _log.write("Parameters: %s", node.params)
 
         # Adiciona a função à tabela de símbolos no escopo global
-        self.symbol_table.add_symbol(name, {"type": f"function ({return_type})", "params": params})
+        self.symbol_table.add_symbol(node.name, {"type": function_type(return_type), "params": node.params})
 
-        # Entra no escopo da função
+        # Os parâmetros ficam no escopo da função, junto com as variáveis do corpo.
+        # A numeração dos nomes escondidos recomeça em cada função, para que o código
+        # de uma função não dependa das anteriores (cache_incremental)
         self.symbol_table.enter_scope()
+        outer_shadowed, self.shadowed = self.shadowed, {}
+        try:
+            for param in node.params:
+                if param.kind != ast_nodes.PARAMETER:
+                    raise RuntimeError(f"Erro: parâmetro mal formado na função '{node.name}'.")
+                param_type = declared_type(param.type, param.pointer)
+                if param.vector:
+                    param_type = vector_type(param_type)
+                self.declare(param, param_type)
+            yield node.body.statements
+        finally:
+            self.shadowed = outer_shadowed
+            self.symbol_table.exit_scope()
 
-        # Processa cada instrução no bloco da função
-        if block:
-            for stmt in block[1]:  # Considera que o bloco contém uma lista de declarações ou instruções
-                self.visit(stmt)
-
-        # Sai do escopo da função
-        self.symbol_table.exit_scope()
-
+    def visit_block(self, node):
+        return self.visit_statements(node.statements)
 
     def visit_expr_stmt(self, node):
-        """Visita uma instrução de expressão (por exemplo, atribuição ou operação)."""
-        op = node[0]  # Operador (por exemplo, '=' para atribuição)
-
-        if op != '=':
-            raise RuntimeError(f"Operação desconhecida: {op}")
-
-        if len(node) < 3:
-            raise RuntimeError(f"Erro: nó de expressão de atribuição mal formado: {node}")
-
-        left = node[1]  # Lado esquerdo da atribuição
-        right = node[2]  # Lado direito da atribuição
-
-        # Verifique se a variável à esquerda existe na tabela de símbolos
-        if left not in self.symbol_table.get_symbol(left):
-            raise RuntimeError(f"Erro: '{left}' não declarado.")
-
-        # Verifique se o lado direito é uma desreferenciação (por exemplo, ('a', '*'))
-        if isinstance(right, tuple) and right[1] == "*":
-            # Aqui, o lado direito é uma desreferenciação, então verifique se 'a' é um ponteiro
-            pointer_var = right[0]
-            pointer_type = self.symbol_table.get_symbol(pointer_var)["type"]
-            if not pointer_type.startswith("pointer"):
-                raise RuntimeError(f"Erro: '{pointer_var}' não é um ponteiro e não pode ser desreferenciado.")
-
-            # O tipo à esquerda deve ser compatível com o tipo apontado
-            pointer_base_type = pointer_type[len("pointer("):-1]  # Tipo apontado
-            left_type = self.symbol_table.get_symbol(left)["type"]
-            if left_type != pointer_base_type:
-                raise RuntimeError(f"Incompatibilidade de tipos: '{left}' não pode receber um valor do tipo {left_type}.")
-
-        else:
-            # Caso normal (sem desreferenciação)
-            right_value = self.visit(right)  # Avalia a expressão do lado direito
-            left_type = self.symbol_table.get_symbol(left)["type"]  # Tipo da variável à esquerda
-
-            if not self.check_type_compatibility(left_type, right_value):
-                raise RuntimeError(f"Incompatibilidade de tipos: '{left}' não pode receber um valor do tipo {type(right_value)}.")
-
-        # Se a variável à esquerda não foi declarada, adicione à tabela de símbolos
-        self.symbol_table.add_symbol(left, {"type": left_type, "value": right_value})
-
+        """Visita uma instrução de expressão (por exemplo, atribuição ou chamada)."""
+        return (yield node.expr)
+
+    def visit_assign(self, node):
+        """Visita uma atribuição e retorna o tipo da variável atribuída."""
+        target = node.target
+        if target.kind not in (ast_nodes.NAME, ast_nodes.INDEX, ast_nodes.DEREF):
+            raise RuntimeError(f"Erro: o lado esquerdo da atribuição não é uma variável: {describe(target)}")
+        left_type = yield target
+        right_type = yield node.value
+        if not self.check_type_compatibility(left_type, right_type):
+            raise RuntimeError(f"Incompatibilidade de tipos: '{describe(target)}' não pode receber um valor do tipo {right_type}.")
+        return left_type
+
+    def visit_unary_operator(self, node):
+        """Visita ++, --, += e -=; o operando deve ser numérico ou ponteiro."""
+        operand_type = yield node.operand
+        if operand_type not in NUMERIC_TYPES and type(operand_type) is not PointerType:
+            raise RuntimeError(f"Erro de tipo: operador '{node.op}' inválido para {operand_type}.")
+        return operand_type
+
+    def visit_binary_operator(self, node):
+        """Visita uma operação aritmética e retorna o tipo do resultado."""
+        left_type = yield node.left
+        right_type = yield node.right
+        result = _ARITHMETIC_RESULTS.get((left_type, right_type))
+        if result is not None:
+            return result
+        # Aritmética de ponteiros: p + n, p - n
+        if node.op in "+-" and element_type(left_type) is not None and right_type in NUMERIC_TYPES:
+            return pointer_type(left_type.element)
+        raise RuntimeError(f"Erro de tipo: operação '{node.op}' inválida entre {left_type} e {right_type}.")
+
+    def visit_deref(self, node):
+        """Visita *p e retorna o tipo apontado."""
+        operand_type = yield node.operand
+        if type(operand_type) is not PointerType:
+            raise RuntimeError(f"Erro: '{describe(node.operand)}' não é um ponteiro e não pode ser desreferenciado.")
+        return operand_type.element
+
+    def visit_address_of(self, node):
+        return pointer_type((yield node.operand))
+
+    def visit_index(self, node):
+        """Visita v[i] e retorna o tipo do elemento."""
+        base_type = yield node.base
+        element = element_type(base_type)
+        if element is None:
+            raise RuntimeError(f"Erro de tipo: '{describe(node.base)}' não é um vetor nem um ponteiro.")
+        if node.index is not None and (yield node.index) not in NUMERIC_TYPES:
+            raise RuntimeError(f"Erro de tipo: o índice de '{describe(node.base)}' deve ser numérico.")
+        return element
+
+    def visit_comma(self, node):
+        yield node.left
+        return (yield node.right)
 
     def visit_return(self, node):
         """Visita uma expressão de retorno."""
-        # O nó de return deve ser algo como ('return', expressão)
-        if len(node) == 2:
-            return_expr = node[1]  # Expressão após o 'return'
-            return_value = return_expr  # Avalia a expressão do retorno #arrumar
-            print(f"Retornando o valor: {return_value}")
-            return return_value
+        return_type = yield node.expr
+        if _log.debug:
+            _log.write("Retornando o valor: %s", node.expr)
+        return return_type
 
     def visit_comment(self, node):
         """Visita um comentário e o ignora."""
-        print(f"Ignorando comentário: {node[1]}")
+        if _log.debug:
+            _log.write("Ignorando comentário: %s", node.text)
+
+    def check_condition(self, statement, condition):
+        """Verifica se a condição de um comando é booleana."""
+        condition_type = yield condition
+        if condition_type is not COMPARISON_TYPE:
+            raise RuntimeError(f"Erro de tipo: a condição de '{statement}' deve ser um valor booleano, mas recebeu {condition_type}.")
 
     def visit_if(self, node):
         """Visita uma instrução 'if'."""
-        # Ajuste para suportar a ausência do bloco "else"
-        _, condition, then_block, *else_block = node
-        else_block = else_block[0] if else_block else None
-
-        print(f"Visiting 'if' statement with condition: {condition}")
-
-        # Avaliar a expressão condicional
-        condition_value = self.visit(condition)
-
-        # Verifica se o tipo da condição é booleano ou compatível
-        if not isinstance(condition_value, bool):
-            raise RuntimeError(f"Erro de tipo: a condição de 'if' deve ser um valor booleano, mas recebeu {type(condition_value)}.")
+        if _log.debug:
+            _log.write("Visiting 'if' statement with condition: %s", node.cond)
+        yield from self.check_condition("if", node.cond)
 
         # Processa o bloco "then"
-        print("Entering 'then' block:")
-        self.symbol_table.enter_scope()
-        for stmt in then_block[1]:  # Assumindo que o bloco contém uma lista de declarações ou instruções
-            self.visit(stmt)
-        self.symbol_table.exit_scope()
+        if _log.debug:
+            _log.write("Entering 'then' block:")
+        yield from self.visit_statements(node.then.statements)
 
         # Processa o bloco "else", se houver
-        if else_block:
-            print("Entering 'else' block:")
-            self.symbol_table.enter_scope()
-            for stmt in else_block[1]:  # Assumindo que o bloco contém uma lista de declarações ou instruções
-                self.visit(stmt)
-            self.symbol_table.exit_scope()
+        if node.else_ is not None:
+            if _log.debug:
+                _log.write("Entering 'else' block:")
+            yield from self.visit_statements(node.else_.statements)
 
 
     def visit_while(self, node):
         """Visita uma instrução 'while'."""
-        if len(node) < 5:
-            _, condition, block = node
-            print(f"Visiting 'while' statement with condition: {condition}")
-
-            # Avaliar a condição do 'while'
-            condition_value = self.visit(condition)
-
-            # Verifica se a condição é um valor booleano
-            if not isinstance(condition_value, bool):
-                raise RuntimeError(f"Erro de tipo: a condição de 'while' deve ser um valor booleano, mas recebeu {type(condition_value)}.")
-
-            # Processa o bloco do 'while'
-            self.symbol_table.enter_scope()
-            for stmt in block:
-                self.visit(stmt)
-            self.symbol_table.exit_scope()
+        if _log.debug:
+            _log.write("Visiting 'while' statement with condition: %s", node.cond)
+        yield from self.check_condition("while", node.cond)
+        yield from self.visit_statements(node.body.statements)
 
     def visit_do_while(self, node):
         """Visita uma instrução 'do-while'."""
-        _, block, condition = node
-        print(f"Visiting 'do-while' statement with condition: {condition}")
-
-        # Processa o bloco do 'do-while'
-        self.symbol_table.enter_scope()
-        for stmt in block:
-            self.visit(stmt)
-        self.symbol_table.exit_scope()
-
-        # Avalia a condição após o bloco
-        condition_value = self.visit(condition)
-
-        # Verifica se a condição é um valor booleano
-        if not isinstance(condition_value, bool):
-            raise RuntimeError(f"Erro de tipo: a condição de 'do-while' deve ser um valor booleano, mas recebeu {type(condition_value)}.")
+        if _log.debug:
+            _log.write("Visiting 'do-while' statement with condition: %s", node.cond)
+        yield from self.visit_statements(node.body.statements)
+        yield from self.check_condition("do-while", node.cond)
 
     def visit_for(self, node):
         """Visita uma instrução 'for'."""
-        # Ajuste do desempacotamento do nó 'for'
-        _, decl, condition, increment, block = node[0], node[1], node[2:5], node[5:7], node[7]
-
-        print(f"Visiting 'for' loop with condition: {condition} and increment: {increment}")
-
-        # Processa a declaração no início do 'for'
-        self.visit(decl)
+        if _log.debug:
+            _log.write("Visiting 'for' loop with condition: %s and increment: %s", node.cond, node.step)
 
-        # Avalia a condição do 'for'
-        condition_value = self.visit(condition)
-
-        # Verifica se a condição é um valor booleano
-        if not isinstance(condition_value, bool):
-            raise RuntimeError(f"Erro de tipo: a condição de 'for' deve ser um valor booleano, mas recebeu {type(condition_value)}.")
-
-        # Processa o bloco do 'for'
+        # A variável declarada no 'for' existe só dentro do laço
         self.symbol_table.enter_scope()
-        for stmt in block[1]:  # Assume que o bloco contém uma lista de declarações ou instruções
-            self.visit(stmt)
-        self.symbol_table.exit_scope()
-
-        # Processa o incremento do 'for'
-        self.visit(increment)
+        try:
+            if node.init is not None:
+                yield node.init
+            yield from self.check_condition("for", node.cond)
+            yield from self.visit_statements(node.body.statements)
+            yield node.step
+        finally:
+            self.symbol_table.exit_scope()
 
 
     def visit_comparison_operator(self, node):
         """Visita um operador de comparação (como <, >, ==)."""
-        operator, left, right = node
-        print(f"Visiting comparison operator: {operator} between {left} and {right}")
+        if _log.debug:
+            _log.write("Visiting comparison operator: %s between %s and %s", node.op, node.left, node.right)
+        left_type = yield node.left
+        right_type = yield node.right
 
-        # Verifica se 'left' é uma variável e obtém seu valor
-        if isinstance(left, str):  # Se 'left' é uma string, então é uma variável
-            left_value = self.symbol_table.get_symbol(left)["value"]
-        else:
-            # Caso contrário, é um valor literal
-            left_value = self.visit(left)
+        # Verifica se ambos os lados são numéricos, ou do mesmo tipo (ponteiros)
+        if (left_type in NUMERIC_TYPES and right_type in NUMERIC_TYPES) or (
+                left_type is not None and left_type is right_type):
+            return COMPARISON_TYPE
 
-        # Verifica se 'right' é uma variável
-        if isinstance(right, str):  # Se 'right' é uma string, então é uma variável
-            right_value = self.symbol_table.get_symbol(right)["value"]
-        else:
-            # Caso contrário, é um valor literal
-            right_value = self.visit(right)
+        raise RuntimeError(f"Erro de tipo: operação de comparação inválida entre {left_type} e {right_type}.")
 
-        # Verifica se ambos os lados são numéricos (int ou float)
-        if isinstance(left_value, (int, float)) and isinstance(right_value, (int, float)):
-            return left_value < right_value if operator == '<' else \
-                left_value > right_value if operator == '>' else \
-                left_value == right_value if operator == '==' else \
-                False
-
-        raise RuntimeError(f"Erro de tipo: operação de comparação inválida entre {type(left_value)} e {type(right_value)}.")
+    def visit_logical_and(self, node):
+        yield from self.check_condition("&&", node.left)
+        yield from self.check_condition("&&", node.right)
+        return COMPARISON_TYPE
 
     def visit_function_call(self, node):
-        _, function_name, parameters = node
-        print(f"Visiting function call: {function_name} with parameters: {parameters}")
+        if _log.debug:
+            _log.write("Visiting function call: %s with parameters: %s", node.name, node.args)
 
         # Verifica se a função foi declarada na tabela de símbolos
-        function_symbol = self.symbol_table.get_symbol(function_name)
-        if not function_symbol or "type" not in function_symbol or not function_symbol["type"].startswith("function"):
-            raise RuntimeError(f"Erro: Função '{function_name}' não declarada.")
+        function_symbol = self.symbol_table.get_symbol(node.name)
+        if not function_symbol or type(function_symbol.get("type")) is not FunctionType:
+            raise RuntimeError(f"Erro: Função '{node.name}' não declarada.")
 
         # Processa os parâmetros da função
-        param_values = [self.visit(param) for param in parameters]
-        print(f"Function {function_name} called with {param_values}")
-        return function_symbol["type"]  # Retorna o tipo da função
-
+        param_types = []
+        for arg in node.args:
+            param_types.append((yield arg))
+        if _log.debug:
+            _log.write("Function %s called with %s", node.name, param_types)
+        return function_return_type(function_symbol["type"])  # Retorna o tipo de retorno da função
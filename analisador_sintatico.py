@@ -1,285 +1,434 @@
-import ply.yacc as yacc
-from analisador_lexico import tokens
-import sys
-
-def parse_code(data, n):
-    parser = yacc.yacc(debug=True, debuglog=yacc.PlyLogger(sys.stderr))
-    filename = "nome.txt"
-    if n == 1:
-        with open(filename, 'w') as f:
-            f.write("Regras do Parser:\n\n")
-            for rule in parser.productions:
-                f.write(f"{rule}\n")
-        print(f"Regras salvas em: {filename}")
-    result = parser.parse(data)
-    print("Árvore Sintática:")
-    print(result)
-    return result
-
-
-
-def p_program(p):
-    '''program : statement_list'''
-    p[0] = p[1]
-
-
-def p_comment(p):
-    '''statement : COMMENT'''
-    p[0] = ('comment', p[1])
-    pass
-
-
-def p_preprocessor_directive(p):
-    '''statement : HASH'''
-    p[0] = ('preprocessor_directive', p[1])
-    pass
-
-
-def p_statement(p):
-    '''statement : declaration
-                 | declaration_func
-                 | expression_statement
-                 | if_expression
-                 | for_expreression
-                 | while_expression
-                 | while_do_expression
-                 | return'''
-    p[0] = p[1]
-
-
-def p_statement_list(p):
-    '''statement_list : statement
-                      | statement_list statement'''
-    if len(p) == 2:
-        p[0] = [p[1]]
-    else:
-        p[0] = p[1] + [p[2]]
-
-
-def p_declaration(p): #arrumar vetor
-    '''declaration : TYPE ID SEMICOLON
-                   | TYPE ID ASSIGN expression SEMICOLON
-                   | TYPE ID ASSIGN funct
-                   | TYPE ID ASSIGN block
-                   | TYPE TIMES ID SEMICOLON
-                   | TYPE vector
-                   | TYPE vector SEMICOLON
-                   | TYPE TIMES vector SEMICOLON
-                   | TYPE ID LBRACK RBRACK
-                   | TYPE ID LBRACK RBRACK ASSIGN LBRACE literal_list RBRACE SEMICOLON'''
-
-    if len(p) == 4: #caso type a;
-        p[0] = ('declaration', p[1], p[2])
-    elif len(p) == 5: # caso type *a;
-        p[0] = ('declaration', p[1], 'pointer', p[3])
-    elif len(p) == 6: # type a = expression
-        p[0] = ('declaration', p[1], p[2], p[4])
-    elif len(p) == 10:
-        p[0] = ('declaration', p[1], 'vector', p[2], 'array_initializer', p[7])
-    else:
-        p[0] = p[1], p[2], p[3]
-
-
-def p_expression_statement(p):
-    '''expression_statement : expression SEMICOLON
-                            | expression'''
-    p[0] = ('expr_stmt', p[1])
-
-
-def p_expression(p): #arrumar saida para pontei
-    '''expression : expression PLUS expression
-                  | expression MINUS expression
-                  | expression TIMES expression
-                  | expression DIVIDE expression
-                  | expression MOD expression
-                  | ID
-                  | NUMBER
-                  | NUMBER DOT NUMBER
-                  | TIMES ID
-                  | expression ASSIGN expression
-                  | STRING
-                  | LPAREN expression RPAREN
-                  | vector
-                  | expression PLUS_PLUS
-                  | expression MINUS_MINUS
-                  | expression PLUS_EQUAL
-                  | expression MINUS_EQUAL
-                  | block
-                  | expression COMMA expression
-                  | funct'''
-
-    if len(p) == 3:
-        p[0] =  (p[2], p[1])
-    elif len(p) == 4 and p[2] != '.' and p[2] != ',':
-        p[0] =  (p[2], p[1], p[3])
-    elif len(p) == 4 and p[2] != '.' and p[2] == ',':
-        p[0] =  (p[1], p[3])
-    elif len(p) == 4 and p[2] == '.':
-        p[0] = p[1] + '.' + str(p[3])
-    else:
-        p[0] = (p[1])
-
-def p_parameters(p):
-    '''parameters : TYPE ID
-                  | TYPE ID COMMA parameters
-                  | TYPE TIMES ID
-                  | TYPE TIMES ID COMMA parameters
-                  | TYPE ID LBRACK RBRACK
-                  | TYPE ID LBRACK RBRACK COMMA parameters
-                  | TYPE vector COMMA parameters
-                  | ID COMMA parameters
-                  | TIMES ID
-                  | TIMES ID COMMA parameters
-                  | ID LBRACK RBRACK
-                  | TYPE TIMES ID LBRACK RBRACK
-                  | ID LBRACK RBRACK COMMA parameters
-                  | vector COMMA parameters
-                  | expression
-                  | parameters COMMA parameters'''
-
-    if len(p) == 3:
-        p[0] = ('parameter', p[1], p[2])  # Caso para TYPE ID
-    elif len(p) == 2 and p[1] != ',':
-        p[0] = ('parameter', p[1])
-    elif len(p) == 4 and p[2] != ',':
-        p[0] = ('parameter', p[1], p[2], p[3])  # Caso para TYPE TIMES ID
-    elif len(p) == 4 and p[2] == ',':
-        p[0] = ('parameter', p[1], p[3])  # Caso para paramters COMMA parameters
-    elif len(p) == 5:
-        p[0] = ('parameter', p[1], p[2], p[4])
-    elif len(p) == 6 and p[4] == '[':
-        p[0] = ('parameter', 'vector', p[1], p[2], p[3])
-    elif len(p) == 6 and p[4] != '[':
-        p[0] = ('parameter', p[1], p[2], p[3], p[5])  # Caso para TYPE TIMES ID COMMA parameters
-    elif len(p) == 7:
-        p[0] = ('parameter', 'vector', p[1], p[2], p[6])  # Caso para TYPE ID LBRACK RBRACK COMMA parameters
-
-def p_declaration_func(p): #arrunar a saida
-    '''declaration_func : TYPE ID LPAREN parameters RPAREN block
-                        | TYPE ID LPAREN RPAREN block
-                        | TYPE TIMES ID LPAREN RPAREN block
-                        | TYPE TIMES ID LPAREN parameters RPAREN block'''
-    if len(p) == 6:
-        p[0] = ('function_declaration', p[1], p[2], p[5])
-    elif len(p) == 7 and p[2] != '*':
-        p[0] = ('function_declaration', p[1], p[2], p[4], p[6])
-    elif len(p) == 7 and p[2] == '*':
-        p[0] = ('function_declaration', p[1], p[2], p[3], p[6])
-    else:
-        p[0] = ('function_declaration', p[1], p[2], p[3], p[5], p[7])
-
-def p_funct(p):
-    '''funct : ID LPAREN parameters RPAREN
-             | ID LPAREN RPAREN'''
-    if len(p) == 5:
-        p[0] = ('function_call', p[1], p[3])
-    else:
-        p[0] = ('function_call', p[1])
-
-def p_if_expression(p): #arrumar saida
-    '''if_expression : IF LPAREN condicional RPAREN block
-                     | IF LPAREN condicional RPAREN block ELSE block'''
-    if len(p) == 6:
-        p[0] = ('if', p[3], p[5])  # ('if', condição, bloco_then)
-    else:
-        p[0] = ('if', p[3], p[5], p[7])  # ('if', condição, bloco_then, bloco_else)
-
-def p_condicional(p): #ARRUMAR SAIDA
-    '''condicional : ID operadoror_comp ID
-                   | ID operadoror_comp NUMBER
-                   | ID operadoror_comp vector
-                   | NUMBER operadoror_comp ID
-                   | NUMBER operadoror_comp NUMBER
-                   | NUMBER operadoror_comp vector
-                   | vector operadoror_comp ID
-                   | vector operadoror_comp NUMBER
-                   | vector operadoror_comp vector'''
-    p[0] = (p[2], p[1], p[3])
-
-def p_vector(p):
-    '''vector : ID LBRACK expression RBRACK
-              | ID LBRACK RBRACK
-              | AMPERSAND vector'''
-    if len(p) == 3:
-        p[0] = (p[2], p[1])
-    elif len(p) == 4:
-        p[0] = ('vector', p[1])
-    else:
-        p[0] = ('vector', p[1], p[3])
-
-def p_block(p):
-    '''block : LBRACE statement_list RBRACE
-             | LBRACE RBRACE'''
-
-    p[0] = ('block', p[2])
-
-
-def p_operador_comp(p):
-      '''operadoror_comp : EQ
-                   | NE
-                   | GE
-                   | LE
-                   | GT
-                   | LT'''
-      p[0] =  p[1]
-
-def p_for_expression(p): #ARRUMAR saida
-    '''for_expreression : FOR LPAREN declaration ID operadoror_comp ID SEMICOLON ID PLUS_PLUS RPAREN block
-                        | FOR LPAREN declaration ID operadoror_comp ID SEMICOLON ID MINUS_MINUS RPAREN block
-                        | FOR LPAREN declaration ID operadoror_comp NUMBER SEMICOLON ID PLUS_PLUS RPAREN block
-                        | FOR LPAREN declaration ID operadoror_comp NUMBER SEMICOLON ID MINUS_MINUS RPAREN block
-                        | FOR LPAREN ID ASSIGN expression SEMICOLON ID operadoror_comp ID SEMICOLON ID PLUS_PLUS RPAREN block
-                        | FOR LPAREN ID ASSIGN expression SEMICOLON ID operadoror_comp ID SEMICOLON ID MINUS_MINUS RPAREN block
-                        | FOR LPAREN ID ASSIGN expression SEMICOLON ID operadoror_comp NUMBER SEMICOLON ID PLUS_PLUS RPAREN block
-                        | FOR LPAREN ID ASSIGN expression SEMICOLON ID operadoror_comp NUMBER SEMICOLON ID MINUS_MINUS RPAREN block
-                        | FOR LPAREN ID SEMICOLON ID operadoror_comp ID SEMICOLON ID PLUS_PLUS RPAREN block
-                        | FOR LPAREN ID SEMICOLON ID operadoror_comp ID SEMICOLON ID MINUS_MINUS RPAREN block
-                        | FOR LPAREN ID SEMICOLON ID operadoror_comp NUMBER SEMICOLON ID PLUS_PLUS RPAREN block
-                        | FOR LPAREN ID SEMICOLON ID operadoror_comp NUMBER SEMICOLON ID MINUS_MINUS RPAREN block'''
-    if p[6] == ';':
-        p[0] = ('for', p[3], p[4], p[5], p[7], p[8], p[9], p[11], p[12], p[14])
-    elif len(p) == 13:
-        p[0] = ('for', p[3], p[5], p[6], p[7], p[9], p[10], p[12])
-    else:
-        p[0] = ('for', p[3], p[4], p[5], p[6], p[8], p[9], p[11])
-
-
-def p_while_expression(p):
-    '''while_expression : WHILE LPAREN ID operadoror_comp ID RPAREN block
-                        | WHILE LPAREN ID operadoror_comp NUMBER RPAREN block
-                        | WHILE LPAREN NUMBER operadoror_comp ID RPAREN block
-                        | WHILE LPAREN NUMBER operadoror_comp NUMBER RPAREN block
-                        | WHILE LPAREN ID operadoror_comp ID AND ID LBRACK ID RBRACK operadoror_comp ID RPAREN block'''
-    if len(p) == 15:
-        p[0] = ('while', p[3], p[4], p[5], p[6], 'vector', p[7], p[9], p[11], p[12], p[14])
-    else:
-        p[0] = ('while', p[3], p[4], p[5], p[7])
-
-
-def p_while_do_expression(p):
-    '''while_do_expression : DO block WHILE LPAREN ID operadoror_comp ID RPAREN SEMICOLON
-                           | DO block WHILE LPAREN ID operadoror_comp NUMBER RPAREN SEMICOLON
-                           | DO block WHILE LPAREN NUMBER operadoror_comp ID RPAREN SEMICOLON
-                           | DO block WHILE LPAREN NUMBER operadoror_comp NUMBER RPAREN SEMICOLON'''
-    p[0] = ('do_while', p[2], p[5], p[6], p[7])
-
-
-def p_return(p):
-    ''' return : RETURN expression SEMICOLON'''
-    p[0] = ('return', p[2])
-
-
-def p_error(p):
-    if p:
-        print(f"Erro de sintaxe na linha {p.lineno}: {p.value}")
-    else:
-        print("Erro de sintaxe: final inesperado.")
-
-
-def p_literal_list(p):
-    '''literal_list : NUMBER
-                    | NUMBER COMMA literal_list'''
-    if len(p) == 2:  # Caso de um único valor
-        p[0] = [p[1]]  # Lista com um único elemento
-    else:  # Caso de vários valores
-        p[0] = [p[1]] + p[3]  # Combina o valor atual com os próximos
+import copy
+import os
+import ply.yacc as yacc
+import analisador_lexico
+from analisador_lexico import tokens
+import arvore_sintatica as ast_nodes
+from arvore_sintatica import (
+    AddressOf, Assign, BinaryOp, Block, Comma, Comment, Comparison, Declaration, Deref, Directive, DoWhile,
+    ExprStmt, For, FunctionCall, FunctionDeclaration, If, Index, Literal, LogicalAnd, Name, Parameter, Return,
+    UnaryOp, VectorDeclaration, While)
+import rastreamento
+import sys
+
+_log = rastreamento.canal("sintatico")
+
+# As tabelas LALR ficam em parsetab.py, ao lado deste módulo. O PLY grava nelas a
+# assinatura da gramática e só reconstrói o autômato quando essa assinatura muda.
+DIRETORIO_TABELAS = os.path.dirname(os.path.abspath(__file__))
+MODULO_TABELAS = "parsetab"
+
+_parser = None  # Parser único do processo, reaproveitado a cada parse_code
+
+
+def get_parser(debug=False):
+    """Retorna o parser do processo, criando-o na primeira chamada.
+
+    Com debug=True o autômato é gerado de novo e os diagnósticos da gramática são
+    escritos em stderr; sem ele, as tabelas em cache são reaproveitadas em silêncio."""
+    global _parser
+    if debug:
+        # Um módulo de tabelas inexistente força o PLY a refazer a geração com log
+        _parser = yacc.yacc(debug=True, debuglog=yacc.PlyLogger(sys.stderr),
+                            tabmodule=MODULO_TABELAS + "_debug", write_tables=False,
+                            outputdir=DIRETORIO_TABELAS)
+    elif _parser is None:
+        _parser = yacc.yacc(debug=False, tabmodule=MODULO_TABELAS,
+                            outputdir=DIRETORIO_TABELAS, errorlog=yacc.NullLogger())
+    return _parser
+
+
+def new_parser():
+    """Cria um parser independente que compartilha as tabelas do parser do processo.
+
+    O LRParser do PLY guarda as pilhas da análise em atributos da instância; com uma
+    cópia por usuário, várias análises podem rodar ao mesmo tempo em threads."""
+    return copy.copy(get_parser())
+
+
+def parse_code(data, n, debug=False, parser=None):
+    """Analisa o código: texto, caminho de arquivo (os.PathLike) ou os tokens já
+    gerados pelo analisador léxico (TokenBuffer ou TokenStream)."""
+    if isinstance(data, os.PathLike):
+        data = analisador_lexico.TokenStream(data)
+    elif not isinstance(data, (analisador_lexico.TokenBuffer, analisador_lexico.TokenStream)):
+        data = analisador_lexico.tokenize(data)
+    if parser is None or debug:
+        parser = get_parser(debug)
+    filename = "nome.txt"
+    if n == 1:
+        with open(filename, 'w') as f:
+            f.write("Regras do Parser:\n\n")
+            for rule in parser.productions:
+                f.write(f"{rule}\n")
+        if _log.info:
+            _log.write("Regras salvas em: %s", filename)
+    result = parser.parse(lexer=analisador_lexico.lexer, tokenfunc=data.token_function())
+    if _log.info:
+        _log.write("Árvore Sintática:")
+        _log.write("%s", result)
+    return result
+
+
+def count_nodes(ast):
+    """Conta os nós da AST sem recursão."""
+    return sum(1 for _ in ast_nodes.walk(ast))
+
+
+def _linha(p, i):
+    """Linha do símbolo i da produção: a do token ou a guardada no nó filho."""
+    value = p[i]
+    if isinstance(value, ast_nodes.Node):
+        return value.lineno
+    return p.lineno(i)
+
+
+def _nome(p, i):
+    # Nomes e tipos são internados: cada texto fica uma única vez na memória
+    return Name(sys.intern(p[i]), p.lineno(i))
+
+
+def _numero(p, i):
+    # Constantes também se repetem muito ("0", "1")
+    return Literal(sys.intern(p[i]), ast_nodes.INT, p.lineno(i))
+
+
+def _operando(p, i):
+    """Operando de uma condição: ID, NUMBER ou vector."""
+    kind = p.slice[i].type
+    if kind == 'ID':
+        return _nome(p, i)
+    if kind == 'NUMBER':
+        return _numero(p, i)
+    return p[i]
+
+
+def _comparacao(p, op, left, right):
+    return Comparison(sys.intern(p[op]), _operando(p, left), _operando(p, right), _linha(p, left))
+
+
+def _argumentos(expression):
+    """Lista de argumentos de uma chamada: a expressão com vírgulas desfeita."""
+    args = []
+    pending = [expression]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, Comma):
+            pending.append(node.right)
+            pending.append(node.left)
+        else:
+            args.append(node)
+    return args
+
+
+def p_program(p):
+    '''program : statement_list'''
+    p[0] = p[1]
+
+
+def p_comment(p):
+    '''statement : COMMENT'''
+    p[0] = Comment(p[1], p.lineno(1))
+
+
+def p_preprocessor_directive(p):
+    '''statement : HASH'''
+    p[0] = Directive(p[1], p.lineno(1))
+
+
+def p_statement(p):
+    '''statement : declaration
+                 | declaration_func
+                 | expression_statement
+                 | if_expression
+                 | for_expreression
+                 | while_expression
+                 | while_do_expression
+                 | return'''
+    p[0] = p[1]
+
+
+def p_statement_list(p):
+    '''statement_list : statement
+                      | statement_list statement'''
+    if len(p) == 2:
+        p[0] = [p[1]]
+    else:
+        # A lista da esquerda é acrescida no lugar: copiá-la a cada redução
+        # tornaria quadrático o custo de um arquivo com muitos comandos
+        p[1].append(p[2])
+        p[0] = p[1]
+
+
+def p_declaration(p): #arrumar vetor
+    '''declaration : TYPE ID SEMICOLON
+                   | TYPE ID ASSIGN expression SEMICOLON
+                   | TYPE ID ASSIGN funct
+                   | TYPE ID ASSIGN block
+                   | TYPE TIMES ID SEMICOLON
+                   | TYPE vector
+                   | TYPE vector SEMICOLON
+                   | TYPE TIMES vector SEMICOLON
+                   | TYPE ID LBRACK RBRACK
+                   | TYPE ID LBRACK RBRACK ASSIGN LBRACE literal_list RBRACE SEMICOLON'''
+    var_type, line = sys.intern(p[1]), p.lineno(1)
+    second = p.slice[2].type
+    if second == 'vector':  # type v[n];
+        vector = p[2]
+        p[0] = VectorDeclaration(var_type, vector.base.name, vector.index, lineno=line)
+    elif second == 'TIMES':
+        if p.slice[3].type == 'ID':  # type *a;
+            p[0] = Declaration(var_type, sys.intern(p[3]), pointer=True, lineno=line)
+        else:  # type *v[n];
+            p[0] = VectorDeclaration(var_type, p[3].base.name, p[3].index, pointer=True, lineno=line)
+    elif len(p) == 4:  # type a;
+        p[0] = Declaration(var_type, sys.intern(p[2]), lineno=line)
+    elif p.slice[3].type == 'ASSIGN':  # type a = expression
+        p[0] = Declaration(var_type, sys.intern(p[2]), p[4], lineno=line)
+    elif len(p) == 10:  # type v[] = {1, 2, ...};
+        p[0] = VectorDeclaration(var_type, sys.intern(p[2]), values=p[7], lineno=line)
+    else:  # type v[]
+        p[0] = VectorDeclaration(var_type, sys.intern(p[2]), lineno=line)
+
+
+def p_expression_statement(p):
+    '''expression_statement : expression SEMICOLON
+                            | expression'''
+    p[0] = ExprStmt(p[1], _linha(p, 1))
+
+
+_BINARY_OPERATORS = frozenset('+-*/%')
+_UNARY_OPERATORS = frozenset(('++', '--', '+=', '-='))
+
+
+def p_expression(p): #arrumar saida para pontei
+    '''expression : expression PLUS expression
+                  | expression MINUS expression
+                  | expression TIMES expression
+                  | expression DIVIDE expression
+                  | expression MOD expression
+                  | ID
+                  | NUMBER
+                  | NUMBER DOT NUMBER
+                  | TIMES ID
+                  | expression ASSIGN expression
+                  | STRING
+                  | LPAREN expression RPAREN
+                  | vector
+                  | expression PLUS_PLUS
+                  | expression MINUS_MINUS
+                  | expression PLUS_EQUAL
+                  | expression MINUS_EQUAL
+                  | block
+                  | expression COMMA expression
+                  | funct'''
+    first = p.slice[1].type
+    if len(p) == 2:
+        if first == 'ID':
+            p[0] = _nome(p, 1)
+        elif first == 'NUMBER':
+            p[0] = _numero(p, 1)
+        elif first == 'STRING':
+            p[0] = Literal(p[1], ast_nodes.STRING, p.lineno(1))
+        else:  # vector, block ou funct
+            p[0] = p[1]
+    elif len(p) == 3:
+        if first == 'TIMES':  # *p
+            p[0] = Deref(_nome(p, 2), p.lineno(1))
+        else:  # a++ a-- a+= a-=
+            p[0] = UnaryOp(sys.intern(p[2]), p[1], p[1].lineno)
+    elif first == 'LPAREN':
+        p[0] = p[2]
+    elif first == 'NUMBER':  # 1.5
+        p[0] = Literal(f"{p[1]}.{p[3]}", ast_nodes.FLOAT, p.lineno(1))
+    elif p[2] in _BINARY_OPERATORS:
+        p[0] = BinaryOp(p[2], p[1], p[3], p[1].lineno)
+    elif p[2] == '=':
+        p[0] = Assign(p[1], p[3], p[1].lineno)
+    else:
+        p[0] = Comma(p[1], p[3], p[1].lineno)
+
+
+# Um item de parameters a partir dos símbolos da produção (sem a vírgula e o resto
+# da lista): parâmetros de uma declaração de função ou argumentos de uma chamada.
+# As produções de parameters são recursivas à direita, então o resto da lista fica
+# pronto antes do item; para acrescentar no lugar, o valor de parameters é a
+# lista em ordem inversa, desfeita por _parametros quando a lista está completa.
+_PARAMETER_BUILDERS = {
+    ('TYPE', 'ID'): lambda p: [Parameter(sys.intern(p[1]), sys.intern(p[2]), lineno=p.lineno(1))],
+    ('TYPE', 'TIMES', 'ID'): lambda p: [Parameter(sys.intern(p[1]), sys.intern(p[3]), pointer=True, lineno=p.lineno(1))],
+    ('TYPE', 'ID', 'LBRACK', 'RBRACK'):
+        lambda p: [Parameter(sys.intern(p[1]), sys.intern(p[2]), vector=True, lineno=p.lineno(1))],
+    ('TYPE', 'TIMES', 'ID', 'LBRACK', 'RBRACK'):
+        lambda p: [Parameter(sys.intern(p[1]), sys.intern(p[3]), pointer=True, vector=True, lineno=p.lineno(1))],
+    ('TYPE', 'vector'): lambda p: [Parameter(sys.intern(p[1]), p[2].base.name, vector=True, lineno=p.lineno(1))],
+    ('ID',): lambda p: [_nome(p, 1)],
+    ('TIMES', 'ID'): lambda p: [Deref(_nome(p, 2), p.lineno(1))],
+    ('ID', 'LBRACK', 'RBRACK'): lambda p: [Index(_nome(p, 1), None, p.lineno(1))],
+    ('vector',): lambda p: [p[1]],
+    ('expression',): lambda p: _argumentos(p[1])[::-1],
+}
+
+
+def p_parameters(p):
+    '''parameters : TYPE ID
+                  | TYPE ID COMMA parameters
+                  | TYPE TIMES ID
+                  | TYPE TIMES ID COMMA parameters
+                  | TYPE ID LBRACK RBRACK
+                  | TYPE ID LBRACK RBRACK COMMA parameters
+                  | TYPE vector COMMA parameters
+                  | ID COMMA parameters
+                  | TIMES ID
+                  | TIMES ID COMMA parameters
+                  | ID LBRACK RBRACK
+                  | TYPE TIMES ID LBRACK RBRACK
+                  | ID LBRACK RBRACK COMMA parameters
+                  | vector COMMA parameters
+                  | expression
+                  | parameters COMMA parameters'''
+    symbols = tuple(s.type for s in p.slice[1:])
+    if symbols == ('parameters', 'COMMA', 'parameters'):
+        p[3].extend(p[1])  # Ordem inversa: os itens da esquerda vão para o fim
+        p[0] = p[3]
+    elif len(symbols) > 1 and symbols[-1] == 'parameters':
+        rest = p[len(p) - 1]
+        rest.extend(_PARAMETER_BUILDERS[symbols[:-2]](p))
+        p[0] = rest
+    else:
+        p[0] = _PARAMETER_BUILDERS[symbols](p)
+
+
+def _parametros(reversed_list):
+    """Lista de parameters na ordem do código (o valor da produção é invertido)."""
+    reversed_list.reverse()
+    return reversed_list
+
+
+def p_declaration_func(p): #arrunar a saida
+    '''declaration_func : TYPE ID LPAREN parameters RPAREN block
+                        | TYPE ID LPAREN RPAREN block
+                        | TYPE TIMES ID LPAREN RPAREN block
+                        | TYPE TIMES ID LPAREN parameters RPAREN block'''
+    pointer = p.slice[2].type == 'TIMES'
+    name = 3 if pointer else 2
+    params = _parametros(p[name + 2]) if p.slice[name + 2].type == 'parameters' else []
+    p[0] = FunctionDeclaration(sys.intern(p[1]), sys.intern(p[name]), params, p[len(p) - 1], pointer, p.lineno(1))
+
+def p_funct(p):
+    '''funct : ID LPAREN parameters RPAREN
+             | ID LPAREN RPAREN'''
+    args = _parametros(p[3]) if len(p) == 5 else []
+    p[0] = FunctionCall(sys.intern(p[1]), args, p.lineno(1))
+
+def p_if_expression(p): #arrumar saida
+    '''if_expression : IF LPAREN condicional RPAREN block
+                     | IF LPAREN condicional RPAREN block ELSE block'''
+    else_block = p[7] if len(p) == 8 else None
+    p[0] = If(p[3], p[5], else_block, p.lineno(1))
+
+def p_condicional(p): #ARRUMAR SAIDA
+    '''condicional : ID operadoror_comp ID
+                   | ID operadoror_comp NUMBER
+                   | ID operadoror_comp vector
+                   | NUMBER operadoror_comp ID
+                   | NUMBER operadoror_comp NUMBER
+                   | NUMBER operadoror_comp vector
+                   | vector operadoror_comp ID
+                   | vector operadoror_comp NUMBER
+                   | vector operadoror_comp vector'''
+    p[0] = _comparacao(p, 2, 1, 3)
+
+def p_vector(p):
+    '''vector : ID LBRACK expression RBRACK
+              | ID LBRACK RBRACK
+              | AMPERSAND vector'''
+    if len(p) == 3:
+        p[0] = AddressOf(p[2], p.lineno(1))
+    elif len(p) == 4:
+        p[0] = Index(_nome(p, 1), None, p.lineno(1))
+    else:
+        p[0] = Index(_nome(p, 1), p[3], p.lineno(1))
+
+def p_block(p):
+    '''block : LBRACE statement_list RBRACE
+             | LBRACE RBRACE'''
+
+    p[0] = Block(p[2] if len(p) == 4 else [], p.lineno(1))
+
+
+def p_operador_comp(p):
+      '''operadoror_comp : EQ
+                   | NE
+                   | GE
+                   | LE
+                   | GT
+                   | LT'''
+      p[0] =  p[1]
+
+def p_for_expression(p): #ARRUMAR saida
+    '''for_expreression : FOR LPAREN declaration ID operadoror_comp ID SEMICOLON ID PLUS_PLUS RPAREN block
+                        | FOR LPAREN declaration ID operadoror_comp ID SEMICOLON ID MINUS_MINUS RPAREN block
+                        | FOR LPAREN declaration ID operadoror_comp NUMBER SEMICOLON ID PLUS_PLUS RPAREN block
+                        | FOR LPAREN declaration ID operadoror_comp NUMBER SEMICOLON ID MINUS_MINUS RPAREN block
+                        | FOR LPAREN ID ASSIGN expression SEMICOLON ID operadoror_comp ID SEMICOLON ID PLUS_PLUS RPAREN block
+                        | FOR LPAREN ID ASSIGN expression SEMICOLON ID operadoror_comp ID SEMICOLON ID MINUS_MINUS RPAREN block
+                        | FOR LPAREN ID ASSIGN expression SEMICOLON ID operadoror_comp NUMBER SEMICOLON ID PLUS_PLUS RPAREN block
+                        | FOR LPAREN ID ASSIGN expression SEMICOLON ID operadoror_comp NUMBER SEMICOLON ID MINUS_MINUS RPAREN block
+                        | FOR LPAREN ID SEMICOLON ID operadoror_comp ID SEMICOLON ID PLUS_PLUS RPAREN block
+                        | FOR LPAREN ID SEMICOLON ID operadoror_comp ID SEMICOLON ID MINUS_MINUS RPAREN block
+                        | FOR LPAREN ID SEMICOLON ID operadoror_comp NUMBER SEMICOLON ID PLUS_PLUS RPAREN block
+                        | FOR LPAREN ID SEMICOLON ID operadoror_comp NUMBER SEMICOLON ID MINUS_MINUS RPAREN block'''
+    if len(p) == 12:  # for (type i = e; cond; i++)
+        init, cond = p[3], 4
+    elif len(p) == 15:  # for (i = e; cond; i++)
+        init, cond = Assign(_nome(p, 3), p[5], p.lineno(3)), 7
+    else:  # for (i; cond; i++)
+        init, cond = _nome(p, 3), 5
+    step = UnaryOp(sys.intern(p[cond + 5]), _nome(p, cond + 4), p.lineno(cond + 4))
+    p[0] = For(init, _comparacao(p, cond + 1, cond, cond + 2), step, p[len(p) - 1], p.lineno(1))
+
+
+def p_while_expression(p):
+    '''while_expression : WHILE LPAREN ID operadoror_comp ID RPAREN block
+                        | WHILE LPAREN ID operadoror_comp NUMBER RPAREN block
+                        | WHILE LPAREN NUMBER operadoror_comp ID RPAREN block
+                        | WHILE LPAREN NUMBER operadoror_comp NUMBER RPAREN block
+                        | WHILE LPAREN ID operadoror_comp ID AND ID LBRACK ID RBRACK operadoror_comp ID RPAREN block'''
+    cond = _comparacao(p, 4, 3, 5)
+    if len(p) == 15:  # a op b && v[i] op c
+        element = Index(_nome(p, 7), _nome(p, 9), p.lineno(7))
+        cond = LogicalAnd(cond, Comparison(sys.intern(p[11]), element, _nome(p, 12), p.lineno(7)), cond.lineno)
+    p[0] = While(cond, p[len(p) - 1], p.lineno(1))
+
+
+def p_while_do_expression(p):
+    '''while_do_expression : DO block WHILE LPAREN ID operadoror_comp ID RPAREN SEMICOLON
+                           | DO block WHILE LPAREN ID operadoror_comp NUMBER RPAREN SEMICOLON
+                           | DO block WHILE LPAREN NUMBER operadoror_comp ID RPAREN SEMICOLON
+                           | DO block WHILE LPAREN NUMBER operadoror_comp NUMBER RPAREN SEMICOLON'''
+    p[0] = DoWhile(p[2], _comparacao(p, 6, 5, 7), p.lineno(1))
+
+
+def p_return(p):
+    ''' return : RETURN expression SEMICOLON'''
+    p[0] = Return(p[2], p.lineno(1))
+
+
+def p_error(p):
+    if p:
+        _log.erro("Erro de sintaxe na linha %s: %s", p.lineno, p.value)
+    else:
+        _log.erro("Erro de sintaxe: final inesperado.")
+
+
+def p_literal_list(p):
+    '''literal_list : NUMBER
+                    | literal_list COMMA NUMBER'''
+    # Recursiva à esquerda: cada valor é reduzido assim que lido, sem crescer a
+    # pilha do parser, e entra no fim da lista já montada
+    if len(p) == 2:  # Primeiro valor
+        p[0] = [_numero(p, 1)]
+    else:  # Próximo valor
+        p[1].append(_numero(p, 3))
+        p[0] = p[1]
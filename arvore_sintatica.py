@@ -0,0 +1,483 @@
+"""Nós da árvore sintática (AST) produzida por analisador_sintatico.
+
+Cada tipo de nó é uma classe com __slots__, um código inteiro (kind), campos com
+nome e a linha do código-fonte. As fases despacham pelo kind em tabelas montadas
+uma única vez, em vez de montar nomes de métodos ou comparar node[0] e len(node).
+
+Um programa, assim como o corpo de um bloco, é uma lista de comandos.
+
+Declarações, parâmetros e usos de nomes (Name) têm também o atributo symbol, que
+não faz parte de fields: o analisador semântico o preenche com os atributos do
+símbolo resolvido, e o gerador de código intermediário os usa sem consultar a
+tabela de símbolos.
+
+As fases percorrem a árvore com drive, que usa uma pilha explícita: a profundidade
+da árvore (uma cadeia a + b + c + ... de dezenas de milhares de termos, por
+exemplo) não é limitada pela pilha do Python.
+"""
+from types import GeneratorType
+
+# Códigos dos tipos de nó
+DECLARATION = 1
+VECTOR_DECLARATION = 2
+FUNCTION_DECLARATION = 3
+PARAMETER = 4
+BLOCK = 5
+EXPR_STMT = 6
+IF = 7
+WHILE = 8
+DO_WHILE = 9
+FOR = 10
+RETURN = 11
+COMMENT = 12
+DIRECTIVE = 13
+NAME = 14
+LITERAL = 15
+BINARY_OP = 16
+COMPARISON = 17
+LOGICAL_AND = 18
+ASSIGN = 19
+UNARY_OP = 20
+DEREF = 21
+ADDRESS_OF = 22
+INDEX = 23
+FUNCTION_CALL = 24
+COMMA = 25
+
+# Tipos de literal
+INT = "int"
+FLOAT = "float"
+STRING = "string"
+
+
+class Node:
+    """Base dos nós: fields lista os campos na ordem do construtor."""
+    __slots__ = ("lineno",)
+    kind = 0
+    fields = ()
+
+    def __repr__(self):
+        return format_tree(self)
+
+
+class Declaration(Node):
+    """Declaração de variável: int x; int x = e; int *p;"""
+    __slots__ = ("type", "name", "init", "pointer", "symbol")
+    kind = DECLARATION
+    fields = ("type", "name", "init", "pointer")
+
+    def __init__(self, type, name, init=None, pointer=False, lineno=0):
+        self.type = type
+        self.name = name
+        self.init = init
+        self.pointer = pointer
+        self.symbol = None  # Atributos do símbolo, preenchidos pelo analisador semântico
+        self.lineno = lineno
+
+
+class VectorDeclaration(Node):
+    """Declaração de vetor: int v[n]; int v[]; int v[] = {1, 2};"""
+    __slots__ = ("type", "name", "size", "values", "pointer", "symbol")
+    kind = VECTOR_DECLARATION
+    fields = ("type", "name", "size", "values", "pointer")
+
+    def __init__(self, type, name, size=None, values=None, pointer=False, lineno=0):
+        self.type = type
+        self.name = name
+        self.size = size  # Expressão do tamanho, ou None
+        self.values = values  # Lista de Literal do inicializador, ou None
+        self.pointer = pointer
+        self.symbol = None  # Atributos do símbolo, preenchidos pelo analisador semântico
+        self.lineno = lineno
+
+
+class FunctionDeclaration(Node):
+    __slots__ = ("return_type", "name", "params", "body", "pointer")
+    kind = FUNCTION_DECLARATION
+    fields = __slots__
+
+    def __init__(self, return_type, name, params, body, pointer=False, lineno=0):
+        self.return_type = return_type
+        self.name = name
+        self.params = params  # Lista de Parameter
+        self.body = body  # Block
+        self.pointer = pointer  # Função que devolve ponteiro
+        self.lineno = lineno
+
+
+class Parameter(Node):
+    """Parâmetro na declaração de uma função: int a, int *p, int v[]."""
+    __slots__ = ("type", "name", "pointer", "vector", "symbol")
+    kind = PARAMETER
+    fields = ("type", "name", "pointer", "vector")
+
+    def __init__(self, type, name, pointer=False, vector=False, lineno=0):
+        self.type = type
+        self.name = name
+        self.pointer = pointer
+        self.vector = vector
+        self.symbol = None  # Atributos do símbolo, preenchidos pelo analisador semântico
+        self.lineno = lineno
+
+
+class Block(Node):
+    __slots__ = ("statements",)
+    kind = BLOCK
+    fields = __slots__
+
+    def __init__(self, statements, lineno=0):
+        self.statements = statements
+        self.lineno = lineno
+
+
+class ExprStmt(Node):
+    __slots__ = ("expr",)
+    kind = EXPR_STMT
+    fields = __slots__
+
+    def __init__(self, expr, lineno=0):
+        self.expr = expr
+        self.lineno = lineno
+
+
+class If(Node):
+    __slots__ = ("cond", "then", "else_")
+    kind = IF
+    fields = __slots__
+
+    def __init__(self, cond, then, else_=None, lineno=0):
+        self.cond = cond
+        self.then = then
+        self.else_ = else_
+        self.lineno = lineno
+
+
+class While(Node):
+    __slots__ = ("cond", "body")
+    kind = WHILE
+    fields = __slots__
+
+    def __init__(self, cond, body, lineno=0):
+        self.cond = cond
+        self.body = body
+        self.lineno = lineno
+
+
+class DoWhile(Node):
+    __slots__ = ("body", "cond")
+    kind = DO_WHILE
+    fields = __slots__
+
+    def __init__(self, body, cond, lineno=0):
+        self.body = body
+        self.cond = cond
+        self.lineno = lineno
+
+
+class For(Node):
+    """for (init; cond; step) body; init pode ser Declaration, Assign ou None."""
+    __slots__ = ("init", "cond", "step", "body")
+    kind = FOR
+    fields = __slots__
+
+    def __init__(self, init, cond, step, body, lineno=0):
+        self.init = init
+        self.cond = cond
+        self.step = step
+        self.body = body
+        self.lineno = lineno
+
+
+class Return(Node):
+    __slots__ = ("expr",)
+    kind = RETURN
+    fields = __slots__
+
+    def __init__(self, expr, lineno=0):
+        self.expr = expr
+        self.lineno = lineno
+
+
+class Comment(Node):
+    __slots__ = ("text",)
+    kind = COMMENT
+    fields = __slots__
+
+    def __init__(self, text, lineno=0):
+        self.text = text
+        self.lineno = lineno
+
+
+class Directive(Node):
+    """Diretiva do pré-processador (#include ...), mantida como texto."""
+    __slots__ = ("text",)
+    kind = DIRECTIVE
+    fields = __slots__
+
+    def __init__(self, text, lineno=0):
+        self.text = text
+        self.lineno = lineno
+
+
+class Name(Node):
+    __slots__ = ("name", "symbol")
+    kind = NAME
+    fields = ("name",)
+
+    def __init__(self, name, lineno=0):
+        self.name = name
+        self.symbol = None  # Atributos do símbolo, preenchidos pelo analisador semântico
+        self.lineno = lineno
+
+
+class Literal(Node):
+    """Constante: value é o texto do código (com as aspas, no caso de string)."""
+    __slots__ = ("value", "literal_kind")
+    kind = LITERAL
+    fields = __slots__
+
+    def __init__(self, value, literal_kind, lineno=0):
+        self.value = value
+        self.literal_kind = literal_kind  # INT, FLOAT ou STRING
+        self.lineno = lineno
+
+
+class BinaryOp(Node):
+    """Operação aritmética: + - * / %."""
+    __slots__ = ("op", "left", "right")
+    kind = BINARY_OP
+    fields = __slots__
+
+    def __init__(self, op, left, right, lineno=0):
+        self.op = op
+        self.left = left
+        self.right = right
+        self.lineno = lineno
+
+
+class Comparison(Node):
+    """Comparação: == != < <= > >=."""
+    __slots__ = ("op", "left", "right")
+    kind = COMPARISON
+    fields = __slots__
+
+    def __init__(self, op, left, right, lineno=0):
+        self.op = op
+        self.left = left
+        self.right = right
+        self.lineno = lineno
+
+
+class LogicalAnd(Node):
+    __slots__ = ("left", "right")
+    kind = LOGICAL_AND
+    fields = __slots__
+
+    def __init__(self, left, right, lineno=0):
+        self.left = left
+        self.right = right
+        self.lineno = lineno
+
+
+class Assign(Node):
+    """Atribuição; target é Name, Index ou Deref."""
+    __slots__ = ("target", "value")
+    kind = ASSIGN
+    fields = __slots__
+
+    def __init__(self, target, value, lineno=0):
+        self.target = target
+        self.value = value
+        self.lineno = lineno
+
+
+class UnaryOp(Node):
+    """Operador pós-fixo sobre uma variável: ++ -- += -=."""
+    __slots__ = ("op", "operand")
+    kind = UNARY_OP
+    fields = __slots__
+
+    def __init__(self, op, operand, lineno=0):
+        self.op = op
+        self.operand = operand
+        self.lineno = lineno
+
+
+class Deref(Node):
+    """*p"""
+    __slots__ = ("operand",)
+    kind = DEREF
+    fields = __slots__
+
+    def __init__(self, operand, lineno=0):
+        self.operand = operand
+        self.lineno = lineno
+
+
+class AddressOf(Node):
+    """&v[i]"""
+    __slots__ = ("operand",)
+    kind = ADDRESS_OF
+    fields = __slots__
+
+    def __init__(self, operand, lineno=0):
+        self.operand = operand
+        self.lineno = lineno
+
+
+class Index(Node):
+    """v[i]; index é None em v[]."""
+    __slots__ = ("base", "index")
+    kind = INDEX
+    fields = __slots__
+
+    def __init__(self, base, index, lineno=0):
+        self.base = base
+        self.index = index
+        self.lineno = lineno
+
+
+class FunctionCall(Node):
+    __slots__ = ("name", "args")
+    kind = FUNCTION_CALL
+    fields = __slots__
+
+    def __init__(self, name, args, lineno=0):
+        self.name = name
+        self.args = args  # Lista de expressões
+        self.lineno = lineno
+
+
+class Comma(Node):
+    """Operador vírgula fora de uma lista de argumentos: (a, b)."""
+    __slots__ = ("left", "right")
+    kind = COMMA
+    fields = __slots__
+
+    def __init__(self, left, right, lineno=0):
+        self.left = left
+        self.right = right
+        self.lineno = lineno
+
+
+NODE_CLASSES = {cls.kind: cls for cls in (
+    Declaration, VectorDeclaration, FunctionDeclaration, Parameter, Block, ExprStmt, If, While,
+    DoWhile, For, Return, Comment, Directive, Name, Literal, BinaryOp, Comparison, LogicalAnd,
+    Assign, UnaryOp, Deref, AddressOf, Index, FunctionCall, Comma)}
+KIND_NAMES = {kind: cls.__name__ for kind, cls in NODE_CLASSES.items()}
+
+
+class _Text(str):
+    """Trecho já formatado na pilha de format_tree."""
+
+
+def format_tree(tree):
+    """repr de uma árvore sem recursão: Declaration(type='int', name='x', ...).
+
+    A linha fica de fora, para que o texto identifique apenas o conteúdo do nó
+    (cache_incremental usa o repr de cada função na chave)."""
+    parts = []
+    pending = [tree]
+    while pending:
+        item = pending.pop()
+        if isinstance(item, _Text):
+            parts.append(item)
+        elif isinstance(item, Node):
+            pending.append(_Text(")"))
+            for i in range(len(item.fields) - 1, -1, -1):
+                name = item.fields[i]
+                pending.append(getattr(item, name))
+                pending.append(_Text(f"{', ' if i else ''}{name}="))
+            pending.append(_Text(f"{KIND_NAMES[item.kind]}("))
+        elif isinstance(item, list):
+            pending.append(_Text("]"))
+            for i in range(len(item) - 1, -1, -1):
+                pending.append(item[i])
+                if i:
+                    pending.append(_Text(", "))
+            pending.append(_Text("["))
+        else:
+            parts.append(repr(item))
+    return "".join(parts)
+
+
+def children(node):
+    """Filhos diretos de um nó ou de uma lista de comandos (nós, na ordem dos campos)."""
+    if isinstance(node, list):
+        return [item for item in node if isinstance(item, Node)]
+    result = []
+    for name in node.fields:
+        value = getattr(node, name)
+        if isinstance(value, Node):
+            result.append(value)
+        elif isinstance(value, list):
+            result.extend(item for item in value if isinstance(item, Node))
+    return result
+
+
+def walk(tree):
+    """Percorre todos os nós (pré-ordem) sem recursão."""
+    pending = [tree]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, Node):
+            yield node
+        pending.extend(reversed(children(node)))
+
+
+def _each(items):
+    for item in items:
+        yield item
+
+
+def drive(root, handlers, trace=None):
+    """Avalia root (um nó ou uma lista de nós) sem recursão.
+
+    handlers é a tabela indexada pelo kind; handlers[kind](node) devolve o
+    resultado do nó ou um gerador. O gerador entrega com yield cada filho a
+    avaliar (um nó ou uma lista, avaliada item a item) e recebe de volta o
+    resultado dele; o seu valor de return é o resultado do nó. Os geradores
+    pendentes ficam em uma pilha, e uma exceção em um filho é lançada no gerador
+    do pai, para que os blocos finally das fases continuem valendo. trace, se
+    dado, é chamado com cada nó antes de avaliá-lo."""
+    if type(root) is list:
+        value = _each(root)
+    else:
+        if trace is not None:
+            trace(root)
+        value = handlers[root.kind](root)
+    if type(value) is not GeneratorType:
+        return value
+    stack = [value]
+    value = error = None
+    while stack:
+        try:
+            if error is None:
+                child = stack[-1].send(value)
+            else:
+                pending, error = error, None
+                child = stack[-1].throw(pending)
+        except StopIteration as stop:
+            stack.pop()
+            value = stop.value
+            continue
+        except BaseException as e:
+            stack.pop()
+            if not stack:
+                raise
+            error = e
+            continue
+        try:
+            if type(child) is list:
+                value = _each(child)
+            else:
+                if trace is not None:
+                    trace(child)
+                value = handlers[child.kind](child)
+        except BaseException as e:
+            error = e
+            continue
+        if type(value) is GeneratorType:
+            stack.append(value)
+            value = None
+    return value
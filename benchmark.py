@@ -0,0 +1,218 @@
+"""Benchmark de escala do compilador com programas gerados por gerador_programas.py.
+
+Para cada eixo (funcoes, profundidade, comandos, vetor) e cada tamanho de entrada,
+compila um programa sintético e mede o tempo de cada fase do pipeline do main.py.
+Depois verifica o crescimento: a inclinação de log(tempo) x log(tamanho) deve ficar
+perto de 1 (linear); acima do limite, a fase tem comportamento superlinear.
+
+Os resultados podem ser gravados como referência (--salvar-referencia) e comparados
+nas execuções seguintes: fases mais lentas que a referência além da tolerância,
+inclinações acima do limite (e piores que as da referência) ou entradas que
+passaram a falhar são regressões, e o script termina com código 1.
+
+    python benchmark.py                                  # 1K, 10K e 100K
+    python benchmark.py --tamanhos 1K,1M,10M,100M --eixos funcoes
+    python benchmark.py --salvar-referencia
+"""
+import argparse
+import json
+import math
+import os
+import sys
+
+import gerador_programas
+import rastreamento
+from compilador import Compiler
+from estatisticas import Estatisticas, PHASES
+
+SCHEMA_VERSION = 1
+REFERENCIA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_referencia.json")
+
+_SUFIXOS = {"K": 1000, "M": 1000 ** 2, "G": 1000 ** 3}
+
+# Tempos menores que isso são dominados por ruído e não entram nas comparações
+TEMPO_MINIMO = 0.005
+# Para a inclinação basta um limite menor: o erro relativo se dilui no ajuste log-log
+TEMPO_MINIMO_INCLINACAO = 0.001
+
+# Quanto a inclinação de uma fase pode variar em relação à referência sem ser regressão
+MARGEM_INCLINACAO = 0.2
+
+
+def ler_tamanho(texto):
+    """Converte '100K', '10M' etc. em bytes."""
+    texto = texto.strip().upper()
+    if texto and texto[-1] in _SUFIXOS:
+        return int(float(texto[:-1]) * _SUFIXOS[texto[-1]])
+    return int(texto)
+
+
+def formatar_tamanho(tamanho):
+    for sufixo, fator in sorted(_SUFIXOS.items(), key=lambda item: -item[1]):
+        if tamanho >= fator and tamanho % fator == 0:
+            return f"{tamanho // fator}{sufixo}"
+    return str(tamanho)
+
+
+def compilar_medindo(codigo):
+    """Compila o código como o main.py e devolve o Estatisticas (fases e contadores)."""
+    stats = Estatisticas()
+    compiler = Compiler(stats)
+    tokens = compiler.lex(codigo)
+    ast = compiler.parse(tokens)
+    try:
+        compiler.analyze(ast)
+    except RuntimeError:
+        pass  # Erros semânticos não interrompem o pipeline do main.py
+    intermediate_code = compiler.generate_intermediate(ast)
+    compiler.to_mips(intermediate_code)
+    return stats
+
+
+def medir(eixo, tamanho, repeticoes, semente=0):
+    """Mede um ponto (eixo, tamanho); guarda o menor tempo de cada fase entre as repetições."""
+    codigo = gerador_programas.gerar_por_tamanho(tamanho, eixo, semente)
+    ponto = {"bytes": len(codigo), "phases": None, "counters": None, "error": None}
+    melhores = dict.fromkeys(PHASES, math.inf)
+    for _ in range(repeticoes):
+        try:
+            stats = compilar_medindo(codigo)
+        except (Exception, RecursionError) as e:
+            ponto["error"] = type(e).__name__
+            return ponto
+        for fase, (parede, _cpu) in stats.phases.items():
+            melhores[fase] = min(melhores[fase], parede)
+    ponto["phases"] = {fase: round(tempo, 6) for fase, tempo in melhores.items()}
+    ponto["counters"] = dict(stats.counters)
+    return ponto
+
+
+def inclinacao(pontos, fase):
+    """Inclinação de log(tempo) x log(bytes) da fase entre os dois maiores pontos, ou None.
+
+    Nos pontos menores o custo fixo (e o ruído) domina; o crescimento que interessa
+    é o das entradas grandes."""
+    validos = [(ponto["bytes"], ponto["phases"][fase]) for ponto in pontos
+               if ponto["error"] is None and ponto["phases"][fase] >= TEMPO_MINIMO_INCLINACAO]
+    if len(validos) < 2:
+        return None
+    (b1, t1), (b2, t2) = sorted(validos)[-2:]
+    if b1 == b2:
+        return None
+    return math.log(t2 / t1) / math.log(b2 / b1)
+
+
+def executar(eixos, tamanhos, repeticoes):
+    resultados = {"schema_version": SCHEMA_VERSION, "eixos": {}}
+    for eixo in eixos:
+        pontos = {}
+        for tamanho in tamanhos:
+            ponto = medir(eixo, tamanho, repeticoes)
+            pontos[formatar_tamanho(tamanho)] = ponto
+            if ponto["error"]:
+                print(f"  {eixo:<12} {formatar_tamanho(tamanho):>6}  {ponto['bytes']:>11} bytes  ERRO: {ponto['error']}")
+            else:
+                total = sum(ponto["phases"].values())
+                fases = "  ".join(f"{fase}: {tempo * 1000:.1f}" for fase, tempo in ponto["phases"].items())
+                print(f"  {eixo:<12} {formatar_tamanho(tamanho):>6}  {ponto['bytes']:>11} bytes  "
+                      f"total: {total * 1000:9.1f} ms  ({fases} ms)")
+        inclinacoes = {fase: inclinacao(pontos.values(), fase) for fase in PHASES}
+        resultados["eixos"][eixo] = {
+            "pontos": pontos,
+            "inclinacoes": {fase: None if v is None else round(v, 3) for fase, v in inclinacoes.items()},
+        }
+    return resultados
+
+
+def verificar(resultados, referencia, limite, tolerancia):
+    """Lista as regressões: crescimento superlinear, lentidão ou falhas novas."""
+    problemas = []
+    for eixo, dados in resultados["eixos"].items():
+        ref_eixo = (referencia or {}).get("eixos", {}).get(eixo)
+        for fase, valor in dados["inclinacoes"].items():
+            if valor is None or valor <= limite:
+                continue
+            # Um crescimento superlinear já registrado na referência só falha se piorar
+            anterior = ref_eixo["inclinacoes"].get(fase) if ref_eixo else None
+            if anterior is None or valor > anterior + MARGEM_INCLINACAO:
+                problemas.append(f"{eixo}/{fase}: crescimento superlinear (inclinação {valor:.2f} > {limite})")
+        if ref_eixo is None:
+            continue
+        for nome, ponto in dados["pontos"].items():
+            ref = ref_eixo["pontos"].get(nome)
+            if ref is None:
+                continue
+            if ponto["error"] and not ref["error"]:
+                problemas.append(f"{eixo}/{nome}: passou a falhar ({ponto['error']})")
+            if ponto["error"] or ref["error"]:
+                continue
+            for fase, tempo in ponto["phases"].items():
+                anterior = ref["phases"].get(fase)
+                if anterior is None:
+                    continue  # Fase nova, sem medida na referência
+                if anterior >= TEMPO_MINIMO and tempo > anterior * tolerancia:
+                    problemas.append(f"{eixo}/{nome}/{fase}: {tempo * 1000:.1f} ms, "
+                                     f"referência {anterior * 1000:.1f} ms (> {tolerancia}x)")
+    return problemas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de escala das fases do compilador.")
+    parser.add_argument("--tamanhos", default="1K,10K,100K",
+                        help="tamanhos das entradas, separados por vírgula (aceita K e M; até 100M)")
+    parser.add_argument("--eixos", default=",".join(gerador_programas.EIXOS),
+                        help="eixos que crescem, separados por vírgula")
+    parser.add_argument("--repeticoes", type=int, default=3, help="repetições por ponto (vale a menor)")
+    parser.add_argument("--limite-inclinacao", type=float, default=1.3,
+                        help="inclinação log-log máxima aceita para uma fase (padrão: 1.3)")
+    parser.add_argument("--tolerancia", type=float, default=2.0,
+                        help="quantas vezes uma fase pode ficar mais lenta que a referência (padrão: 2.0)")
+    parser.add_argument("--referencia", default=REFERENCIA, help="arquivo JSON com os tempos de referência")
+    parser.add_argument("--salvar-referencia", action="store_true",
+                        help="grava os resultados desta execução como nova referência")
+    args = parser.parse_args(argv)
+
+    eixos = [e.strip() for e in args.eixos.split(",") if e.strip()]
+    for eixo in eixos:
+        if eixo not in gerador_programas.EIXOS:
+            parser.error(f"eixo desconhecido: {eixo}")
+    tamanhos = [ler_tamanho(t) for t in args.tamanhos.split(",") if t.strip()]
+
+    # Erros semânticos dos programas gerados não interessam aqui
+    rastreamento.configurar(rastreamento.ERRO)
+    rastreamento.saida = open(os.devnull, "w", encoding="utf-8")
+
+    print("--- Benchmark do Compilador ---")
+    resultados = executar(eixos, tamanhos, args.repeticoes)
+    print("Inclinações log(tempo) x log(tamanho):")
+    for eixo, dados in resultados["eixos"].items():
+        texto = "  ".join(f"{fase}: {'-' if v is None else f'{v:.2f}'}" for fase, v in dados["inclinacoes"].items())
+        print(f"  {eixo:<12} {texto}")
+
+    if args.salvar_referencia:
+        with open(args.referencia, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Referência salva em {args.referencia}.")
+        return 0
+
+    referencia = None
+    if os.path.exists(args.referencia):
+        with open(args.referencia, encoding="utf-8") as f:
+            referencia = json.load(f)
+        if referencia.get("schema_version") != SCHEMA_VERSION:
+            print("Referência em formato antigo; apenas o crescimento será verificado.")
+            referencia = None
+
+    problemas = verificar(resultados, referencia, args.limite_inclinacao, args.tolerancia)
+    if problemas:
+        print("REGRESSÕES ENCONTRADAS:")
+        for problema in problemas:
+            print(f"  {problema}")
+        return 1
+    print("Nenhuma regressão encontrada.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
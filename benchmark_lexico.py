@@ -0,0 +1,163 @@
+"""Benchmark de vazão do analisador léxico (tokens/segundo).
+
+Compara o analisador léxico atual (tabela de palavras reservadas + expressão
+mestre) com o analisador léxico anterior, baseado nas regras t_* do PLY, sobre
+cópias de um arquivo C concatenadas até atingir alguns megabytes.
+
+Uso: python benchmark_lexico.py [arquivo.c] [--tamanhos 1 4 16] [--repeticoes 3]
+"""
+import argparse
+import time
+
+import ply.lex as lex
+
+import analisador_lexico
+
+
+class LexicoPLY:
+    """Regras do analisador léxico anterior, mantidas aqui apenas como referência."""
+    tokens = analisador_lexico.tokens
+
+    # Regras para tokens
+    t_COMMENT = r'//.*|/\*.*?\*/'
+    t_COLON = r':'
+    t_HASH = r'\#.*'
+    t_DOT = r'\.'
+    t_ASSIGN = r'='
+    t_PLUS = r'\+'
+    t_MINUS = r'-'
+    t_TIMES = r'\*'
+    t_DIVIDE = r'/'
+    t_MOD = r'%'
+    t_POW = r'\^'
+    t_LT = r'<'
+    t_GT = r'>'
+    t_LE = r'<='
+    t_GE = r'>='
+    t_EQ = r'=='
+    t_NE = r'!='
+    t_TYPEDEF = r'typedef'
+    t_LPAREN = r'\('
+    t_RPAREN = r'\)'
+    t_LBRACE = r'\{'
+    t_RBRACE = r'\}'
+    t_LBRACK = r'\['
+    t_RBRACK = r'\]'
+    t_COMMA = r','
+    t_SEMICOLON = r';'
+    t_STRING = r'"([^"\\]*(\\.[^"\\]*)*)"'
+    t_NUMBER = r'\d+'
+    t_AMPERSAND = r'&'
+    t_AND = r'&&'
+    t_PIPE = r'\|'
+    t_OR = r'\|\|'
+    t_CHARACTER = r"'([^'\\]*(\\.[^'\\]*)*)'"
+    t_INT = r'int'
+    t_FLOAT = r'float'
+    t_VOID = r'void'
+    t_CHAR = r'char'
+    t_DOUBLE = r'double'
+    t_POINTER = r'\*'
+    t_TYPE = r'int|float|void|char|double'
+    t_PLUS_PLUS = r'\+\+'
+    t_MINUS_MINUS = r'--'
+    t_PLUS_EQUAL = r'\+='
+    t_MINUS_EQUAL = r'-='
+    # Contador de linha
+    def t_newline(self, t):
+        r'\n+'
+        t.lexer.lineno += len(t.value)
+
+
+    # Ignorar espaços em branco e tabulações
+    t_ignore = r' \t'
+
+
+    # Regra para identificadores
+    t_ID = r'[a-zA-Z_][a-zA-Z0-9_]*'
+
+    def t_RETURN(self, t):
+        r'return'
+        return t
+
+    def t_IF(self, t):
+        r'if'
+        return t
+
+    def t_ELSE(self, t):
+        r'else'
+        return t
+
+    def t_SWITCH(self, t):
+        r'switch'
+        return t
+
+    def t_FOR(self, t):
+        r'for'
+        return t
+
+    def t_WHILE(self, t):
+        r'while'
+        return t
+
+    def t_DO(self, t):
+        r'do'
+        return t
+
+
+    # Erros de caracteres ilegais
+    def t_error(self, t):
+        print(f"Caractere ilegal '{t.value[0]}' na linha {t.lexer.lineno}")
+        t.lexer.skip(1)
+
+
+def gerar_entrada(modelo, megabytes):
+    """Repete o código modelo até atingir o tamanho pedido (em MB)."""
+    alvo = int(megabytes * 1024 * 1024)
+    repeticoes = max(1, alvo // max(1, len(modelo.encode("utf-8"))))
+    return (modelo.rstrip("\n") + "\n") * repeticoes
+
+
+def medir_ply(lexer, data):
+    lexer.lineno = 1
+    lexer.input(data)
+    inicio = time.perf_counter()
+    total = 0
+    for _ in iter(lexer.token, None):
+        total += 1
+    return total, time.perf_counter() - inicio
+
+
+def medir_atual(data):
+    inicio = time.perf_counter()
+    total = len(analisador_lexico.tokenize(data))
+    return total, time.perf_counter() - inicio
+
+
+def melhor_de(repeticoes, medicao, *args):
+    resultados = [medicao(*args) for _ in range(repeticoes)]
+    return min(resultados, key=lambda r: r[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("arquivo", nargs="?", default="quick_sort.c")
+    parser.add_argument("--tamanhos", nargs="+", type=float, default=[1, 4, 16],
+                        help="tamanhos das entradas em MB")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(args.arquivo, "r", encoding="utf-8") as f:
+        modelo = f.read()
+
+    lexer_ply = lex.lex(module=LexicoPLY(), errorlog=lex.NullLogger())
+    print(f"{'MB':>6} {'lexer':>8} {'tokens':>10} {'tempo (s)':>10} {'tokens/s':>12}")
+    for megabytes in args.tamanhos:
+        data = gerar_entrada(modelo, megabytes)
+        for nome, medicao, extra in (("ply", medir_ply, (lexer_ply,)), ("atual", medir_atual, ())):
+            total, tempo = melhor_de(args.repeticoes, medicao, *extra, data)
+            print(f"{megabytes:>6g} {nome:>8} {total:>10} {tempo:>10.3f} {total / tempo:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Cache em disco do código intermediário e MIPS de cada função (recompilação incremental).
+
+A chave de uma função é o sha256 da sua subárvore na AST, das declarações globais
+que ela referencia (e se cada uma vem antes ou depois dela) e da versão do compilador (um hash do código das fases que
+produzem a AST, o intermediário e o MIPS). Cada entrada guarda o intermediário
+já otimizado (os códigos das operações e os operandos) e o MIPS da função com
+rótulos numerados a partir de L1; ao montar o programa, os rótulos são
+renumerados para continuar a sequência do arquivo. Assim, quando uma função
+muda, só ela é gerada de novo e o resto vem do cache.
+
+O código de uma função não depende do que vem antes dela: os temporários recomeçam
+em cada função (geradorIntermediario) e o alocador de registradores começa vazio
+em cada uma (ParaMips). Por isso a saída com cache é idêntica à saída sem cache.
+"""
+import hashlib
+import json
+import os
+import re
+
+import ParaMips as pmips
+import arvore_sintatica as ast_nodes
+import otimizacao
+from codigo_intermediario import IntermediateCode
+
+DIRETORIO_PADRAO = ".cache_compilador"
+
+# Módulos cujo código determina o conteúdo das entradas do cache
+_MODULOS_VERSAO = ("analisador_lexico.py", "analisador_sintatico.py", "arvore_sintatica.py",
+                   "analisador_semantico.py", "symbol_table.py", "geradorIntermediario.py",
+                   "codigo_intermediario.py", "grafo_fluxo.py", "otimizacao.py", "ParaMips.py",
+                   "cache_incremental.py")
+
+# Rótulo Ln do MIPS em uma definição (Ln:) ou no fim de um desvio (j Ln, beq ..., Ln)
+_ROTULO = re.compile(r"(^|goto |j |, )L(\d+)(:?)$")
+
+_versao = None
+
+
+def versao_compilador():
+    """Hash do código-fonte das fases do compilador; muda a cada alteração delas."""
+    global _versao
+    if _versao is None:
+        h = hashlib.sha256()
+        base = os.path.dirname(os.path.abspath(__file__))
+        for nome in _MODULOS_VERSAO:
+            with open(os.path.join(base, nome), "rb") as f:
+                h.update(nome.encode() + b"\0" + f.read())
+        _versao = h.hexdigest()
+    return _versao
+
+
+def renumerar_rotulos(linhas, deslocamento):
+    """Soma o deslocamento ao número de cada rótulo Ln das linhas do MIPS."""
+    if not deslocamento:
+        return list(linhas)
+    trocar = lambda m: f"{m.group(1)}L{int(m.group(2)) + deslocamento}{m.group(3)}"
+    return [_ROTULO.sub(trocar, linha) for linha in linhas]
+
+
+def _instrucoes(entrada):
+    """Intermediário guardado em uma entrada do cache."""
+    instrucoes = IntermediateCode()
+    instrucoes.ops.extend(entrada["ops"])
+    instrucoes.operands = entrada["operands"]
+    return instrucoes
+
+
+def _nome_declarado(node):
+    """Nome definido por uma declaração global, ou None."""
+    if node.kind in (ast_nodes.DECLARATION, ast_nodes.VECTOR_DECLARATION):
+        return node.name
+    return None
+
+
+def _identificadores(node):
+    """Todas as strings (nomes e literais) dos campos de uma subárvore, sem recursão."""
+    nomes = set()
+    for atual in ast_nodes.walk(node):
+        for campo in atual.fields:
+            valor = getattr(atual, campo)
+            if isinstance(valor, str):
+                nomes.add(valor)
+    return nomes
+
+
+class CacheIncremental:
+    """Cache de fragmentos por função, guardado em um diretório (um arquivo JSON por chave)."""
+
+    def __init__(self, diretorio=DIRETORIO_PADRAO):
+        self.diretorio = diretorio
+        self.hits = 0
+        self.misses = 0
+
+    def chave(self, funcao, globais, posicao):
+        """Chave da função: subárvore, declarações globais que ela usa e versão do compilador.
+
+        posicao é quantas das globais vêm antes da função. Cada dependência entra na
+        chave marcada como anterior ou posterior a ela: uma local que esconde uma global
+        declarada antes ganha outro nome no intermediário (x.1, analisador_semantico)."""
+        usados = _identificadores(funcao)
+        dependencias = [(i < posicao, g) for i, g in enumerate(globais) if _nome_declarado(g) in usados]
+        h = hashlib.sha256()
+        h.update(versao_compilador().encode())
+        h.update(repr(funcao).encode())
+        h.update(repr(dependencias).encode())
+        return h.hexdigest()
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, chave[:2], chave + ".json")
+
+    def ler(self, chave):
+        try:
+            with open(self._caminho(chave), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def gravar(self, chave, entrada):
+        caminho = self._caminho(chave)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        # Arquivo temporário + rename: processos do modo em lote podem gravar a mesma chave
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(entrada, f)
+        os.replace(temporario, caminho)
+
+    def generate_intermediate(self, generator, ast, otimizacoes):
+        """Gera o código intermediário do programa, reaproveitando as funções em cache.
+
+        Cada função gerada é otimizada (otimizacao.optimize_function) antes de ir
+        para o cache; os contadores das otimizações, gravados na entrada, são
+        somados em otimizacoes também nos acertos.
+
+        Devolve o intermediário (IntermediateCode) e o plano usado por to_mips: a
+        lista dos trechos do programa, cada um ("global", instruções) ou ("funcao",
+        chave, entrada, instruções da entrada, deslocamento dos rótulos)."""
+        generator.intermediate_code = codigo = IntermediateCode()
+        generator.temp_counter = 0
+        generator.label_counter = 0
+        generator.temp_total = 0
+        generator.constants = {}
+        generator.folded_total = 0
+        generator.branches_removed = 0
+        nodes = ast if isinstance(ast, list) else [ast]
+        globais = [node for node in nodes if _nome_declarado(node) is not None]
+        plano = []
+        anteriores = 0  # Globais declaradas antes do nó atual
+        for node in nodes:
+            if node.kind != ast_nodes.FUNCTION_DECLARATION:
+                if _nome_declarado(node) is not None:
+                    anteriores += 1
+                inicio = len(codigo)
+                generator.generate_code(node)
+                plano.append(("global", codigo.slice(inicio)))
+                continue
+            chave = self.chave(node, globais, anteriores)
+            entrada = self.ler(chave)
+            if entrada is None:
+                self.misses += 1
+                entrada = self._gerar_funcao(generator, node)
+            else:
+                self.hits += 1
+                generator.temp_total += entrada["temps"]
+                generator.folded_total += entrada["folded"]
+                generator.branches_removed += entrada["branches_removed"]
+            for nome, valor in entrada["optimizations"].items():
+                otimizacoes[nome] += valor
+            deslocamento = generator.label_counter
+            generator.label_counter += entrada["labels"]
+            instrucoes = _instrucoes(entrada)
+            codigo.extend(instrucoes.relabeled(deslocamento))
+            plano.append(("funcao", chave, entrada, instrucoes, deslocamento))
+        return codigo, plano
+
+    def _gerar_funcao(self, generator, node):
+        """Gera o intermediário otimizado da função isolada, com rótulos a partir de L1."""
+        codigo, rotulos = generator.intermediate_code, generator.label_counter
+        generator.intermediate_code = funcao = IntermediateCode()
+        generator.label_counter = 0
+        temps, folded, branches = generator.temp_total, generator.folded_total, generator.branches_removed
+        try:
+            generator.generate_code(node)
+            otimizacoes = otimizacao.new_counts()
+            funcao = otimizacao.optimize_function(funcao, otimizacoes)
+            return {"ops": list(funcao.ops), "operands": funcao.operands, "labels": generator.label_counter,
+                    "temps": generator.temp_total - temps, "folded": generator.folded_total - folded,
+                    "branches_removed": generator.branches_removed - branches,
+                    "optimizations": otimizacoes, "mips": None, "spills": 0}
+        finally:
+            generator.intermediate_code, generator.label_counter = codigo, rotulos
+
+    def to_mips(self, converter, plano):
+        """Converte o programa para MIPS; funções com MIPS em cache não são convertidas."""
+        converter.reset()
+        for trecho in plano:
+            if trecho[0] == "global":
+                converter.convert(trecho[1])
+                continue
+            _, chave, entrada, instrucoes, deslocamento = trecho
+            if entrada["mips"] is None:
+                # A função começa com os registradores livres (ParaMips), então o MIPS
+                # gerado isoladamente é o mesmo que seria gerado no meio do programa
+                isolado = pmips.MipsConverter()
+                isolado.reset()
+                isolado.convert(instrucoes)
+                entrada["mips"] = isolado.mips_code
+                entrada["spills"] = isolado.spill_count
+                self.gravar(chave, entrada)
+            converter.mips_code.extend(renumerar_rotulos(entrada["mips"], deslocamento))
+            converter.spill_count += entrada["spills"]
+        return "\n".join(converter.mips_code)
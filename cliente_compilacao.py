@@ -0,0 +1,144 @@
+"""Cliente do servidor de compilação, com a mesma linha de comando do main.py.
+
+    python cliente_compilacao.py [-q] [--cache [DIR]] [--stats] [--stats-json [ARQUIVO]] arquivos...
+
+Os arquivos são compilados pelo servidor_compilacao.py (que precisa estar rodando)
+e o cliente reproduz a saída do main.py. O módulo só importa a biblioteca padrão,
+para que a partida do cliente seja rápida; o modo em lote importa o main.py para
+listar diretórios e imprimir o resumo.
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+import time
+
+import protocolo_compilacao as protocolo
+
+ERRO, DEBUG = 0, 2  # Níveis de rastreamento.py
+
+
+class ClienteCompilacao:
+    """Conexão com o servidor; vários pedidos podem ser enviados antes das respostas."""
+
+    def __init__(self, caminho=None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(caminho or protocolo.socket_padrao())
+        self._proximo_id = 0
+
+    def enviar(self, pedido):
+        """Envia o pedido e devolve o id atribuído a ele."""
+        self._proximo_id += 1
+        pedido = dict(pedido, id=self._proximo_id)
+        self.sock.sendall(protocolo.codificar(pedido))
+        return self._proximo_id
+
+    def _ler_exato(self, tamanho):
+        partes = []
+        while tamanho:
+            parte = self.sock.recv(min(tamanho, 1 << 20))
+            if not parte:
+                raise ConnectionError("O servidor fechou a conexão.")
+            partes.append(parte)
+            tamanho -= len(parte)
+        return b"".join(partes)
+
+    def receber(self):
+        tamanho = protocolo.decodificar_tamanho(self._ler_exato(protocolo.TAMANHO_CABECALHO))
+        return protocolo.decodificar(self._ler_exato(tamanho))
+
+    def pedir(self, pedido):
+        """Envia um pedido e espera a resposta dele."""
+        self.enviar(pedido)
+        return self.receber()
+
+    def compilar_varios(self, pedidos):
+        """Envia todos os pedidos e devolve as respostas na ordem dos pedidos."""
+        ids = [self.enviar(pedido) for pedido in pedidos]
+        respostas = {}
+        while len(respostas) < len(ids):
+            resposta = self.receber()
+            respostas[resposta["id"]] = resposta
+        return [respostas[i] for i in ids]
+
+    def close(self):
+        self.sock.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compila arquivos C usando o servidor de compilação.")
+    parser.add_argument("arquivos", nargs="+",
+                        help="arquivos .c ou diretórios (vários arquivos ativam o modo em lote)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="aceito por compatibilidade com o main.py; os processos são os do servidor")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="modo de produção: grava apenas o .asm e mostra apenas erros")
+    parser.add_argument("--cache", nargs="?", const=".cache_compilador", metavar="DIRETORIO",
+                        help="reaproveita o código das funções que não mudaram (padrão: .cache_compilador)")
+    parser.add_argument("--stats", action="store_true",
+                        help="mostra o tempo de cada fase e os contadores da compilação")
+    parser.add_argument("--stats-json", nargs="?", const="-", metavar="ARQUIVO",
+                        help="grava as estatísticas em JSON no arquivo (ou na saída padrão)")
+    parser.add_argument("--socket", default=None, help="caminho do socket do servidor")
+    args = parser.parse_args(argv)
+
+    try:
+        cliente = ClienteCompilacao(args.socket)
+    except OSError as e:
+        print(f"Servidor de compilação indisponível: {e}", file=sys.stderr)
+        return 2
+    try:
+        if len(args.arquivos) == 1 and not os.path.isdir(args.arquivos[0]):
+            return _compilar_um(cliente, args)
+        if args.stats or args.stats_json:
+            parser.error("--stats e --stats-json só valem para a compilação de um único arquivo")
+        return _compilar_lote(cliente, args)
+    finally:
+        cliente.close()
+
+
+def _cache(args):
+    """O servidor roda em outro diretório: o cache é passado com caminho absoluto."""
+    return os.path.abspath(args.cache) if args.cache else None
+
+
+def _compilar_um(cliente, args):
+    resposta = cliente.pedir({"op": "compilar", "path": os.path.abspath(args.arquivos[0]),
+                              "nivel": ERRO if args.quiet else DEBUG,
+                              "stats": bool(args.stats or args.stats_json), "cache": _cache(args)})
+    sys.stdout.write(resposta["saida"])
+    if not resposta["ok"]:
+        print(resposta["erro"], file=sys.stderr)
+        return 1
+    if args.stats:
+        print(resposta["stats_relatorio"])
+    if args.stats_json:
+        texto = json.dumps(resposta["stats"], indent=2, sort_keys=True, ensure_ascii=False)
+        if args.stats_json == "-":
+            print(texto)
+        else:
+            with open(args.stats_json, "w", encoding="utf-8") as f:
+                f.write(texto + "\n")
+    return 0
+
+
+def _compilar_lote(cliente, args):
+    from main import imprimir_resumo, listar_entradas
+
+    arquivos = listar_entradas(args.arquivos)
+    inicio = time.perf_counter()
+    respostas = cliente.compilar_varios({"op": "compilar", "path": os.path.abspath(name), "cache": _cache(args)}
+                                        for name in arquivos)
+    total = time.perf_counter() - inicio
+    processos = cliente.pedir({"op": "ping"})["processos"]
+    resultados = [(name, resposta["erro"], resposta["tempo"]) for name, resposta in zip(arquivos, respostas)]
+    falhas = imprimir_resumo(resultados, processos, total)
+    if args.cache:
+        print(f"Cache incremental: {sum(r.get('cache_hits', 0) for r in respostas)} acertos, "
+              f"{sum(r.get('cache_misses', 0) for r in respostas)} faltas.")
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
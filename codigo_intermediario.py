@@ -0,0 +1,187 @@
+"""Código intermediário: instruções com um código de operação (Op) e três operandos.
+
+O gerador (geradorIntermediario) emite as instruções em um IntermediateCode, e
+as fases seguintes (ParaMips, cache_incremental, serializacao) as consomem
+diretamente, despachando pelo código da operação. O texto de cada instrução só é
+montado quando pedido (str, render), para os relatórios e o modo detalhado;
+é o mesmo texto que o gerador produzia antes:
+
+    function f(int a) -> int      declare int x          declare int v[10]
+    x = y                         %t1 = a + b            %t2 = a < b
+    %t3 = v[i]                    v[i] = %t3             %t4 = &x     %t5 = &v[i]
+    load p %t6                    store %t6 p            param x      %t7 = call f 1
+    L1:        goto L1            if_false %t1 goto L2   if a >= b goto L3
+    return %t1                    end_function f         directive #include <stdio.h>
+
+Os operandos são textos: nomes de variáveis, temporários (%t1, %t2, ...),
+constantes inteiras (12, -4), literais, rótulos (L1, L2, ...) e, em function,
+declare e directive, o texto da declaração. Operandos que a instrução não usa
+ficam None.
+"""
+from enum import IntEnum
+
+# Prefixo dos temporários criados pelo gerador. % não começa um identificador do C,
+# então um temporário nunca tem o nome de uma variável do programa (nem t1)
+TEMPORARY_PREFIX = "%t"
+
+
+class Op(IntEnum):
+    """Códigos das operações; o comentário mostra o uso dos operandos a, b e c."""
+    FUNCTION = 0  # function a(b) -> c
+    END_FUNCTION = 1  # end_function a
+    DECLARE = 2  # declare a b
+    DECLARE_VECTOR = 3  # declare a b[c]
+    DIRECTIVE = 4  # directive a
+    LABEL = 5  # a:
+    GOTO = 6  # goto a
+    IF_FALSE = 7  # if_false a goto b
+    IF_EQ = 8  # if a == b goto c
+    IF_NE = 9
+    IF_LT = 10
+    IF_LE = 11
+    IF_GT = 12
+    IF_GE = 13
+    COPY = 14  # a = b
+    ADD = 15  # a = b + c
+    SUB = 16
+    MUL = 17
+    DIV = 18
+    MOD = 19
+    AND = 20
+    EQ = 21  # a = b == c
+    NE = 22
+    LT = 23
+    LE = 24
+    GT = 25
+    GE = 26
+    LOAD_INDEX = 27  # a = b[c]
+    STORE_INDEX = 28  # a[b] = c
+    ADDRESS = 29  # a = &b
+    ADDRESS_INDEX = 30  # a = &b[c]
+    LOAD = 31  # load b a (a = *b)
+    STORE = 32  # store b a (*a = b)
+    PARAM = 33  # param a
+    CALL = 34  # a = call b c (c: quantidade de argumentos)
+    RETURN = 35  # return a
+
+
+# Os códigos também como nomes do módulo (codigo_intermediario.COPY): no gerador,
+# que emite uma instrução por vez, o acesso é bem mais rápido que o de Op.COPY
+globals().update(Op.__members__)
+
+# Operação de cada operador binário do C e do && (a = b op c)
+BINARY_OPS = {"+": Op.ADD, "-": Op.SUB, "*": Op.MUL, "/": Op.DIV, "%": Op.MOD, "and": Op.AND,
+              "==": Op.EQ, "!=": Op.NE, "<": Op.LT, "<=": Op.LE, ">": Op.GT, ">=": Op.GE}
+
+# Desvio condicional de cada comparação (if a op b goto c)
+BRANCH_OPS = {"==": Op.IF_EQ, "!=": Op.IF_NE, "<": Op.IF_LT, "<=": Op.IF_LE,
+              ">": Op.IF_GT, ">=": Op.IF_GE}
+
+OPERATORS = {op: text for text, op in BINARY_OPS.items()}
+OPERATORS.update({op: text for text, op in BRANCH_OPS.items()})
+
+# Operandos que são rótulos, por operação (índice 0, 1 ou 2 entre a, b e c)
+LABEL_OPERANDS = {Op.LABEL: 0, Op.GOTO: 0, Op.IF_FALSE: 1}
+LABEL_OPERANDS.update((op, 2) for op in BRANCH_OPS.values())
+
+_FORMATS = {
+    Op.FUNCTION: "function {0}({1}) -> {2}",
+    Op.END_FUNCTION: "end_function {0}",
+    Op.DECLARE: "declare {0} {1}",
+    Op.DECLARE_VECTOR: "declare {0} {1}[{2}]",
+    Op.DIRECTIVE: "directive {0}",
+    Op.LABEL: "{0}:",
+    Op.GOTO: "goto {0}",
+    Op.IF_FALSE: "if_false {0} goto {1}",
+    Op.COPY: "{0} = {1}",
+    Op.LOAD_INDEX: "{0} = {1}[{2}]",
+    Op.STORE_INDEX: "{0}[{1}] = {2}",
+    Op.ADDRESS: "{0} = &{1}",
+    Op.ADDRESS_INDEX: "{0} = &{1}[{2}]",
+    Op.LOAD: "load {1} {0}",
+    Op.STORE: "store {1} {0}",
+    Op.PARAM: "param {0}",
+    Op.CALL: "{0} = call {1} {2}",
+    Op.RETURN: "return {0}",
+}
+_FORMATS.update((op, f"{{0}} = {{1}} {text} {{2}}") for text, op in BINARY_OPS.items())
+_FORMATS.update((op, f"if {{0}} {text} {{1}} goto {{2}}") for text, op in BRANCH_OPS.items())
+_FORMATS = [_FORMATS[op] for op in Op]
+
+
+def render(op, a=None, b=None, c=None):
+    """Texto de uma instrução."""
+    return _FORMATS[op].format(a, b, c)
+
+
+class IntermediateCode:
+    """Sequência de instruções em vetores compactos.
+
+    ops (bytearray) guarda o código de cada instrução, um byte por instrução, e
+    operands os três operandos de cada uma, em sequência: os da instrução i estão
+    em operands[3 * i:3 * i + 3]."""
+    __slots__ = ("ops", "operands")
+
+    def __init__(self):
+        self.ops = bytearray()
+        self.operands = []
+
+    def emit(self, op, a=None, b=None, c=None):
+        self.ops.append(op)
+        self.operands += (a, b, c)
+
+    def extend(self, other):
+        self.ops.extend(other.ops)
+        self.operands += other.operands
+
+    def pop(self):
+        """Remove a última instrução."""
+        self.ops.pop()
+        del self.operands[-3:]
+
+    def __len__(self):
+        return len(self.ops)
+
+    def __getitem__(self, index):
+        """(op, a, b, c) da instrução."""
+        if index < 0:
+            index += len(self.ops)
+        operands = self.operands
+        return (Op(self.ops[index]),) + tuple(operands[3 * index:3 * index + 3])
+
+    def __iter__(self):
+        """(op, a, b, c) de cada instrução, na ordem."""
+        operands = iter(self.operands)
+        return zip(self.ops, operands, operands, operands)
+
+    def slice(self, start, end=None):
+        """Cópia das instruções [start, end)."""
+        result = IntermediateCode()
+        result.ops = self.ops[start:end]
+        result.operands = self.operands[3 * start:None if end is None else 3 * end]
+        return result
+
+    def count_instructions(self):
+        """Quantidade de instruções, sem contar os rótulos."""
+        return len(self.ops) - self.ops.count(Op.LABEL)
+
+    def lines(self):
+        """Texto de cada instrução."""
+        formats = _FORMATS
+        return [formats[op].format(a, b, c) for op, a, b, c in self]
+
+    def __str__(self):
+        return "\n".join(self.lines())
+
+    def relabeled(self, offset):
+        """Cópia com offset somado ao número de cada rótulo Ln (cache_incremental)."""
+        result = self.slice(0)
+        if not offset:
+            return result
+        operands = result.operands
+        for i, op in enumerate(self.ops):
+            slot = LABEL_OPERANDS.get(op)
+            if slot is not None:
+                position = 3 * i + slot
+                operands[position] = f"L{int(operands[position][1:]) + offset}"
+        return result
@@ -0,0 +1,157 @@
+from contextlib import nullcontext
+
+import analisador_lexico as lex
+import analisador_sintatico as sin
+import analisador_semantico as sem
+import geradorIntermediario as gi
+import otimizacao
+import ParaMips as pmips
+import serializacao
+
+
+class CompilationResult:
+    """Artefatos produzidos por uma compilação completa."""
+
+    def __init__(self, tokens, ast, symbol_table, errors, intermediate_code, mips_code):
+        self.tokens = tokens
+        self.ast = ast
+        self.symbol_table = symbol_table
+        self.errors = errors  # Erros semânticos coletados pelo analisador
+        self.intermediate_code = intermediate_code
+        self.mips_code = mips_code
+
+
+class Compiler:
+    """Pipeline do compilador (léxico → sintático → semântico → intermediário →
+    otimização → MIPS).
+
+    Todo o estado de uma compilação fica na instância: o parser próprio (que
+    compartilha apenas as tabelas LALR, somente leitura), o analisador semântico,
+    o gerador de código intermediário e o conversor MIPS da última compilação.
+    Instâncias diferentes podem compilar ao mesmo tempo em threads distintas.
+
+    Com stats (um estatisticas.Estatisticas), cada fase é cronometrada e os
+    contadores da compilação são registrados nele. Com cache (um
+    cache_incremental.CacheIncremental), o intermediário e o MIPS das funções
+    que não mudaram vêm do cache."""
+
+    def __init__(self, stats=None, cache=None):
+        self.parser = sin.new_parser()
+        self.stats = stats
+        self.cache = cache  # cache_incremental.CacheIncremental, ou None
+        self._plano_cache = None  # Trechos do último intermediário gerado com o cache
+        self.semantic_analyzer = None
+        self.intermediate_generator = None
+        self.optimization_counts = None  # Contadores de otimizacao da última geração
+        self.mips_converter = None
+
+    def _fase(self, nome):
+        return self.stats.medir(nome) if self.stats is not None else nullcontext()
+
+    def lex(self, source, show=0):
+        """Gera os tokens do código (texto ou os.PathLike); show != 0 imprime os tokens."""
+        if self.stats is None:
+            return lex.process_code(source, show)
+        with self._fase("lexing"):
+            tokens = lex.process_code(source, 0)
+            # Para um arquivo (TokenStream), contar os tokens é uma análise léxica
+            # completa, sem guardar o texto; o parser faz outra durante o parse
+            count = len(tokens)
+        self.stats.contar("tokens", count)
+        if show != 0:
+            tokens.dump()
+        return tokens
+
+    def parse(self, tokens):
+        with self._fase("parsing"):
+            ast = sin.parse_code(tokens, 0, parser=self.parser)
+        if self.stats is not None:
+            self.stats.contar("ast_nodes", sin.count_nodes(ast))
+        return ast
+
+    def load_ast(self, path):
+        """Lê a AST gravada por serializacao.gravar_ast, no lugar de lex e parse.
+
+        O tempo da leitura conta como o da análise sintática."""
+        with self._fase("parsing"):
+            ast = serializacao.ler_ast(path)
+        if self.stats is not None:
+            self.stats.contar("ast_nodes", sin.count_nodes(ast))
+        return ast
+
+    def analyze(self, ast):
+        """Executa a análise semântica e devolve o analisador (tabela e relatório)."""
+        self.semantic_analyzer = sem.SemanticAnalyzer()
+        try:
+            with self._fase("semantic"):
+                self.semantic_analyzer.analyze(ast)
+        finally:
+            if self.stats is not None:
+                counts = self.semantic_analyzer.symbol_table.symbol_counts()
+                self.stats.symbols_per_scope = counts
+                self.stats.contar("symbols", sum(counts.values()))
+        return self.semantic_analyzer
+
+    def generate_intermediate(self, ast):
+        """Gera o código intermediário da AST já anotada por analyze, já otimizado
+        (otimizacao). Com o cache, cada função é otimizada ao ser gerada, antes de
+        ir para o cache, e o tempo da otimização conta no do intermediário."""
+        self.intermediate_generator = generator = gi.IntermediateCodeGenerator()
+        self.optimization_counts = counts = otimizacao.new_counts()
+        with self._fase("intermediate"):
+            if self.cache is None:
+                code = generator.process_node(ast)
+            else:
+                code, self._plano_cache = self.cache.generate_intermediate(generator, ast, counts)
+        if self.cache is None:
+            with self._fase("optimization"):
+                code = otimizacao.optimize(code, counts)
+        if self.stats is not None:
+            self.stats.contar("ir_instructions", code.count_instructions())
+            self.stats.contar("temporaries", generator.temp_total)
+            self.stats.contar("labels", generator.label_counter)
+            self.stats.contar("constants_folded", generator.folded_total)
+            self.stats.contar("branches_removed", generator.branches_removed)
+            for name, value in counts.items():
+                self.stats.contar(name, value)
+        return code
+
+    def load_intermediate(self, path):
+        """Lê o intermediário gravado por serializacao.gravar_ir, no lugar das fases
+        anteriores. O tempo da leitura conta como o da geração do intermediário."""
+        with self._fase("intermediate"):
+            code = serializacao.ler_ir(path)
+        if self.stats is not None:
+            self.stats.contar("ir_instructions", code.count_instructions())
+        return code
+
+    def to_mips(self, intermediate_code):
+        self.mips_converter = converter = pmips.MipsConverter()
+        with self._fase("mips"):
+            if self._plano_cache is None:
+                code = converter.process_intermediate_to_mips(intermediate_code)
+            else:
+                # O plano corresponde ao intermediário gerado por generate_intermediate
+                code = self.cache.to_mips(converter, self._plano_cache)
+                self._plano_cache = None
+        if self.stats is not None:
+            # Rótulos e comentários não são instruções
+            self.stats.contar("mips_instructions", sum(
+                1 for line in converter.mips_code
+                if line.strip() and not line.strip().startswith("#") and not line.rstrip().endswith(":")))
+            self.stats.contar("register_spills", converter.spill_count)
+            if self.cache is not None:
+                self.stats.contar("cache_hits", self.cache.hits)
+                self.stats.contar("cache_misses", self.cache.misses)
+        return code
+
+    def compile(self, source):
+        """Compila o código (texto ou os.PathLike) e devolve um CompilationResult."""
+        tokens = self.lex(source)
+        ast = self.parse(tokens)
+        analyzer = self.analyze(ast)
+        symbol_table = analyzer.get_all_symbols()
+        intermediate_code = self.generate_intermediate(ast)
+        mips_code = self.to_mips(intermediate_code)
+        return CompilationResult(tokens, ast, symbol_table, analyzer.report["errors"],
+                                 intermediate_code, mips_code)
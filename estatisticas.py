@@ -0,0 +1,83 @@
+"""Tempos por fase e contadores de uma compilação (main.py --stats / --stats-json)."""
+import json
+import time
+from contextlib import contextmanager
+
+# Versão do formato JSON; só muda quando chaves são removidas ou mudam de sentido
+SCHEMA_VERSION = 1
+
+# Fases do pipeline, na ordem em que são executadas
+PHASES = ("lexing", "parsing", "semantic", "intermediate", "optimization", "mips")
+
+# Contadores sempre presentes no JSON (com 0 quando a fase não rodou)
+COUNTERS = ("tokens", "ast_nodes", "symbols", "ir_instructions", "temporaries", "labels",
+            "constants_folded", "branches_removed", "expressions_eliminated",
+            "instructions_removed", "blocks_removed", "mips_instructions", "register_spills",
+            "cache_hits", "cache_misses")
+
+_NOMES_FASES = {
+    "lexing": "Análise léxica",
+    "parsing": "Análise sintática",
+    "semantic": "Análise semântica",
+    "intermediate": "Código intermediário",
+    "optimization": "Otimização",
+    "mips": "Conversão para MIPS",
+}
+
+
+class Estatisticas:
+    """Tempo de parede e de CPU de cada fase, mais os contadores da compilação."""
+
+    def __init__(self, source=None):
+        self.source = source
+        self.phases = {fase: [0.0, 0.0] for fase in PHASES}  # fase -> [parede, cpu]
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.symbols_per_scope = {}
+
+    @contextmanager
+    def medir(self, fase):
+        """Soma ao tempo da fase o tempo gasto dentro do bloco with."""
+        parede, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            tempos = self.phases[fase]
+            tempos[0] += time.perf_counter() - parede
+            tempos[1] += time.process_time() - cpu
+
+    def contar(self, nome, valor):
+        self.counters[nome] = valor
+
+    def as_dict(self):
+        """Estrutura estável usada no JSON: chaves fixas, tempos em segundos."""
+        return {
+            "schema_version": SCHEMA_VERSION,
+            "source": self.source,
+            "phases": {fase: {"wall_s": round(parede, 6), "cpu_s": round(cpu, 6)}
+                       for fase, (parede, cpu) in self.phases.items()},
+            "total": {"wall_s": round(sum(t[0] for t in self.phases.values()), 6),
+                      "cpu_s": round(sum(t[1] for t in self.phases.values()), 6)},
+            "counters": dict(self.counters),
+            "symbols_per_scope": {str(escopo): total for escopo, total in self.symbols_per_scope.items()},
+        }
+
+    def to_json(self):
+        return json.dumps(self.as_dict(), indent=2, sort_keys=True, ensure_ascii=False)
+
+    def report(self):
+        """Relatório legível, no formato das demais tabelas impressas pelo compilador."""
+        linhas = ["--- Estatísticas da Compilação ---"]
+        total_parede = sum(t[0] for t in self.phases.values())
+        for fase, (parede, cpu) in self.phases.items():
+            parcela = 100 * parede / total_parede if total_parede else 0.0
+            linhas.append(f"  {_NOMES_FASES[fase]:<22} parede: {parede * 1000:9.3f} ms  "
+                          f"cpu: {cpu * 1000:9.3f} ms  ({parcela:5.1f}%)")
+        linhas.append(f"  {'Total':<22} parede: {total_parede * 1000:9.3f} ms")
+        linhas.append("Contadores:")
+        for nome, valor in self.counters.items():
+            linhas.append(f"  {nome}: {valor}")
+        linhas.append("Símbolos por escopo:")
+        for escopo, total in self.symbols_per_scope.items():
+            linhas.append(f"  Escopo {escopo}: {total}")
+        linhas.append("----------------------------------")
+        return "\n".join(linhas)
@@ -1,337 +1,517 @@
-intermediate_code = []  # Armazena as instruções do código intermediário
-temp_counter = 0
-label_counter = 0
-
-def new_temp():
-    """Gera um novo temporário t1, t2, ..."""
-    global temp_counter
-    temp_counter += 1
-    return f"t{temp_counter}"
-
-def new_label():
-    """Gera um novo rótulo L1, L2, ..."""
-    global label_counter
-    label_counter += 1
-    return f"L{label_counter}"
-
-def process_parameter(parameter):
-    """Processa um parâmetro e retorna sua representação como string."""
-    #print(parameter)
-    if isinstance(parameter, tuple):
-        if parameter[0] == 'parameter':
-            # Caso simples: parâmetro como ('parameter', 'int')
-            if len(parameter) == 2 or len(parameter):
-                return parameter[1]
-            # Parâmetro com tipo e modificador, como ('parameter', 'int', '*', 'a')
-            elif len(parameter) == 3:
-                return f"{parameter[1]} {parameter[2]}"
-            # Parâmetro com tipo, modificador e mais um nível de estrutura, como ('parameter', 'int', '*', 'a', ('parameter', 'int', '*', 'b'))
-            elif len(parameter) == 4:
-                return f"{parameter[1]} {parameter[2]} {process_parameter(parameter[3])}"
-            elif len(parameter) == 5:
-                # Este caso trata de ponteiros de ponteiros (e mais níveis)
-                pointer_type = f"{parameter[1]} {parameter[2]}"
-                nested_parameter = process_parameter(parameter[4])  # Processa o parâmetro aninhado
-                return f"{pointer_type} {nested_parameter}"
-            else:
-                raise ValueError(f"Unsupported parameter structure: {parameter}")
-        else:
-            raise ValueError(f"Unsupported parameter structure: {parameter}")
-    elif parameter is None:
-        return ""  # Retorna uma string vazia
-    else:
-        raise ValueError(f"Unsupported parameter type: {parameter}")
-
-
-
-def process_expression(expression, current_scope, symbol_table):
-    """Processa expressões e retorna o nome do temporário que armazena o resultado."""
-    if isinstance(expression, tuple):
-        if len(expression) == 3:  # Operação binária: (op, left, right)
-            op, left, right = expression
-
-            if op == '*':  # Multiplicação por somas sucessivas
-                temp_result = new_temp()
-                temp_index = new_temp()
-                temp_left = process_expression(left, current_scope, symbol_table)
-                temp_right = process_expression(right, current_scope, symbol_table)
-
-                # Inicializa o acumulador e o índice
-                intermediate_code.append(f"{temp_result} = 0")
-                intermediate_code.append(f"{temp_index} = 0")
-
-                # Loop de adição
-                loop_start = new_label()
-                loop_end = new_label()
-                intermediate_code.append(f"{loop_start}:")
-                intermediate_code.append(f"if {temp_index} >= {temp_right} goto {loop_end}")
-                intermediate_code.append(f"{temp_result} = {temp_result} + {temp_left}")
-                intermediate_code.append(f"{temp_index} = {temp_index} + 1")
-                intermediate_code.append(f"goto {loop_start}")
-                intermediate_code.append(f"{loop_end}:")
-
-                return temp_result
-
-            elif op == '/':  # Divisão por subtrações sucessivas
-                temp_result = new_temp()
-                temp_remainder = new_temp()
-                temp_left = process_expression(left, current_scope, symbol_table)
-                temp_right = process_expression(right, current_scope, symbol_table)
-
-                # Inicializa o quociente e o resto
-                intermediate_code.append(f"{temp_result} = 0")
-                intermediate_code.append(f"{temp_remainder} = {temp_left}")
-
-                # Loop de subtração
-                loop_start = new_label()
-                loop_end = new_label()
-                intermediate_code.append(f"{loop_start}:")
-                intermediate_code.append(f"if {temp_remainder} < {temp_right} goto {loop_end}")
-                intermediate_code.append(f"{temp_remainder} = {temp_remainder} - {temp_right}")
-                intermediate_code.append(f"{temp_result} = {temp_result} + 1")
-                intermediate_code.append(f"goto {loop_start}")
-                intermediate_code.append(f"{loop_end}:")
-
-                return temp_result
-
-            else:  # Outros operadores
-                temp_left = process_expression(left, current_scope, symbol_table)
-                temp_right = process_expression(right, current_scope, symbol_table)
-                temp_result = new_temp()
-                intermediate_code.append(f"{temp_result} = {temp_left} {op} {temp_right}")
-                return temp_result
-
-        elif len(expression) == 2:  # Incremento ou decremento: (++ / --)
-            op, operand = expression
-            temp_operand = process_expression(operand, current_scope, symbol_table)
-            intermediate_code.append(f"{operand} = {temp_operand} {op} 1")
-            return operand
-
-    elif isinstance(expression, str):  # Valores e variáveis
-        try:
-            symbol_table.get_symbol(expression)  # Verifica se é uma variável
-            return expression
-        except RuntimeError:  # Caso contrário, é um valor literal
-            return str(expression)
-    else:
-        raise ValueError(f"Unsupported expression: {expression}")
-
-
-def process_declaration(content, current_scope, symbol_table):
-    """Processa declarações de variáveis usando a tabela de símbolos."""
-    if len(content) == 2:  # Tipo e nome da variável
-        var_type, var_name = content
-        symbol_table.add_symbol(var_name, {"type": var_type})
-        intermediate_code.append(f"declare {var_type} {var_name}")
-    elif len(content) == 3:  # Declaração com inicialização
-        var_type, var_name, value = content
-        #symbol_table.add_symbol(var_name, {"type": var_type})
-        intermediate_code.append(f"declare {var_type} {var_name}")
-        temp = process_expression(value, current_scope, symbol_table)
-        intermediate_code.append(f"{var_name} = {temp}")
-    elif len(content) == 5 and content[1] == "vector":  # Declaração de vetor
-        var_type, _, vector_name, array_initializer, values = content
-        if array_initializer == "array_initializer":
-            # Declaração do vetor
-            symbol_table.add_symbol(vector_name, {"type": f"{var_type}[]"})
-            intermediate_code.append(f"declare {var_type} {vector_name}[]")
-            # Atribuindo valores para o vetor
-            for index, value in enumerate(values):
-                temp = process_expression(value, current_scope, symbol_table)
-                intermediate_code.append(f"{vector_name}[{index}] = {temp}")
-        else:
-            raise ValueError(f"Unsupported vector initialization: {array_initializer}")
-    else:
-        raise ValueError(f"Unsupported declaration structure: {content}")
+import operator
 
+import arvore_sintatica as ast_nodes
+from analisador_semantico import INT_TYPE, VectorType
+import codigo_intermediario as ir
 
-def generate_code(node, current_scope, symbol_table):
-    """Função principal para percorrer a AST e gerar código intermediário."""
-    if not node:
-        return
 
-    if isinstance(node, list):  # Lista de instruções
-        for stmt in node:
-            generate_code(stmt, current_scope, symbol_table)
-        return
+def ir_name(node):
+    """Nome da variável no código intermediário, a partir do símbolo anotado no nó.
 
-    node_type, *content = node
+    Uma declaração que esconde outra do mesmo nome recebe um nome próprio do
+    analisador semântico; sem símbolo (erro na análise), vale o nome do código."""
+    symbol = node.symbol
+    if symbol is None:
+        return node.name
+    return symbol.get("ir_name", node.name)
 
-    if node_type == 'expr_stmt':
-        process_expression(content[0], current_scope, symbol_table)
 
-    elif node_type == 'declaration':
-        process_declaration(content, current_scope, symbol_table)
+def process_parameter(parameter):
+    """Processa um parâmetro (arvore_sintatica.Parameter) e retorna sua representação como string."""
+    if parameter is None:
+        return ""  # Retorna uma string vazia
+    if parameter.kind != ast_nodes.PARAMETER:
+        raise ValueError(f"Unsupported parameter structure: {parameter}")
+    param_type = f"{parameter.type}*" if parameter.pointer else parameter.type
+    suffix = "[]" if parameter.vector else ""
+    return f"{param_type} {ir_name(parameter)}{suffix}"
 
-    elif node_type == 'preprocessor_directive':
-        intermediate_code.append(f"directive {content[0]}")
 
-    elif node_type == 'comment':
-        pass  # Ignora comentários
+# Operação usada por ++, --, += e -= (o operando é incrementado ou decrementado)
+_UNARY_OPERATIONS = {'++': '+', '+=': '+', '--': '-', '-=': '-'}
 
-    elif node_type == 'while':
-        # A estrutura é: ('while', cond1, cond2, cond3, ..., block)
-        condition_elements = content[:-1]  # Condições (antes do bloco)
-        block = content[-1]  # Bloco do laço
+# Operações calculadas em tempo de compilação quando os dois operandos são constantes
+_COMPARISONS = {"==": operator.eq, "!=": operator.ne, "<": operator.lt,
+                "<=": operator.le, ">": operator.gt, ">=": operator.ge}
 
-        label_start = new_label()
-        label_end = new_label()
 
-        # Adiciona o rótulo de início
-        intermediate_code.append(f"{label_start}:")
+def int_constant(text):
+    """Valor de um operando do código intermediário que é uma constante inteira
+    (12, -4, ou 017 em octal, como no C); None para nomes e demais literais."""
+    first = text[:1]
+    if first == "-":
+        digits = text[1:]
+    elif "0" <= first <= "9":
+        digits = text
+    else:
+        return None  # Nome de variável ou temporário
+    if not digits.isdigit():
+        return None
+    try:
+        value = int(digits, 8) if len(digits) > 1 and digits[0] == "0" else int(digits)
+    except ValueError:  # 09: não é um octal válido
+        return None
+    return -value if text[0] == "-" else value
+
+
+def fold_operation(op, left, right):
+    """left op right com a aritmética de int do C (32 bits, divisão truncada em
+    direção a zero); None quando o resultado só pode ser conhecido na execução."""
+    if op == "+":
+        value = left + right
+    elif op == "-":
+        value = left - right
+    elif op == "*":
+        value = left * right
+    elif op == "/" or op == "%":
+        if right == 0:
+            return None  # Divisão por zero fica para a execução
+        quotient = abs(left) // abs(right)
+        if (left < 0) != (right < 0):
+            quotient = -quotient
+        value = quotient if op == "/" else left - right * quotient
+    elif op in _COMPARISONS:
+        value = int(_COMPARISONS[op](left, right))
+    elif op == "and":
+        value = int(bool(left) and bool(right))
+    else:
+        return None
+    return (value + 2 ** 31) % 2 ** 32 - 2 ** 31
+
+
+class IntermediateCodeGenerator:
+    """Gerador de código intermediário; cada instância guarda o próprio código e contadores.
+
+    Expressões com operandos constantes são calculadas na geração, e o valor das
+    variáveis int atribuídas com uma constante é propagado pelo código em linha
+    reta: rótulos, desvios incondicionais, chamadas e escritas na memória por
+    ponteiro descartam os valores conhecidos. Um if, while ou for cuja condição
+    é constante perde o desvio e o trecho que nunca executa."""
+
+    def __init__(self):
+        self.intermediate_code = ir.IntermediateCode()  # Instruções geradas
+        self.temp_counter = 0
+        self.label_counter = 0
+        self.temp_total = 0  # Temporários criados no programa todo (a numeração recomeça por função)
+        self.constants = {}  # Nome da variável -> valor constante conhecido neste ponto do código
+        self.folded_total = 0  # Operações calculadas em tempo de compilação
+        self.branches_removed = 0  # Condições constantes, resolvidas sem desvio
+
+        # Gerador de cada tipo de nó, comando ou expressão, indexado pelo código do
+        # nó (arvore_sintatica). Os que têm filhos são geradores do Python: entregam
+        # com yield cada filho e recebem de volta o nome com o resultado dele, e
+        # arvore_sintatica.drive os executa com uma pilha explícita
+        handlers = {
+            ast_nodes.EXPR_STMT: self.process_expr_stmt,
+            ast_nodes.DECLARATION: self.process_declaration,
+            ast_nodes.VECTOR_DECLARATION: self.process_vector_declaration,
+            ast_nodes.FUNCTION_DECLARATION: self.process_function_declaration,
+            ast_nodes.DIRECTIVE: self.process_directive,
+            ast_nodes.COMMENT: self.process_comment,
+            ast_nodes.BLOCK: self.process_block,
+            ast_nodes.IF: self.process_if,
+            ast_nodes.WHILE: self.process_while,
+            ast_nodes.DO_WHILE: self.process_do_while,
+            ast_nodes.FOR: self.process_for,
+            ast_nodes.RETURN: self.process_return,
+            ast_nodes.NAME: self.process_name,
+            ast_nodes.LITERAL: self.process_literal,
+            ast_nodes.BINARY_OP: self.process_binary_op,
+            ast_nodes.COMPARISON: self.process_comparison,
+            ast_nodes.LOGICAL_AND: self.process_logical_and,
+            ast_nodes.ASSIGN: self.process_assign,
+            ast_nodes.UNARY_OP: self.process_unary_op,
+            ast_nodes.DEREF: self.process_deref,
+            ast_nodes.ADDRESS_OF: self.process_address_of,
+            ast_nodes.INDEX: self.process_index,
+            ast_nodes.FUNCTION_CALL: self.process_function_call,
+            ast_nodes.COMMA: self.process_comma,
+        }
+        self._handlers = [handlers.get(kind, self.process_unsupported) for kind in range(max(handlers) + 1)]
+
+    def new_temp(self):
+        """Gera um novo temporário %t1, %t2, ... (codigo_intermediario.TEMPORARY_PREFIX)"""
+        self.temp_counter += 1
+        self.temp_total += 1
+        return f"{ir.TEMPORARY_PREFIX}{self.temp_counter}"
+
+    def new_label(self):
+        """Gera um novo rótulo L1, L2, ..."""
+        self.label_counter += 1
+        return f"L{self.label_counter}"
+
+    def emit_label(self, label):
+        """Rótulo: o código pode chegar aqui por um desvio, com outros valores nas variáveis."""
+        self.intermediate_code.emit(ir.LABEL, label)
+        self.constants.clear()
+
+    def skip_loop(self, condition, label_end):
+        """Avalia a condição de um while/for com os valores conhecidos antes do laço,
+        como na entrada dele. Se é falsa, o corpo nunca executa, o que quer que ele
+        altere: fica só o código dessa avaliação e devolve True. Senão desfaz a
+        tentativa e devolve False; dentro do laço, os valores conhecidos são esquecidos
+        (emit_label), porque o corpo pode alterá-los a cada volta."""
+        code = self.intermediate_code
+        mark = (len(code), dict(self.constants), self.temp_counter, self.temp_total,
+                self.folded_total, self.branches_removed)
+        outcome = yield from self.process_condition(condition, label_end)
+        if outcome is False:
+            return True
+        while len(code) > mark[0]:
+            code.pop()
+        (_, self.constants, self.temp_counter, self.temp_total,
+         self.folded_total, self.branches_removed) = mark
+        return False
+
+    def emit_goto(self, label):
+        """Desvio incondicional: o que vem depois só é alcançado por um rótulo."""
+        self.intermediate_code.emit(ir.GOTO, label)
+        self.constants.clear()
+
+    def assign_constant(self, name, symbol, value):
+        """Registra o valor atribuído a uma variável: conhecido se for uma constante
+        e a variável for int (nos outros tipos a conversão muda o valor)."""
+        constant = int_constant(value) if symbol is not None and symbol["type"] is INT_TYPE else None
+        if constant is None:
+            self.constants.pop(name, None)
+        else:
+            self.constants[name] = constant
+
+    def fold(self, op, left, right):
+        """Texto da constante left op right, ou None se algum operando não for constante."""
+        a = int_constant(left)
+        if a is None:
+            return None
+        b = int_constant(right)
+        if b is None:
+            return None
+        value = fold_operation(op, a, b)
+        if value is None:
+            return None
+        self.folded_total += 1
+        return str(value)
+
+    def materialize(self, value):
+        """Coloca uma constante em um temporário, para as instruções que só aceitam registradores."""
+        temp = self.new_temp()
+        self.intermediate_code.emit(ir.COPY, temp, value)
+        return temp
+
+    def process_unsupported(self, node):
+        raise ValueError(f"Node type {ast_nodes.KIND_NAMES.get(node.kind)} not supported!")
+
+    def process_expression(self, expression):
+        """Processa expressões e retorna o nome do temporário (ou variável, ou constante) com o resultado."""
+        return ast_nodes.drive(expression, self._handlers)
+
+    def process_name(self, expression):
+        name = ir_name(expression)
+        if self.constants:
+            value = self.constants.get(name)
+            if value is not None:
+                return str(value)
+        return name
+
+    def process_literal(self, expression):
+        value = expression.value
+        if expression.literal_kind == ast_nodes.INT and len(value) > 1 and value[0] == "0":
+            constant = int_constant(value)  # Octal
+            if constant is not None:
+                return str(constant)
+        return value
+
+    def process_binary_op(self, expression):
+        return self.process_operation(expression.op, expression.left, expression.right)
+
+    def process_operation(self, op, left, right):
+        """Operação direta: temp = left op right, ou a constante do resultado."""
+        temp_left = yield left
+        temp_right = yield right
+        folded = self.fold(op, temp_left, temp_right)
+        if folded is not None:
+            return folded
+        if int_constant(temp_left) is not None:
+            if op in ("+", "*"):  # A constante vai para a direita, onde cabe como imediato
+                temp_left, temp_right = temp_right, temp_left
+            elif op in ("-", "/", "%", "and"):
+                temp_left = self.materialize(temp_left)
+        if op == "and" and int_constant(temp_right) is not None:
+            temp_right = self.materialize(temp_right)
+        temp_result = self.new_temp()
+        self.intermediate_code.emit(ir.BINARY_OPS[op], temp_result, temp_left, temp_right)
+        return temp_result
+
+    def process_comparison(self, expression):
+        return self.process_operation(expression.op, expression.left, expression.right)
+
+    def process_logical_and(self, expression):
+        return self.process_operation("and", expression.left, expression.right)
+
+    def clobber_memory(self, base=None):
+        """Escrita na memória por ponteiro: pode alterar qualquer variável que teve o
+        endereço tomado. Um vetor (declarado ou parâmetro) só tem os próprios elementos."""
+        symbol = base.symbol if base is not None else None
+        if symbol is None or type(symbol["type"]) is not VectorType:
+            self.constants.clear()
+
+    def process_assign(self, expression):
+        target = expression.target
+        value = yield expression.value
+        if target.kind == ast_nodes.NAME:
+            name = ir_name(target)
+            self.intermediate_code.emit(ir.COPY, name, value)
+            self.assign_constant(name, target.symbol, value)
+            return self.process_name(target)
+        if target.kind == ast_nodes.INDEX:
+            index = yield target.index
+            self.intermediate_code.emit(ir.STORE_INDEX, ir_name(target.base), index, value)
+            self.clobber_memory(target.base)
+            return value
+        if target.kind == ast_nodes.DEREF:
+            pointer = yield target.operand
+            if int_constant(value) is not None:
+                value = self.materialize(value)
+            self.intermediate_code.emit(ir.STORE, pointer, value)
+            self.clobber_memory()
+            return value
+        raise ValueError(f"Unsupported assignment target: {target}")
+
+    def process_unary_op(self, expression):
+        """Incremento ou decremento: a variável (ou elemento) é atualizada no lugar."""
+        op = _UNARY_OPERATIONS[expression.op]
+        operand = expression.operand
+        if operand.kind == ast_nodes.NAME:
+            name = ir_name(operand)
+            folded = self.fold(op, self.process_name(operand), "1")
+            if folded is None:
+                self.intermediate_code.emit(ir.BINARY_OPS[op], name, name, "1")
+            else:
+                self.intermediate_code.emit(ir.COPY, name, folded)
+            self.assign_constant(name, operand.symbol, folded or name)
+            return self.process_name(operand)
+        # Elemento de vetor ou valor apontado: lê, soma e grava de volta
+        temp_value = yield operand
+        temp_result = self.new_temp()
+        self.intermediate_code.emit(ir.BINARY_OPS[op], temp_result, temp_value, "1")
+        if operand.kind == ast_nodes.INDEX:
+            index = yield operand.index
+            self.intermediate_code.emit(ir.STORE_INDEX, ir_name(operand.base), index, temp_result)
+            self.clobber_memory(operand.base)
+        elif operand.kind == ast_nodes.DEREF:
+            pointer = yield operand.operand
+            self.intermediate_code.emit(ir.STORE, pointer, temp_result)
+            self.clobber_memory()
+        else:
+            raise ValueError(f"Unsupported operand for {expression.op}: {operand}")
+        return temp_result
+
+    def process_deref(self, expression):
+        pointer = yield expression.operand
+        temp = self.new_temp()
+        self.intermediate_code.emit(ir.LOAD, temp, pointer)
+        return temp
+
+    def process_address_of(self, expression):
+        operand = expression.operand
+        if operand.kind == ast_nodes.INDEX and operand.index is not None:
+            index = yield operand.index
+            temp = self.new_temp()
+            self.intermediate_code.emit(ir.ADDRESS_INDEX, temp, ir_name(operand.base), index)
+            return temp
+        if operand.kind == ast_nodes.NAME:
+            address = ir_name(operand)  # O endereço da variável, não o seu valor
+        else:
+            address = yield operand
+        temp = self.new_temp()
+        self.intermediate_code.emit(ir.ADDRESS, temp, address)
+        return temp
+
+    def process_index(self, expression):
+        if expression.index is None:  # v[] é o próprio vetor
+            return ir_name(expression.base)
+        index = yield expression.index
+        temp = self.new_temp()
+        self.intermediate_code.emit(ir.LOAD_INDEX, temp, ir_name(expression.base), index)
+        return temp
+
+    def process_function_call(self, expression):
+        args = []
+        for arg in expression.args:
+            args.append((yield arg))
+        for arg in args:
+            self.intermediate_code.emit(ir.PARAM, arg)
+        temp = self.new_temp()
+        self.intermediate_code.emit(ir.CALL, temp, expression.name, str(len(args)))
+        self.constants.clear()  # A função pode alterar globais e o que os ponteiros apontam
+        return temp
+
+    def process_comma(self, expression):
+        yield expression.left
+        return (yield expression.right)
+
+    def process_condition(self, condition, label_false):
+        """Gera os desvios para label_false quando a condição é falsa (cada termo de um &&).
+
+        Devolve True se a condição é sempre verdadeira e False se é sempre falsa
+        (em nenhum dos dois casos há desvio), ou None quando depende da execução."""
+        terms = []
+        pending = [condition]
+        while pending:
+            term = pending.pop()
+            if term.kind == ast_nodes.LOGICAL_AND:
+                pending.append(term.right)
+                pending.append(term.left)
+            else:
+                terms.append(term)
+        branched = False
+        for term in terms:
+            condition_temp = yield term
+            value = int_constant(condition_temp)
+            if value is None:
+                self.intermediate_code.emit(ir.IF_FALSE, condition_temp, label_false)
+                branched = True
+                continue
+            self.branches_removed += 1
+            if not value:
+                # Os termos seguintes não são avaliados (curto-circuito)
+                if not branched:
+                    return False
+                self.emit_goto(label_false)
+                return None
+        return None if branched else True
+
+    def process_expr_stmt(self, node):
+        yield node.expr
+
+    def process_declaration(self, node):
+        """Processa a declaração de uma variável, com ou sem inicialização."""
+        var_type = f"{node.type}*" if node.pointer else node.type
+        name = ir_name(node)
+        self.intermediate_code.emit(ir.DECLARE, var_type, name)
+        if node.init is not None:  # Declaração com inicialização
+            temp = yield node.init
+            self.intermediate_code.emit(ir.COPY, name, temp)
+            self.assign_constant(name, node.symbol, temp)
+        else:
+            self.constants.pop(name, None)
+
+    def process_vector_declaration(self, node):
+        """Processa a declaração de um vetor e os valores do inicializador."""
+        var_type = f"{node.type}*" if node.pointer else node.type
+        name = ir_name(node)
+        size = (yield node.size) if node.size is not None else ""
+        self.intermediate_code.emit(ir.DECLARE_VECTOR, var_type, name, size)
+        # Atribuindo valores para o vetor
+        for index, value in enumerate(node.values or ()):
+            temp = yield value
+            self.intermediate_code.emit(ir.STORE_INDEX, name, str(index), temp)
+
+    def process_directive(self, node):
+        self.intermediate_code.emit(ir.DIRECTIVE, node.text)
+
+    def process_comment(self, node):
+        pass  # Ignora comentários
 
-        # Processar condições compostas com '&&'
-        temp_conditions = []
-        for condition in condition_elements:
-            temp_conditions.append(process_expression(condition, current_scope, symbol_table))
+    def process_block(self, node):
+        yield node.statements
 
-        # A condição composta será algo como (cond1 && cond2 && cond3)
-        combined_condition = " && ".join(temp_conditions)
+    def process_while(self, node):
+        label_start = self.new_label()
+        label_end = self.new_label()
 
-        # Verificar se a condição composta é verdadeira
-        intermediate_code.append(f"if_false {combined_condition} goto {label_end}")
+        if (yield from self.skip_loop(node.cond, label_end)):
+            return  # O corpo nunca executa
 
-        # Entrar no escopo do laço
-        symbol_table.enter_scope()
-        generate_code(block, current_scope, symbol_table)
-        symbol_table.exit_scope()
+        # Adiciona o rótulo de início
+        self.emit_label(label_start)
+        outcome = yield from self.process_condition(node.cond, label_end)
+        yield node.body.statements
 
         # Voltar para o início do laço
-        intermediate_code.append(f"goto {label_start}")
-        intermediate_code.append(f"{label_end}:")
-
-
-    elif node_type == 'do_while':
-        block, var, op, value = content
-        label_start = new_label()
-        intermediate_code.append(f"{label_start}:")
-        symbol_table.enter_scope()
-        generate_code(block, current_scope, symbol_table)
-        symbol_table.exit_scope()
-        temp = process_expression((op, var, value), current_scope, symbol_table)
-        intermediate_code.append(f"if_false {temp} goto {label_start}")
-
-    elif node_type == 'for':
-        content_len = len(content)
-
-        if (content_len == 7 and content[0][0] == 'declaration'):
-            init, var, op, value, increment_var, increment_op, block = content
-            label_start = new_label()
-            label_end = new_label()
-            generate_code(init, current_scope, symbol_table)
-            intermediate_code.append(f"{label_start}:")
-            condition_temp = process_expression((op, var, value), current_scope, symbol_table)
-            intermediate_code.append(f"if_false {condition_temp} goto {label_end}")
-            symbol_table.enter_scope()
-            generate_code(block, current_scope, symbol_table)
-            symbol_table.exit_scope()
-            process_expression((increment_op, increment_var), current_scope, symbol_table)
-            intermediate_code.append(f"goto {label_start}")
-            intermediate_code.append(f"{label_end}:")
-
-        elif (content_len == 7 and content[0][0] != 'declaration'):
-            init, var, op, value, increment_var, increment_op, block = content
-            label_start = new_label()
-            label_end = new_label()
-
-            # O laço começa sem uma inicialização explícita, pois a variável `n` já foi inicializada anteriormente
-            intermediate_code.append(f"{label_start}:")
-
-            # Gerar código intermediário para a condição: n > 0
-            condition_temp = process_expression((op, var, value), current_scope, symbol_table)
-            intermediate_code.append(f"if_false {condition_temp} goto {label_end}")
-
-            # Processar o bloco dentro do laço (mesmo que vazio)
-            symbol_table.enter_scope()
-            generate_code(block, current_scope, symbol_table)
-            symbol_table.exit_scope()
-
-            # Gerar o código intermediário para o decremento: n--
-            process_expression((increment_op, increment_var), current_scope, symbol_table)
-
-            intermediate_code.append(f"goto {label_start}")
-            intermediate_code.append(f"{label_end}:")
-
-        elif content_len == 9:  # Caso de um 'for' com inicialização, condição e decremento (9 elementos)
-            var_name, eq, var_value, var_cond, op, cond_value, var_increment, increment, block = content
-
-            # Inicialização da variável
-            intermediate_code.append(f"{var_name} = {var_value}")
-
-            label_start = new_label()
-            label_end = new_label()
-
-            # Gerar o código do laço 'for'
-            intermediate_code.append(f"{label_start}:")
-
-            # Condição do laço
-            condition_temp = process_expression((op, var_name, cond_value), current_scope, symbol_table)
-            intermediate_code.append(f"if_false {condition_temp} goto {label_end}")
-
-            # Processar o bloco (no caso, incremento n++)
-            symbol_table.enter_scope()
-            generate_code(block, current_scope, symbol_table)
-            symbol_table.exit_scope()
-
-            # Decremento (n--)
-            intermediate_code.append(f"{var_name} = {var_name} - 1")
-
-            intermediate_code.append(f"goto {label_start}")
-            intermediate_code.append(f"{label_end}:")
-
-
-
-
-
-        else:
-            raise ValueError(f"Erro na estrutura do 'for', quantidade de elementos inesperada: {content_len}.")
-
-    elif node_type == 'if':
-        condition, block_then, *block_else = content
-        label_else = new_label() if block_else else None
-        label_end = new_label()
-        condition_temp = process_expression(condition, current_scope, symbol_table)
-        intermediate_code.append(f"if_false {condition_temp} goto {label_else or label_end}")
-        symbol_table.enter_scope()
-        generate_code(block_then, current_scope, symbol_table)
-        symbol_table.exit_scope()
-        if block_else:
-            intermediate_code.append(f"goto {label_end}")
-            intermediate_code.append(f"{label_else}:")
-            symbol_table.enter_scope()
-            generate_code(block_else[0], current_scope, symbol_table)
-            symbol_table.exit_scope()
-        intermediate_code.append(f"{label_end}:")
-
-    elif node_type == 'return':
-        temp = process_expression(content[0], current_scope, symbol_table)
-        intermediate_code.append(f"return {temp}")
-
-    elif node_type == 'function_declaration':
-        return_type, function_name, *rest = content
-        func_info = symbol_table.get_symbol(function_name)
-        parameters = func_info.get('params', [])
-        param_list = ", ".join([process_parameter(p) for p in parameters]) if parameters else ""
-        intermediate_code.append(f"function {function_name}({param_list}) -> {return_type}")
-        symbol_table.enter_scope()
-        generate_code(rest[-1], function_name, symbol_table)
-        symbol_table.exit_scope()
-        intermediate_code.append(f"end_function {function_name}")
-
-    elif node_type == 'block':
-        symbol_table.enter_scope()
-        for stmt in content[0]:
-            generate_code(stmt, current_scope, symbol_table)
-        symbol_table.exit_scope()
-
-    else:
-        raise ValueError(f"Node type {node_type} not supported!")
-
-def process_node(ast, symbol_table):
-    """Gera o código intermediário baseado em uma AST e uma Tabela de Símbolos."""
-    global intermediate_code, temp_counter, label_counter
-    intermediate_code = []
-    temp_counter = 0
-    label_counter = 0
-    generate_code(ast, 1, symbol_table)  # Começa no escopo global (1)
-    return "\n".join(intermediate_code)
+        self.emit_goto(label_start)
+        if outcome is None:
+            self.emit_label(label_end)
+
+    def process_do_while(self, node):
+        label_start = self.new_label()
+        label_end = self.new_label()
+        self.emit_label(label_start)
+        yield node.body.statements
+        outcome = yield from self.process_condition(node.cond, label_end)
+        if outcome is not False:
+            self.emit_goto(label_start)
+        if outcome is None:
+            self.emit_label(label_end)
+
+    def process_for(self, node):
+        if node.init is not None:
+            yield node.init  # Declaration ou expressão
+        label_start = self.new_label()
+        label_end = self.new_label()
+        if (yield from self.skip_loop(node.cond, label_end)):
+            return
+        self.emit_label(label_start)
+        outcome = yield from self.process_condition(node.cond, label_end)
+        yield node.body.statements
+        yield node.step
+        self.emit_goto(label_start)
+        if outcome is None:
+            self.emit_label(label_end)
+
+    def process_if(self, node):
+        label_else = self.new_label() if node.else_ is not None else None
+        label_end = self.new_label()
+        outcome = yield from self.process_condition(node.cond, label_else or label_end)
+        if outcome is not None:
+            # Condição constante: só o ramo que executa é gerado, sem desvios
+            branch = node.then if outcome else node.else_
+            if branch is not None:
+                yield branch.statements
+            return
+        yield node.then.statements
+        if node.else_ is not None:
+            self.emit_goto(label_end)
+            self.emit_label(label_else)
+            yield node.else_.statements
+        self.emit_label(label_end)
+
+    def process_return(self, node):
+        temp = yield node.expr
+        self.intermediate_code.emit(ir.RETURN, temp)
+
+    def process_function_declaration(self, node):
+        param_list = ", ".join([process_parameter(p) for p in node.params])
+        return_type = f"{node.return_type}*" if node.pointer else node.return_type
+        self.intermediate_code.emit(ir.FUNCTION, node.name, param_list, return_type)
+        # Temporários e valores conhecidos são locais à função: a numeração recomeça
+        # em cada uma, e o código de uma função não depende do que foi gerado antes dela
+        outer_temps, outer_constants = self.temp_counter, self.constants
+        self.temp_counter = 0
+        self.constants = {}
+        yield node.body.statements
+        self.temp_counter, self.constants = outer_temps, outer_constants
+        self.intermediate_code.emit(ir.END_FUNCTION, node.name)
+
+    def generate_code(self, node):
+        """Função principal para percorrer a AST e gerar código intermediário."""
+        if not node:
+            return
+        ast_nodes.drive(node, self._handlers)
+
+    def process_node(self, ast):
+        """Gera o código intermediário (IntermediateCode) de uma AST anotada pelo
+        analisador semântico."""
+        self.intermediate_code = ir.IntermediateCode()
+        self.temp_counter = 0
+        self.label_counter = 0
+        self.temp_total = 0
+        self.constants = {}
+        self.folded_total = 0
+        self.branches_removed = 0
+        self.generate_code(ast)
+        return self.intermediate_code
+
+
+def process_node(ast):
+    """Gera o código intermediário (IntermediateCode) de uma AST anotada pelo analisador semântico."""
+    return IntermediateCodeGenerator().process_node(ast)
@@ -0,0 +1,165 @@
+"""Gerador determinístico de programas no subconjunto de C aceito pelo compilador.
+
+Usado pelo benchmark.py para medir o compilador com entradas de 1 KB a 100 MB.
+Os programas usam apenas construções que passam por todas as fases (declarações,
+atribuições com + e -, if/else, for, chamadas e vetores com inicializador) e
+dependem só dos parâmetros e da semente: a mesma chamada gera sempre o mesmo texto.
+
+Os quatro eixos de escala são:
+    funcoes      -- quantidade de funções do programa
+    profundidade -- aninhamento de blocos (if/for) dentro de cada função
+    comandos     -- quantidade de comandos em cada bloco
+    vetor        -- quantidade de valores no inicializador do vetor global
+"""
+import argparse
+import random
+import sys
+
+EIXOS = ("funcoes", "profundidade", "comandos", "vetor")
+
+# Valores de cada eixo quando ele não é o que está sendo escalado
+PADRAO = {"funcoes": 1, "profundidade": 2, "comandos": 4, "vetor": 8}
+
+_COMPARACOES = ("<", ">", "<=", ">=", "==", "!=")
+
+# Recuo máximo; sem o limite, o texto cresceria de forma quadrática com a profundidade
+_RECUO_MAXIMO = 8
+
+
+class _Funcao:
+    """Gera o corpo de uma função, com nomes de variáveis únicos na função."""
+
+    def __init__(self, rng, indice, profundidade, comandos):
+        self.rng = rng
+        self.indice = indice
+        self.profundidade = profundidade
+        self.comandos = comandos
+        self.variaveis = ["a", "b"]
+        self.contador = 0
+        self.linhas = []
+
+    def _nova_variavel(self):
+        self.contador += 1
+        return f"v{self.contador}"
+
+    def _operando(self):
+        if self.rng.random() < 0.3:
+            return str(self.rng.randint(0, 99))
+        return self.rng.choice(self.variaveis)
+
+    def _expressao(self):
+        op = self.rng.choice(("+", "-"))
+        return f"{self.rng.choice(self.variaveis)} {op} {self._operando()}"
+
+    def _comando(self, recuo):
+        espacos = "    " * min(recuo, _RECUO_MAXIMO)
+        escolha = self.rng.random()
+        if escolha < 0.45:
+            nome = self._nova_variavel()
+            self.linhas.append(f"{espacos}int {nome} = {self._expressao()};")
+            self.variaveis.append(nome)
+        elif escolha < 0.85 or self.indice == 0:
+            alvo = self.rng.choice(self.variaveis)
+            self.linhas.append(f"{espacos}{alvo} = {self._expressao()};")
+        else:
+            # Chamada a uma função já gerada
+            chamada = f"f{self.rng.randrange(self.indice)}"
+            self.linhas.append(f"{espacos}{chamada}({self._operando()}, {self._operando()});")
+
+    def _bloco(self):
+        """Gera os blocos aninhados da função, sem recursão (a profundidade pode ser grande)."""
+        abertos = []  # (variáveis visíveis antes do bloco, é if/else, recuo)
+        for nivel in range(self.profundidade + 1):
+            recuo = nivel + 1
+            for _ in range(self.comandos):
+                self._comando(recuo)
+            if nivel == self.profundidade:
+                break
+            espacos = "    " * min(recuo, _RECUO_MAXIMO)
+            visiveis = len(self.variaveis)
+            if self.rng.random() < 0.5:
+                cond = f"{self.rng.choice(self.variaveis)} {self.rng.choice(_COMPARACOES)} {self.rng.randint(0, 99)}"
+                self.linhas.append(f"{espacos}if ({cond}) {{")
+                abertos.append((visiveis, True, recuo))
+            else:
+                i = self._nova_variavel()
+                limite = self.rng.randint(1, 99)
+                self.linhas.append(f"{espacos}for (int {i} = 0; {i} < {limite}; {i}++) {{")
+                self.variaveis.append(i)
+                abertos.append((visiveis, False, recuo))
+        while abertos:
+            visiveis, eh_if, recuo = abertos.pop()
+            espacos = "    " * min(recuo, _RECUO_MAXIMO)
+            # Variáveis declaradas dentro do bloco aninhado não valem depois dele
+            del self.variaveis[visiveis:]
+            if eh_if:
+                self.linhas.append(f"{espacos}}} else {{")
+                self.linhas.append(f"{espacos}    {self.rng.choice(self.variaveis)} = {self._expressao()};")
+            self.linhas.append(f"{espacos}}}")
+
+    def gerar(self):
+        self.linhas.append(f"int f{self.indice}(int a, int b) {{")
+        self._bloco()
+        self.linhas.append(f"    return {self.rng.choice(self.variaveis)};")
+        self.linhas.append("}")
+        return "\n".join(self.linhas)
+
+
+def gerar_programa(funcoes=1, profundidade=2, comandos=4, vetor=8, semente=0):
+    """Gera o texto de um programa com os parâmetros dados."""
+    rng = random.Random(semente)
+    partes = [f"// Programa gerado: funcoes={funcoes} profundidade={profundidade} "
+              f"comandos={comandos} vetor={vetor} semente={semente}",
+              "int g0 = 1;"]
+    if vetor > 0:
+        valores = ", ".join(str(rng.randint(0, 999)) for _ in range(vetor))
+        partes.append(f"int dados[] = {{{valores}}};")
+    for indice in range(funcoes):
+        partes.append(_Funcao(rng, indice, profundidade, comandos).gerar())
+    return "\n".join(partes) + "\n"
+
+
+def gerar_por_tamanho(tamanho, eixo="funcoes", semente=0):
+    """Gera um programa com cerca de `tamanho` bytes, crescendo apenas o eixo indicado.
+
+    O tamanho do texto é (aproximadamente) linear em cada eixo, então o valor do
+    eixo é estimado a partir de dois programas pequenos."""
+    if eixo not in EIXOS:
+        raise ValueError(f"Eixo desconhecido: {eixo} (use um de {', '.join(EIXOS)})")
+    params = dict(PADRAO, semente=semente)
+    # Sem aninhamento, comandos por bloco crescem o texto de forma linear
+    if eixo == "comandos":
+        params["profundidade"] = 0
+    base = 1 if eixo != "profundidade" else 8
+    params[eixo] = base
+    t1 = len(gerar_programa(**params))
+    params[eixo] = base * 2
+    t2 = len(gerar_programa(**params))
+    por_unidade = max(1, (t2 - t1) / base)
+    params[eixo] = max(1, base + round((tamanho - t1) / por_unidade))
+    programa = gerar_programa(**params)
+    # Uma correção proporcional quando o eixo não é tão linear (nomes de variáveis crescem)
+    if abs(len(programa) - tamanho) > tamanho * 0.2 and params[eixo] > base:
+        params[eixo] = max(1, round(params[eixo] * tamanho / len(programa)))
+        programa = gerar_programa(**params)
+    return programa
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera um programa C sintético para o benchmark.")
+    parser.add_argument("tamanho", type=int, help="tamanho aproximado em bytes")
+    parser.add_argument("--eixo", choices=EIXOS, default="funcoes", help="eixo que cresce (padrão: funcoes)")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("-o", "--saida", help="arquivo de saída (padrão: saída padrão)")
+    args = parser.parse_args(argv)
+    programa = gerar_por_tamanho(args.tamanho, args.eixo, args.semente)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            f.write(programa)
+    else:
+        sys.stdout.write(programa)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
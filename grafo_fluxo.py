@@ -0,0 +1,369 @@
+"""Blocos básicos e grafo de fluxo de controle do código intermediário.
+
+Cada função do intermediário (as instruções entre function e end_function) vira
+um ControlFlowGraph. Um bloco básico começa no início da função, em cada rótulo
+e depois de cada desvio (goto, if_false, if a op b goto) ou return, e termina
+antes do próximo início. Os blocos guardam só o intervalo [start, end) das suas
+instruções no IntermediateCode, então o grafo não copia o código.
+
+Além das arestas (successors e predecessors), o grafo calcula:
+    dominadores  -- o dominador imediato (idom) de cada bloco alcançável, pelo
+                    algoritmo iterativo de Cooper, Harvey e Kennedy sobre a
+                    ordem reversa de pós-ordem; dominates(a, b) responde em
+                    tempo constante pela numeração da árvore de dominadores
+    laços        -- um laço natural por cabeçalho (destino de uma aresta de
+                    retorno, que domina a origem), com os blocos do corpo, o
+                    laço que o contém e a profundidade do aninhamento
+
+Os rótulos que o gerador produz para if/else, while, do-while e for (com ou
+sem inicialização, condição e passo) são tratados da mesma forma: só importa
+onde estão os rótulos e os desvios. Tudo é calculado sem recursão e em tempo
+proporcional ao tamanho do código, inclusive com laços muito aninhados.
+
+Para inspecionar o grafo de um programa:
+    python grafo_fluxo.py programa.c [--dot] [--funcao NOME]
+"""
+import argparse
+import sys
+
+import codigo_intermediario as ir
+
+# Instruções que encerram um bloco básico
+TERMINATORS = frozenset(ir.LABEL_OPERANDS) - {ir.LABEL} | {ir.RETURN}
+# Desvios condicionais: além do rótulo, a execução pode seguir para a próxima instrução
+CONDITIONAL_BRANCHES = frozenset(ir.BRANCH_OPS.values()) | {ir.IF_FALSE}
+
+
+class BasicBlock:
+    """Bloco básico: as instruções [start, end) do código, executadas em sequência."""
+    __slots__ = ("id", "start", "end", "label", "successors", "predecessors",
+                 "idom", "dominated", "loop", "_order", "_pre", "_post")
+
+    def __init__(self, block_id, start):
+        self.id = block_id
+        self.start = start
+        self.end = start
+        self.label = None  # Rótulo no início do bloco, se houver
+        self.successors = []
+        self.predecessors = []
+        self.idom = None  # Dominador imediato (None na entrada e nos inalcançáveis)
+        self.dominated = []  # Filhos na árvore de dominadores
+        self.loop = None  # Laço mais interno que contém o bloco
+        self._order = None  # Posição na ordem reversa de pós-ordem (None: inalcançável)
+        self._pre = self._post = None  # Intervalo do bloco na árvore de dominadores
+
+    def __len__(self):
+        return self.end - self.start
+
+    @property
+    def reachable(self):
+        """Se o bloco é alcançável a partir da entrada da função."""
+        return self._order is not None
+
+    @property
+    def loop_depth(self):
+        """Quantidade de laços que contêm o bloco (0 fora de laços)."""
+        return self.loop.depth if self.loop is not None else 0
+
+    def __repr__(self):
+        return f"<BasicBlock B{self.id} [{self.start}, {self.end})>"
+
+
+class Loop:
+    """Laço natural: o cabeçalho e os blocos do corpo (incluindo o cabeçalho)."""
+    __slots__ = ("header", "own", "parent", "children", "depth")
+
+    def __init__(self, header):
+        self.header = header
+        self.own = [header]  # Blocos cujo laço mais interno é este
+        self.parent = None  # Laço que contém este, ou None
+        self.children = []  # Laços contidos diretamente neste
+        self.depth = 1
+
+    @property
+    def blocks(self):
+        """Todos os blocos do corpo, incluindo os dos laços contidos, em ordem de id."""
+        blocks = []
+        pending = [self]
+        while pending:
+            loop = pending.pop()
+            blocks.extend(loop.own)
+            pending.extend(loop.children)
+        blocks.sort(key=lambda block: block.id)
+        return blocks
+
+    def __repr__(self):
+        return f"<Loop B{self.header.id} ({len(self.blocks)} blocos, profundidade {self.depth})>"
+
+
+class ControlFlowGraph:
+    """Grafo de fluxo de controle das instruções [start, end) de um IntermediateCode.
+
+    blocks está na ordem do código; entry é o primeiro bloco. name é o nome da
+    função (None para um trecho qualquer) e function a posição da instrução
+    function no código."""
+
+    def __init__(self, code, start=0, end=None, name=None, function=None):
+        self.code = code
+        self.start = start
+        self.end = len(code) if end is None else end
+        self.name = name
+        self.function = function
+        self.blocks = []
+        self.labels = {}  # Rótulo -> bloco que começa nele
+        self.loops = []  # Cada laço antes dos que ele contém
+        self._split()
+        self._connect()
+        self._dominators()
+        self._find_loops()
+
+    @property
+    def entry(self):
+        return self.blocks[0]
+
+    def instructions(self, block):
+        """(op, a, b, c) de cada instrução do bloco, com op como int."""
+        operands = self.code.operands
+        return zip(self.code.ops[block.start:block.end], *(
+            operands[3 * block.start + k:3 * block.end:3] for k in range(3)))
+
+    def block_at(self, label):
+        """Bloco que começa no rótulo."""
+        return self.labels[label]
+
+    def reverse_postorder(self):
+        """Blocos alcançáveis na ordem reversa de pós-ordem (cada um antes dos
+        sucessores, exceto nas arestas de retorno)."""
+        return self._rpo
+
+    def dominates(self, a, b):
+        """Se o bloco a domina b (todo caminho da entrada até b passa por a)."""
+        return a._pre is not None and b._pre is not None and a._pre <= b._pre and b._post <= a._post
+
+    def _split(self):
+        ops, operands = self.code.ops, self.code.operands
+        blocks = self.blocks
+        block = None
+        previous = None
+        for i in range(self.start, self.end):
+            op = ops[i]
+            if block is None or op == ir.LABEL or previous in TERMINATORS:
+                block = BasicBlock(len(blocks), i)
+                blocks.append(block)
+            if op == ir.LABEL:  # Sempre no início do bloco
+                block.label = label = operands[3 * i]
+                self.labels[label] = block
+            block.end = i + 1
+            previous = op
+        if not blocks:  # Função vazia
+            blocks.append(BasicBlock(0, self.start))
+
+    def _connect(self):
+        ops, operands = self.code.ops, self.code.operands
+        blocks, labels = self.blocks, self.labels
+        for block in blocks:
+            successors = block.successors
+            following = blocks[block.id + 1] if block.id + 1 < len(blocks) else None
+            last = ops[block.end - 1] if block.end > block.start else None
+            if last in TERMINATORS and last != ir.RETURN:
+                label = operands[3 * (block.end - 1) + ir.LABEL_OPERANDS[last]]
+                target = labels.get(label)
+                if target is None:
+                    raise ValueError(f"Desvio para o rótulo {label}, que não existe"
+                                     f"{' em ' + self.name if self.name else ''}.")
+                if last in CONDITIONAL_BRANCHES and following is not None:
+                    successors.append(following)
+                if target not in successors:
+                    successors.append(target)
+            elif last != ir.RETURN and following is not None:
+                successors.append(following)
+            for successor in successors:
+                successor.predecessors.append(block)
+
+    def _dominators(self):
+        # Pós-ordem iterativa a partir da entrada
+        postorder = []
+        entry = self.blocks[0]
+        visited = {entry.id}
+        stack = [(entry, iter(entry.successors))]
+        while stack:
+            block, successors = stack[-1]
+            for successor in successors:
+                if successor.id not in visited:
+                    visited.add(successor.id)
+                    stack.append((successor, iter(successor.successors)))
+                    break
+            else:
+                stack.pop()
+                postorder.append(block)
+        self._rpo = rpo = postorder[::-1]
+        for order, block in enumerate(rpo):
+            block._order = order
+
+        # Cooper, Harvey e Kennedy: idom[i] é a posição do dominador imediato
+        idom = [None] * len(rpo)
+        idom[0] = 0
+        changed = True
+        while changed:
+            changed = False
+            for order in range(1, len(rpo)):
+                new = None
+                for predecessor in rpo[order].predecessors:
+                    other = predecessor._order
+                    if other is None or idom[other] is None:
+                        continue
+                    if new is None:
+                        new = other
+                        continue
+                    while new != other:  # Ancestral comum na árvore parcial
+                        while new > other:
+                            new = idom[new]
+                        while other > new:
+                            other = idom[other]
+                if idom[order] != new:
+                    idom[order] = new
+                    changed = True
+        for order in range(1, len(rpo)):
+            block = rpo[order]
+            block.idom = rpo[idom[order]]
+            block.idom.dominated.append(block)
+
+        # Numeração da árvore de dominadores, para dominates em tempo constante
+        counter = 0
+        stack = [(entry, False)]
+        while stack:
+            block, done = stack.pop()
+            if done:
+                block._post = counter
+                counter += 1
+                continue
+            block._pre = counter
+            counter += 1
+            stack.append((block, True))
+            stack.extend((child, False) for child in reversed(block.dominated))
+
+    def _find_loops(self):
+        # Cabeçalhos: destinos de arestas de retorno (o destino domina a origem)
+        back_edges = {}
+        for block in self._rpo:
+            for successor in block.successors:
+                if self.dominates(successor, block):
+                    back_edges.setdefault(successor, []).append(block)
+
+        # Do cabeçalho mais interno para o mais externo (ordem reversa de pós-ordem
+        # invertida: quem domina vem antes). O corpo é percorrido para trás a partir
+        # das origens das arestas de retorno; ao encontrar um bloco de um laço já
+        # montado, o laço inteiro é pulado (continua pelos predecessores do seu
+        # cabeçalho), então cada bloco é visitado só pelo laço mais interno dele
+        loops = []
+        for header in sorted(back_edges, key=lambda block: block._order, reverse=True):
+            loop = Loop(header)
+            header.loop = loop
+            pending = [source for source in back_edges[header] if source is not header]
+            while pending:
+                block = pending.pop()
+                inner = block.loop
+                if inner is None:
+                    block.loop = loop
+                    loop.own.append(block)
+                    pending.extend(p for p in block.predecessors if p._order is not None)
+                    continue
+                while inner.parent is not None:
+                    inner = inner.parent
+                if inner is not loop:
+                    inner.parent = loop
+                    loop.children.append(inner)
+                    pending.extend(p for p in inner.header.predecessors if p._order is not None)
+            loops.append(loop)
+        loops.reverse()
+        for loop in loops:  # Os que contêm vêm antes dos contidos
+            if loop.parent is not None:
+                loop.depth = loop.parent.depth + 1
+        self.loops = loops
+
+    def format(self):
+        """Texto com os blocos, as instruções, as arestas, os dominadores e os laços."""
+        title = f"function {self.name}" if self.name is not None else "trecho"
+        lines = [f"{title}: {len(self.blocks)} blocos, {len(self.loops)} laços"]
+        for block in self.blocks:
+            details = [f"instruções {block.start}-{block.end - 1}" if len(block) else "vazio"]
+            if not block.reachable:
+                details.append("inalcançável")
+            elif block.idom is not None:
+                details.append(f"idom B{block.idom.id}")
+            if block.loop is not None:
+                details.append(f"laço B{block.loop.header.id}, profundidade {block.loop_depth}")
+            lines.append(f"B{block.id}: {', '.join(details)}")
+            lines.extend(f"    {ir.render(*instruction)}" for instruction in self.instructions(block))
+            if block.successors:
+                lines.append(f"    -> {', '.join(f'B{s.id}' for s in block.successors)}")
+        for loop in self.loops:
+            lines.append(f"laço B{loop.header.id}: {' '.join(f'B{b.id}' for b in loop.blocks)}"
+                         f" (profundidade {loop.depth})")
+        return "\n".join(lines)
+
+    __str__ = format
+
+    def to_dot(self):
+        """Grafo no formato DOT (Graphviz); as arestas de retorno são tracejadas."""
+        def escape(text):
+            return text.replace("\\", "\\\\").replace('"', '\\"')
+
+        title = self.name if self.name is not None else "trecho"
+        lines = [f'digraph "{escape(title)}" {{', '    node [shape=box, fontname="monospace"];']
+        for block in self.blocks:
+            text = [f"B{block.id}"] + [ir.render(*instruction) for instruction in self.instructions(block)]
+            label = "".join(escape(line) + "\\l" for line in text)  # \l: linha alinhada à esquerda
+            style = ", style=dashed" if not block.reachable else ""
+            lines.append(f'    B{block.id} [label="{label}"{style}];')
+        for block in self.blocks:
+            for successor in block.successors:
+                back = self.dominates(successor, block)
+                lines.append(f"    B{block.id} -> B{successor.id}{' [style=dashed]' if back else ''};")
+        lines.append("}")
+        return "\n".join(lines)
+
+
+def function_graphs(code):
+    """Um ControlFlowGraph para cada função do código intermediário, na ordem."""
+    graphs = []
+    ops, operands = code.ops, code.operands
+    function = None
+    for i, op in enumerate(ops):
+        if op == ir.FUNCTION:
+            function = i
+        elif op == ir.END_FUNCTION and function is not None:
+            graphs.append(ControlFlowGraph(code, function + 1, i, operands[3 * function], function))
+            function = None
+    return graphs
+
+
+def main(argv=None):
+    import rastreamento
+    from compilador import Compiler
+
+    parser = argparse.ArgumentParser(description="Mostra os blocos básicos e o grafo de fluxo de "
+                                                 "controle do código intermediário de um programa.")
+    parser.add_argument("arquivo", help="arquivo .c")
+    parser.add_argument("--dot", action="store_true", help="saída no formato DOT (Graphviz)")
+    parser.add_argument("--funcao", metavar="NOME", help="mostra só a função com esse nome")
+    args = parser.parse_args(argv)
+    rastreamento.configurar(rastreamento.ERRO)
+
+    compiler = Compiler()
+    with open(args.arquivo, encoding="utf-8") as f:
+        ast = compiler.parse(compiler.lex(f.read()))
+    compiler.analyze(ast)
+    graphs = function_graphs(compiler.generate_intermediate(ast))
+    if args.funcao is not None:
+        graphs = [graph for graph in graphs if graph.name == args.funcao]
+        if not graphs:
+            parser.error(f"função {args.funcao} não encontrada")
+    for graph in graphs:
+        print(graph.to_dot() if args.dot else graph.format())
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
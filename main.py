@@ -1,59 +1,235 @@
-import analisador_lexico as lex
 import analisador_sintatico as sin
 import analisador_semantico as sem
-import geradorIntermediario as gi
-import ParaMips as pmips
+from compilador import Compiler, CompilationResult
+from cache_incremental import CacheIncremental, DIRETORIO_PADRAO
+from estatisticas import Estatisticas
+import rastreamento
+import serializacao
+import argparse
+import os
 import sys
-# Código de exemplo em C (para ser processado pelo analisador léxico e sintático)
-name = sys.argv[1]
-with open(name, 'r', encoding="utf-8") as file_:
-    c_code = file_.read()
-
-# Processar o código de entrada com o analisador léxico
-print("Processando o código com o analisador léxico...")
-lex.process_code(c_code, 1)
-
-print()
-
-# Executar o analisador sintático
-print("Analisando o código com o analisador sintático...")
-ast = sin.parse_code(c_code, 0)
-print("Análise Sintática concluída.")
-
-print()
-
-# Executar o analisador semântico
-print("Executando o analisador semântico...")
-semantic_analyzer = sem.SemanticAnalyzer()  # Inicializa o analisador semântico
-try:
-    semantic_analyzer.analyze(ast)  # Realiza a análise semântica na AST
-    print("Análise Semântica concluída sem erros.")
-except RuntimeError as e:
-    print(f"Erro na análise semântica: {e}")
-
-symbol_table = semantic_analyzer.get_all_symbols()
-sem.show_symbol_table(symbol_table)
-
-print()
-
-# Gerar código intermediário
-print("Gerador do Código Intermediário...")
-codI = gi.process_node(ast, symbol_table)
-print("Código Intermediário Gerado:")
-print(codI)
-print("Geração concluída.")
-
-print()
-
-
-# Converter código intermediário para MIPS
-print("Convertendo o Código Intermediário para MIPS...")
-mips_code = pmips.process_intermediate_to_mips(codI.split("\n"))
-print("Código MIPS Gerado:")
-print(mips_code)
-
-# Salvar o código MIPS em um arquivo
-output_file = name + ".asm"
-with open(output_file, 'w', encoding="utf-8") as f:
-    f.write(mips_code)
-print(f"Código MIPS salvo em {output_file}.")
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+_log = rastreamento.canal("compilador")
+
+def compilar(name, stats=None, cache=None, emitir=(), origem="c"):
+    """Executa todas as fases do compilador sobre um arquivo C e salva o name.asm.
+
+    Com stats (Estatisticas), os tempos de cada fase e os contadores são registrados nele.
+    Com cache (CacheIncremental), funções que não mudaram vêm do cache.
+    emitir pode ter "ast" e "ir": grava também name.ast e name.ir (serializacao).
+    Com origem "ast" ou "ir", name é um desses arquivos e a compilação começa dele;
+    a saída vai para o nome sem a extensão (prog.c.ast -> prog.c.asm).
+    Devolve o CompilationResult da compilação."""
+    compiler = Compiler(stats, cache)
+    base = name
+    if origem != "c" and name.endswith("." + origem):
+        base = name[:-len(origem) - 1]
+    tokens = ast = symbol_table = None
+    errors = []
+
+    if origem == "ir":
+        if _log.info:
+            _log.write("Lendo o código intermediário de %s...", name)
+        codI = compiler.load_intermediate(name)
+    else:
+        if origem == "ast":
+            if _log.info:
+                _log.write("Lendo a AST de %s...", name)
+            ast = compiler.load_ast(name)
+        else:
+            # Processar o código de entrada com o analisador léxico
+            if _log.info:
+                _log.write("Processando o código com o analisador léxico...")
+            # Arquivo lido sob demanda (mmap); os tokens só são listados no modo detalhado
+            tokens = compiler.lex(Path(name), 1 if _log.info else 0)
+
+            # Executar o analisador sintático
+            if _log.info:
+                _log.write("")
+                _log.write("Analisando o código com o analisador sintático...")
+            ast = compiler.parse(tokens)
+            if _log.info:
+                _log.write("Análise Sintática concluída.")
+                _log.write("")
+        if "ast" in emitir:
+            serializacao.gravar_ast(ast, base + ".ast")
+            if _log.info:
+                _log.write("AST salva em %s.", base + ".ast")
+
+        # Executar o analisador semântico
+        if _log.info:
+            _log.write("Executando o analisador semântico...")
+        errors = []
+        try:
+            compiler.analyze(ast)  # Realiza a análise semântica na AST
+        except RuntimeError as e:
+            errors.append(str(e))
+        errors[:0] = compiler.semantic_analyzer.report["errors"]
+        for error in errors:
+            _log.erro("Erro na análise semântica: %s", error)
+
+        symbol_table = compiler.semantic_analyzer.get_all_symbols()
+        if _log.info:
+            if not errors:
+                _log.write("Análise Semântica concluída sem erros.")
+            sem.show_symbol_table(symbol_table)
+            _log.write("")
+
+        # Gerar código intermediário
+        if _log.info:
+            _log.write("Gerador do Código Intermediário...")
+        codI = compiler.generate_intermediate(ast)
+        if _log.info:
+            _log.write("Código Intermediário Gerado:")
+            _log.write("%s", codI)
+            _log.write("Geração concluída.")
+            _log.write("")
+    if "ir" in emitir:
+        serializacao.gravar_ir(codI, base + ".ir")
+        if _log.info:
+            _log.write("Código intermediário salvo em %s.", base + ".ir")
+
+    # Converter código intermediário para MIPS
+    if _log.info:
+        _log.write("Convertendo o Código Intermediário para MIPS...")
+    mips_code = compiler.to_mips(codI)
+    if _log.info:
+        _log.write("Código MIPS Gerado:")
+        _log.write(mips_code)
+
+    # Salvar o código MIPS em um arquivo
+    output_file = base + ".asm"
+    with open(output_file, 'w', encoding="utf-8") as f:
+        f.write(mips_code)
+    if _log.info:
+        _log.write("Código MIPS salvo em %s.", output_file)
+        if cache is not None:
+            _log.write("Cache incremental: %d acertos, %d faltas.", cache.hits, cache.misses)
+    return CompilationResult(tokens, ast, symbol_table, errors, codI, mips_code)
+
+
+def listar_entradas(caminhos):
+    """Expande diretórios nos arquivos .c que eles contêm (em ordem alfabética)."""
+    arquivos = []
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            arquivos.extend(sorted(str(p) for p in Path(caminho).rglob("*.c")))
+        else:
+            arquivos.append(caminho)
+    return arquivos
+
+
+_diretorio_cache = None  # Diretório do cache incremental nos processos do lote
+
+
+def _iniciar_trabalhador(diretorio_cache=None):
+    """Prepara um processo do lote: parser já carregado e saída detalhada descartada."""
+    global _diretorio_cache
+    _diretorio_cache = diretorio_cache
+    sin.get_parser()
+    rastreamento.configurar(rastreamento.ERRO)
+    sys.stdout = open(os.devnull, "w", encoding="utf-8")
+
+
+def _compilar_no_lote(name):
+    """Compila um arquivo dentro de um processo do lote e devolve
+    (arquivo, erro, tempo, acertos do cache, faltas do cache); erro é None só
+    quando a compilação termina sem exceção e sem erros semânticos."""
+    inicio = time.perf_counter()
+    cache = CacheIncremental(_diretorio_cache) if _diretorio_cache else None
+    try:
+        errors = compilar(name, cache=cache).errors
+        erro = "; ".join(errors) if errors else None
+    except Exception as e:
+        erro = f"{type(e).__name__}: {e}"
+    hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+    return name, erro, time.perf_counter() - inicio, hits, misses
+
+
+def compilar_lote(arquivos, jobs=None, diretorio_cache=None):
+    """Compila vários arquivos em paralelo e imprime um resumo. Retorna o número de falhas."""
+    jobs = jobs or os.cpu_count() or 1
+    # Blocos maiores diminuem a troca de mensagens quando há milhares de arquivos pequenos
+    chunksize = max(1, len(arquivos) // (jobs * 4))
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_iniciar_trabalhador,
+                             initargs=(diretorio_cache,)) as executor:
+        resultados = list(executor.map(_compilar_no_lote, arquivos, chunksize=chunksize))
+    total = time.perf_counter() - inicio
+    falhas = imprimir_resumo([r[:3] for r in resultados], jobs, total)
+    if diretorio_cache:
+        print(f"Cache incremental: {sum(r[3] for r in resultados)} acertos, "
+              f"{sum(r[4] for r in resultados)} faltas.")
+    return falhas
+
+
+def imprimir_resumo(resultados, jobs, total):
+    """Imprime o resumo de um lote de (arquivo, erro, tempo). Retorna o número de falhas."""
+    falhas = [r for r in resultados if r[1] is not None]
+    print("--- Resumo da Compilação ---")
+    for name, erro, tempo in resultados:
+        status = "ok" if erro is None else "ERRO"
+        print(f"  [{status:>4}] {name} ({tempo * 1000:.1f} ms)")
+    print(f"Arquivos: {len(resultados)}, sucesso: {len(resultados) - len(falhas)}, "
+          f"falhas: {len(falhas)}, processos: {jobs}, tempo total: {total:.2f} s")
+    if falhas:
+        print("Falhas:")
+        for name, erro, _ in falhas:
+            print(f"  {name}: {erro}")
+    print("----------------------------")
+    return len(falhas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compilador de um subconjunto de C para MIPS.")
+    parser.add_argument("arquivos", nargs="+",
+                        help="arquivos .c ou diretórios (vários arquivos ativam o modo em lote)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="número de processos no modo em lote (padrão: número de CPUs)")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="modo de produção: grava apenas o .asm e mostra apenas erros")
+    parser.add_argument("--cache", nargs="?", const=DIRETORIO_PADRAO, metavar="DIRETORIO",
+                        help="reaproveita o código das funções que não mudaram "
+                             f"(cache em disco; padrão: {DIRETORIO_PADRAO})")
+    parser.add_argument("--stats", action="store_true",
+                        help="mostra o tempo de cada fase e os contadores da compilação")
+    parser.add_argument("--stats-json", nargs="?", const="-", metavar="ARQUIVO",
+                        help="grava as estatísticas em JSON no arquivo (ou na saída padrão)")
+    parser.add_argument("--emit-ast", action="store_true",
+                        help="grava também a AST serializada (arquivo.c.ast)")
+    parser.add_argument("--emit-ir", action="store_true",
+                        help="grava também o código intermediário serializado (arquivo.c.ir)")
+    origem = parser.add_mutually_exclusive_group()
+    origem.add_argument("--from-ast", dest="origem", action="store_const", const="ast", default="c",
+                        help="o arquivo é uma AST gravada com --emit-ast; a compilação começa da análise semântica")
+    origem.add_argument("--from-ir", dest="origem", action="store_const", const="ir",
+                        help="o arquivo é um intermediário gravado com --emit-ir; só a conversão para MIPS é feita")
+    args = parser.parse_args(argv)
+    rastreamento.configurar(rastreamento.ERRO if args.quiet else rastreamento.DEBUG)
+
+    if len(args.arquivos) == 1 and not os.path.isdir(args.arquivos[0]):
+        stats = Estatisticas(args.arquivos[0]) if args.stats or args.stats_json else None
+        cache = CacheIncremental(args.cache) if args.cache else None
+        emitir = [nome for nome, pedido in (("ast", args.emit_ast), ("ir", args.emit_ir)) if pedido]
+        result = compilar(args.arquivos[0], stats, cache, emitir, args.origem)
+        if args.stats:
+            print(stats.report())
+        if args.stats_json == "-":
+            print(stats.to_json())
+        elif args.stats_json:
+            with open(args.stats_json, "w", encoding="utf-8") as f:
+                f.write(stats.to_json() + "\n")
+        return 1 if result.errors else 0
+    if args.stats or args.stats_json:
+        parser.error("--stats e --stats-json só valem para a compilação de um único arquivo")
+    if args.emit_ast or args.emit_ir or args.origem != "c":
+        parser.error("--emit-ast, --emit-ir, --from-ast e --from-ir só valem para a compilação "
+                     "de um único arquivo")
+    return 1 if compilar_lote(listar_entradas(args.arquivos), args.jobs, args.cache) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,519 @@
+"""Otimizações do código intermediário, entre a geração e a conversão para MIPS.
+
+Cada função é otimizada isoladamente: os temporários, os rótulos e as variáveis
+locais são só dela, então o resultado não depende do resto do programa e pode
+ir para o cache incremental (cache_incremental guarda a função já otimizada).
+As instruções fora das funções (declarações globais e diretivas) não mudam.
+
+Numeração de valores, uma vez no início:
+    cada operação recebe um número de valor a partir da operação e dos números
+    dos operandos ((op, valores) é a chave de uma tabela hash; nas operações
+    comutativas os operandos vão em ordem); uma operação que repete um valor já
+    calculado e ainda guardado em algum nome vira uma cópia desse nome, e as
+    leituras de temporários passam a usar o nome que guardou o valor primeiro
+    (a cópia fica morta e sai na eliminação de código morto). A tabela vale em
+    cada bloco básico e segue para os blocos com um único predecessor (blocos
+    básicos estendidos); nos pontos de junção, como o início dos laços, recomeça.
+    Escritas na memória (store, v[i] = x) e chamadas invalidam as leituras da
+    memória (v[i], load) e das variáveis globais feitas antes delas
+
+Eliminação de código morto, repetida até não haver mais o que remover:
+    blocos inalcançáveis -- código depois de return ou goto que nenhum desvio
+                            alcança, e ramos que a execução não pode tomar
+    definições mortas    -- instruções sem efeito colateral (cópias, operações,
+                            leituras de memória e endereços) cujo resultado não é
+                            lido depois em nenhum caminho (análise de variáveis
+                            vivas sobre o grafo de fluxo, grafo_fluxo), ou que só
+                            é lido por outras definições mortas
+    desvios e rótulos    -- um desvio para um rótulo que só leva a um goto passa a
+                            ir direto para o destino final; desvios para a própria
+                            instrução seguinte e rótulos sem desvios saem
+
+Só os valores locais à função podem ter a definição removida: temporários,
+variáveis locais e parâmetros escalares, exceto os que têm o endereço tomado
+(&x), que podem ser lidos por um ponteiro. Variáveis globais, vetores e escritas
+na memória ficam, assim como chamadas (a função pode ter efeitos), param e return.
+
+Os contadores de cada otimização (COUNTERS) são somados no dicionário counts.
+"""
+import itertools
+
+import codigo_intermediario as ir
+from grafo_fluxo import ControlFlowGraph
+
+# Contadores das otimizações (estatisticas)
+COUNTERS = ("expressions_eliminated", "instructions_removed", "blocks_removed")
+
+# Posições (entre a, b e c) dos operandos lidos por cada operação
+_USES = {
+    ir.COPY: (1,), ir.IF_FALSE: (0,), ir.LOAD_INDEX: (1, 2), ir.STORE_INDEX: (0, 1, 2),
+    ir.ADDRESS_INDEX: (1, 2), ir.LOAD: (1,), ir.STORE: (0, 1), ir.PARAM: (0,), ir.RETURN: (0,),
+    ir.DECLARE_VECTOR: (2,),
+}
+_USES.update((op, (1, 2)) for op in ir.BINARY_OPS.values())
+_USES.update((op, (0, 1)) for op in ir.BRANCH_OPS.values())
+_USES = [_USES.get(op, ()) for op in ir.Op]
+
+# Operações que escrevem no operando a; as sem efeito colateral podem ser removidas
+_DEFINES = frozenset(ir.BINARY_OPS.values()) | {
+    ir.COPY, ir.LOAD_INDEX, ir.ADDRESS, ir.ADDRESS_INDEX, ir.LOAD, ir.CALL}
+_REMOVABLE = _DEFINES - {ir.CALL}
+
+# Operações em que a ordem dos operandos b e c não muda o resultado
+_COMMUTATIVE = frozenset((ir.ADD, ir.MUL, ir.AND, ir.EQ, ir.NE))
+_BINARY = frozenset(ir.BINARY_OPS.values())
+
+_MISSING = object()  # Chave que não existia, no registro de desfazer
+
+
+def new_counts():
+    return dict.fromkeys(COUNTERS, 0)
+
+
+def optimize(code, counts=None):
+    """Código otimizado (um novo IntermediateCode) do programa inteiro."""
+    result = ir.IntermediateCode()
+    ops = code.ops
+    start = 0  # Início do trecho ainda não copiado
+    function = None
+    for i, op in enumerate(ops):
+        if op == ir.FUNCTION:
+            function = i
+        elif op == ir.END_FUNCTION and function is not None:
+            result.extend(code.slice(start, function))
+            result.extend(optimize_function(code.slice(function, i + 1), counts))
+            start = i + 1
+            function = None
+    result.extend(code.slice(start))
+    return result
+
+
+def optimize_function(code, counts=None):
+    """Código otimizado de uma função: code vai de function até end_function."""
+    if counts is None:
+        counts = new_counts()
+    body = code.slice(1, len(code) - 1)
+    local = _local_names(code)
+    body = _number_values(body, local, counts)
+    while True:
+        body, removed = _remove_dead_code(body, local, counts)
+        body, simplified = _simplify_branches(body, counts)
+        if not removed and not simplified:
+            break
+    result = code.slice(0, 1)
+    result.extend(body)
+    result.extend(code.slice(len(code) - 1))
+    return result
+
+
+def _local_names(code):
+    """Nomes locais cuja definição pode ser removida quando não são lidos."""
+    ops, operands = code.ops, code.operands
+    local = set()
+    params = operands[1]
+    if params:
+        for param in params.split(", "):
+            name = param.rsplit(" ", 1)[-1]
+            if not name.endswith("[]"):  # Vetores ficam na memória de quem chamou
+                local.add(name)
+    address_taken = set()
+    for i, op in enumerate(ops):
+        if op == ir.DECLARE:
+            local.add(operands[3 * i + 1])
+        elif op == ir.ADDRESS:
+            address_taken.add(operands[3 * i + 1])
+        elif op in _DEFINES:
+            dest = operands[3 * i]
+            if dest.startswith(ir.TEMPORARY_PREFIX):
+                local.add(dest)
+    return local - address_taken
+
+
+def _is_name(operand):
+    """Se o operando é um nome (variável, vetor ou temporário), e não uma constante
+    ou um literal."""
+    first = operand[:1]
+    return first.isalpha() or first == "_" or first == "%"
+
+
+def _number_values(body, local, counts):
+    """Numeração de valores nos blocos básicos estendidos. Devolve o novo código.
+
+    numbers guarda o número do valor de cada nome (os não locais, que a memória
+    pode mudar, com a versão da memória junto: (nome, versão)), expressions o de
+    cada operação já calculada e holders o primeiro nome que recebeu cada valor.
+    As mudanças nas tabelas vão para log, e voltar a um ponto do log desfaz as
+    feitas depois dele: um bloco começa com as tabelas do fim do predecessor, e
+    o irmão seguinte não vê as mudanças do anterior."""
+    graph = ControlFlowGraph(body)
+    ops = bytearray(body.ops)
+    operands = list(body.operands)
+    keep = bytearray(b"\x01") * len(ops)
+    numbers, expressions, holders = {}, {}, {}
+    log = []
+    new_number = itertools.count().__next__  # Números de valores e versões da memória
+    eliminated = 0
+
+    def assign(table, key, value):
+        log.append((table, key, table.get(key, _MISSING)))
+        table[key] = value
+
+    def rollback(mark):
+        while len(log) > mark:
+            table, key, previous = log.pop()
+            if previous is _MISSING:
+                del table[key]
+            else:
+                table[key] = previous
+
+    def key_of(name, memory):
+        return name if name in local or not _is_name(name) else (name, memory)
+
+    def number(name, memory):
+        """Número do valor do operando (um novo, se ainda não tem)."""
+        key = key_of(name, memory)
+        value = numbers.get(key)
+        if value is None:
+            value = new_number()
+            assign(numbers, key, value)
+            assign(holders, value, name)
+        return value
+
+    def holder(value, memory):
+        """Nome que ainda guarda o valor, ou None."""
+        name = holders.get(value)
+        if name is not None and numbers.get(key_of(name, memory)) == value:
+            return name
+        return None
+
+    def define(name, value, memory):
+        if holder(value, memory) is None:
+            assign(holders, value, name)
+        assign(numbers, key_of(name, memory), value)
+
+    def visit(block, memory):
+        """Numera as instruções do bloco; devolve a versão da memória no fim."""
+        nonlocal eliminated
+        for i in range(block.start, block.end):
+            op = ops[i]
+            base = 3 * i
+            # Temporário lido: o nome que guardou o mesmo valor primeiro
+            for slot in _USES[op]:
+                name = operands[base + slot]
+                if name in local and name.startswith(ir.TEMPORARY_PREFIX):
+                    value = numbers.get(name)
+                    if value is not None:
+                        first = holder(value, memory)
+                        if first is not None and first != name and _is_name(first):
+                            operands[base + slot] = first
+            a, b, c = operands[base:base + 3]
+            if op in _BINARY:
+                left, right = number(b, memory), number(c, memory)
+                if op in _COMMUTATIVE and left > right:
+                    left, right = right, left
+                key = (op, left, right)
+            elif op == ir.COPY:
+                value = number(b, memory)
+                if numbers.get(key_of(a, memory)) == value:  # a já tem o valor
+                    keep[i] = 0
+                    eliminated += 1
+                else:
+                    if a not in local:  # Escrita na memória, como um store
+                        memory = new_number()
+                    define(a, value, memory)
+                continue
+            elif op == ir.LOAD_INDEX:
+                key = (op, number(b, memory), number(c, memory), memory)
+            elif op == ir.ADDRESS_INDEX:
+                key = (op, number(b, memory), number(c, memory))
+            elif op == ir.ADDRESS:
+                key = (op, b)
+            elif op == ir.LOAD:
+                key = (op, number(b, memory), memory)
+            elif op == ir.CALL:
+                memory = new_number()
+                define(a, new_number(), memory)
+                continue
+            elif op == ir.STORE or op == ir.STORE_INDEX:
+                memory = new_number()
+                continue
+            elif op == ir.DECLARE:
+                define(b, new_number(), memory)
+                continue
+            else:
+                continue
+            value = expressions.get(key)
+            if value is None:
+                value = new_number()
+                assign(expressions, key, value)
+            else:
+                first = holder(value, memory)
+                if first == a:  # Recalcula o valor que a já tem
+                    keep[i] = 0
+                    eliminated += 1
+                    continue
+                if first is not None:
+                    ops[i] = ir.COPY
+                    operands[base + 1:base + 3] = (first, None)
+                    eliminated += 1
+            if a not in local:
+                memory = new_number()
+            define(a, value, memory)
+        return memory
+
+    # Cada raiz (entrada, junções e cabeçalhos de laço) começa com as tabelas vazias;
+    # os blocos com um único predecessor, anterior a eles na ordem, continuam as
+    # tabelas do fim dele. A entrada é sempre raiz, mesmo quando o único
+    # predecessor é a volta de um laço (corpo que começa com while ou do-while)
+    order = graph.reverse_postorder()
+    single = set()
+    for block in order[1:]:
+        predecessors = [predecessor for predecessor in block.predecessors if predecessor.reachable]
+        if len(predecessors) == 1 and predecessors[0]._order < block._order:
+            single.add(block.id)
+    for root in order:
+        if root.id in single:
+            continue
+        pending = [(root, new_number())]
+        while pending:
+            item = pending.pop()
+            if type(item) is int:
+                rollback(item)
+                continue
+            block, memory = item
+            pending.append(len(log))
+            memory = visit(block, memory)
+            for successor in block.successors:
+                if successor.id in single:
+                    pending.append((successor, memory))
+
+    counts["expressions_eliminated"] += eliminated
+    result = ir.IntermediateCode()
+    result.ops = ops
+    result.operands = operands
+    return _compact(result, keep) if keep.count(0) else result
+
+
+def _accesses(body, local):
+    """Nomes locais lidos e nome local escrito (ou None) por cada instrução."""
+    ops, operands = body.ops, body.operands
+    reads = []
+    writes = []
+    for i, op in enumerate(ops):
+        slots = _USES[op]
+        if slots:
+            reads.append([name for name in (operands[3 * i + slot] for slot in slots)
+                          if name in local])
+        else:
+            reads.append(())
+        dest = operands[3 * i] if op in _DEFINES else None
+        writes.append(dest if dest in local else None)
+    return reads, writes
+
+
+def _remove_dead_code(body, local, counts):
+    """Tira os blocos inalcançáveis e as definições mortas. Devolve (código, se mudou)."""
+    graph = ControlFlowGraph(body)
+    blocks = graph.blocks
+    ops = body.ops
+    keep = bytearray(b"\x01") * len(body)
+    reads, writes = _accesses(body, local)
+
+    for block in blocks:
+        if not block.reachable and len(block):
+            keep[block.start:block.end] = bytes(len(block))
+            counts["blocks_removed"] += 1
+            counts["instructions_removed"] += len(block)
+
+    # Variáveis vivas entre blocos, em máscaras de bits: use são as lidas antes de
+    # escritas no bloco, defs as que o bloco não escreve. Só os nomes lidos antes de
+    # escritos em algum bloco têm bit; os outros (quase todos os temporários) nunca
+    # estão vivos na entrada de um bloco, e as máscaras continuam curtas
+    block_reads, block_writes = [], []
+    for block in blocks:
+        read, written = set(), set()
+        for i in range(block.end - 1, block.start - 1, -1):
+            dest = writes[i]
+            if dest is not None:
+                read.discard(dest)
+                written.add(dest)
+            read.update(reads[i])
+        block_reads.append(read)
+        block_writes.append(written)
+    exposed = set().union(*block_reads)
+    bit = {name: 1 << i for i, name in enumerate(exposed)}
+    use = [sum(bit[name] for name in read) for read in block_reads]
+    defs = [~sum(bit[name] for name in written if name in bit) for written in block_writes]
+    successors = [[successor.id for successor in block.successors] for block in blocks]
+    live_in = _live_blocks(graph, use, defs)
+
+    # Definições mortas: percorre cada bloco de trás para frente; os nomes sem bit
+    # só estão vivos dentro do bloco e ficam em um conjunto à parte
+    removed = 0
+    for block in graph.reverse_postorder():
+        live = 0
+        for successor in successors[block.id]:
+            live |= live_in[successor]
+        inside = set()
+        for i in range(block.end - 1, block.start - 1, -1):
+            dest = writes[i]
+            if dest is not None:
+                flag = bit.get(dest)
+                alive = dest in inside if flag is None else live & flag
+                if ops[i] in _REMOVABLE and not alive:
+                    keep[i] = 0
+                    removed += 1
+                    continue
+                if flag is None:
+                    inside.discard(dest)
+                elif alive:
+                    live ^= flag
+            for name in reads[i]:
+                flag = bit.get(name)
+                if flag is None:
+                    inside.add(name)
+                else:
+                    live |= flag
+
+    # Valores que só alimentam a si mesmos (y = y + i num laço, com y nunca lido
+    # fora dele) continuam vivos acima; marca as definições úteis a partir das
+    # instruções com efeito e sobe pelas leituras, e o que não foi marcado sai
+    definitions = {}  # Nome local -> posições das definições removíveis
+    needed = set()
+    pending = []
+    for i, op in enumerate(ops):
+        if not keep[i]:
+            continue
+        if writes[i] is not None and op in _REMOVABLE:
+            definitions.setdefault(writes[i], []).append(i)
+        else:
+            pending.extend(reads[i])
+    useful = bytearray(len(ops))
+    while pending:
+        name = pending.pop()
+        if name in needed:
+            continue
+        needed.add(name)
+        for i in definitions.get(name, ()):
+            useful[i] = 1
+            pending.extend(reads[i])
+    for positions in definitions.values():
+        for i in positions:
+            if not useful[i]:
+                keep[i] = 0
+                removed += 1
+    counts["instructions_removed"] += removed
+
+    if keep.count(0) == 0:
+        return body, False
+    return _compact(body, keep), True
+
+
+def _live_blocks(graph, use, defs):
+    """Variáveis vivas na entrada de cada bloco (máscaras indexadas pelo id), uma
+    aproximação por cima: nunca deixa de fora uma variável viva.
+
+    Sem repetir a análise até estabilizar, o que custaria uma passada por nível
+    de aninhamento dos laços, são duas etapas lineares:
+        1. pós-ordem sem as arestas de retorno: o que é lido adiante sem voltar
+           a nenhum cabeçalho (no grafo acíclico, basta uma passada);
+        2. laços, dos externos para os internos: o que está vivo no cabeçalho de
+           um laço (o da etapa 1 mais o do cabeçalho do laço que o contém) fica
+           vivo em todos os blocos dele.
+    Um caminho que volta a um cabeçalho continua como um caminho a partir dele,
+    então tudo o que ele lê está entre as variáveis vivas no cabeçalho; a
+    aproximação é só supor que nenhuma delas é escrita no corpo antes da volta.
+    Os grafos gerados a partir do C são redutíveis (toda aresta que volta na
+    ordem vai para um cabeçalho que domina a origem); se não for o caso, todas
+    as variáveis lidas no código ficam vivas em todos os blocos."""
+    blocks = graph.blocks
+    order = graph.reverse_postorder()
+    live = [0] * len(blocks)
+    for block in reversed(order):
+        index = block.id
+        out = 0
+        for successor in block.successors:
+            if successor._order > block._order:
+                out |= live[successor.id]
+            elif not graph.dominates(successor, block):  # Grafo irredutível
+                everything = 0
+                for read in use:
+                    everything |= read
+                return [everything] * len(blocks)
+        live[index] = use[index] | (out & defs[index])
+    carried = {}  # Laço -> vivas no cabeçalho, com as dos laços de fora
+    for loop in graph.loops:  # Os que contêm vêm antes dos contidos
+        header = live[loop.header.id]
+        carried[loop] = header | carried[loop.parent] if loop.parent is not None else header
+    for block in order:
+        if block.loop is not None:
+            live[block.id] |= carried[block.loop]
+    return live
+
+
+def _simplify_branches(body, counts):
+    """Encurta desvios que levam a um goto e tira desvios inúteis e rótulos sem uso."""
+    ops, operands = body.ops, body.operands
+    label_position = {}
+    for i, op in enumerate(ops):
+        if op == ir.LABEL:
+            label_position[operands[3 * i]] = i
+
+    def next_instruction(i):
+        """Primeira instrução depois de i que não é um rótulo."""
+        while i < len(ops) and ops[i] == ir.LABEL:
+            i += 1
+        return i
+
+    def final_target(label):
+        """Rótulo onde a execução continua de fato: segue os gotos em sequência."""
+        seen = set()
+        while label not in seen:
+            seen.add(label)
+            i = next_instruction(label_position[label] + 1)
+            if i == len(ops) or ops[i] != ir.GOTO:
+                break
+            label = operands[3 * i]
+        return label
+
+    operands = list(operands)
+    keep = bytearray(b"\x01") * len(ops)
+    referenced = set()
+    for i, op in enumerate(ops):
+        slot = ir.LABEL_OPERANDS.get(op)
+        if slot is None or op == ir.LABEL:
+            continue
+        position = 3 * i + slot
+        label = operands[position] = final_target(operands[position])
+        # Desvio para a próxima instrução: só os rótulos ficam entre os dois
+        j = i + 1
+        while j < len(ops) and ops[j] == ir.LABEL and operands[3 * j] != label:
+            j += 1
+        if j < len(ops) and ops[j] == ir.LABEL:
+            keep[i] = 0
+        else:
+            referenced.add(label)
+    for i, op in enumerate(ops):
+        if op == ir.LABEL and operands[3 * i] not in referenced:
+            keep[i] = 0
+
+    changed = operands != body.operands
+    removed = keep.count(0)
+    if not removed and not changed:
+        return body, False
+    counts["instructions_removed"] += removed
+    result = ir.IntermediateCode()
+    result.ops = body.ops
+    result.operands = operands
+    return _compact(result, keep) if removed else result, True
+
+
+def _compact(code, keep):
+    """Cópia só com as instruções marcadas em keep."""
+    result = ir.IntermediateCode()
+    operands = code.operands
+    for i, op in enumerate(code.ops):
+        if keep[i]:
+            result.ops.append(op)
+            result.operands += operands[3 * i:3 * i + 3]
+    return result
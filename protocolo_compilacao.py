@@ -0,0 +1,53 @@
+"""Protocolo entre o servidor de compilação e seus clientes.
+
+Cada mensagem é um JSON em UTF-8 precedido do seu tamanho (4 bytes, big-endian).
+
+Pedidos:
+    {"id": 1, "op": "compilar", "path": "/abs/arquivo.c", "nivel": 2, "stats": false}
+    {"id": 2, "op": "compilar", "source": "int x = 1;"}
+    {"id": 3, "op": "ping"}
+    {"id": 4, "op": "encerrar"}
+
+Com "path", o servidor faz o mesmo que o main.py (grava arquivo.c.asm); com
+"source", apenas devolve o código. "nivel" é o nível de rastreamento da
+compilação (padrão: ERRO) e "saida" traz, na resposta, tudo o que ela escreveu.
+Com "cache" (um diretório), o cache incremental é usado e a resposta inclui
+"cache_hits" e "cache_misses".
+
+Resposta de uma compilação:
+    {"id": 1, "ok": true, "erro": null, "saida": "...", "errors": [...],
+     "intermediate_code": "...", "mips_code": "...", "stats": {...} ou null,
+     "tempo": 0.0012}
+"""
+import json
+import os
+import struct
+import tempfile
+
+_TAMANHO = struct.Struct(">I")
+TAMANHO_CABECALHO = _TAMANHO.size
+
+# Mensagens maiores que isso são recusadas (programas de até 100 MB cabem com folga)
+TAMANHO_MAXIMO = 512 * 1024 * 1024
+
+
+def socket_padrao():
+    """Caminho padrão do socket, um por usuário."""
+    return os.path.join(tempfile.gettempdir(), f"compilador-{os.getuid()}.sock")
+
+
+def codificar(mensagem):
+    dados = json.dumps(mensagem, ensure_ascii=False).encode("utf-8")
+    return _TAMANHO.pack(len(dados)) + dados
+
+
+def decodificar_tamanho(cabecalho):
+    (tamanho,) = _TAMANHO.unpack(cabecalho)
+    if tamanho > TAMANHO_MAXIMO:
+        raise ValueError(f"Mensagem grande demais: {tamanho} bytes")
+    return tamanho
+
+
+def decodificar(dados):
+    return json.loads(dados.decode("utf-8"))
+
@@ -0,0 +1,66 @@
+"""Canal de diagnóstico com níveis e categorias, usado por todas as fases.
+
+Cada módulo obtém o canal da sua categoria uma única vez:
+
+    _log = rastreamento.canal("semantico")
+
+e testa o nível antes de montar a mensagem:
+
+    if _log.debug:
+        _log.write("Visiting node: %s", node)
+
+Com o nível desligado o custo é a leitura de um atributo: a mensagem não é
+formatada e nenhum repr é calculado. Mesmo sem o teste, os argumentos só são
+formatados (com %) dentro de write. Mensagens de erro são sempre emitidas.
+"""
+import sys
+
+ERRO = 0  # Apenas erros (modo --quiet)
+INFO = 1  # Resultados de cada fase (tokens, AST, código gerado)
+DEBUG = 2  # Detalhes internos das fases (por exemplo, cada nó visitado)
+
+CATEGORIAS = ("lexico", "sintatico", "semantico", "intermediario", "mips", "compilador")
+
+saida = None  # Destino das mensagens; None usa o sys.stdout do momento da escrita
+
+_niveis = dict.fromkeys(CATEGORIAS, ERRO)
+_canais = {}
+
+
+class Canal:
+    """Mensagens de diagnóstico de uma categoria; info e debug indicam os níveis ativos."""
+    __slots__ = ("nome", "info", "debug")
+
+    def __init__(self, nome):
+        self.nome = nome
+        self._aplicar(_niveis.get(nome, ERRO))
+
+    def _aplicar(self, nivel):
+        self.info = nivel >= INFO
+        self.debug = nivel >= DEBUG
+
+    def write(self, mensagem, *args):
+        """Escreve a mensagem; os argumentos só são formatados aqui."""
+        if args:
+            mensagem = mensagem % args
+        print(mensagem, file=saida or sys.stdout)
+
+    def erro(self, mensagem, *args):
+        """Erros são emitidos em qualquer nível."""
+        self.write(mensagem, *args)
+
+
+def canal(nome):
+    """Retorna o canal (único) da categoria."""
+    c = _canais.get(nome)
+    if c is None:
+        c = _canais[nome] = Canal(nome)
+    return c
+
+
+def configurar(nivel, categorias=None):
+    """Define o nível de todas as categorias ou apenas das categorias indicadas."""
+    for nome in categorias or CATEGORIAS:
+        _niveis[nome] = nivel
+        if nome in _canais:
+            _canais[nome]._aplicar(nivel)
@@ -0,0 +1,380 @@
+"""Formato binário da AST e do código intermediário (main.py --emit-ast/--emit-ir).
+
+Os dois formatos começam com um cabeçalho (assinatura, versão do formato e o
+tamanho de cada seção) e guardam os textos uma única vez, em uma tabela de
+textos: os nomes, tipos, operadores e literais da AST e os operandos do
+intermediário são índices nessa tabela. Os números são inteiros little-endian
+de 32 bits (os operandos do intermediário têm 16 bits quando cabem) e cada
+seção começa alinhada em 4 bytes, para que o leitor use as seções diretamente
+do arquivo mapeado (mmap), sem copiá-las.
+
+AST (assinatura CAST):
+    cabeçalho, tabela de textos, início de cada nó, palavras dos nós, listas
+Os nós são gravados em pós-ordem (os filhos antes do pai). Cada nó ocupa as
+palavras [kind, linha, campo...], com os campos na ordem de fields da classe
+(arvore_sintatica). Cada campo é um valor marcado: os 3 bits baixos dizem o
+que ele é (None, False, True, nó, texto ou lista) e o resto é o índice do nó,
+do texto ou da lista. Uma lista é [quantidade, nó...] na seção de listas; o
+programa é a lista indicada no cabeçalho.
+
+Intermediário (assinatura CIRB):
+    cabeçalho, tabela de textos, operações, operandos
+As operações são um byte por instrução (codigo_intermediario.Op) e os operandos
+três palavras por instrução, cada uma o índice do texto mais 1 (0 é None).
+
+LeitorAST e LeitorIR trabalham sobre o arquivo mapeado e só decodificam o que é
+pedido: LeitorAST.raiz() devolve nós preguiçosos (NoMapeado), que leem os
+campos do arquivo quando acessados, e LeitorIR devolve cada instrução quando
+pedida. ler_ast e ler_ir materializam o conteúdo inteiro, para continuar a
+compilação a partir dele.
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+import arvore_sintatica as ast_nodes
+from codigo_intermediario import IntermediateCode, Op
+
+# Versão do formato; muda a cada alteração da codificação ou dos códigos dos nós
+VERSAO_FORMATO = 2
+
+ASSINATURA_AST = b"CAST"
+ASSINATURA_IR = b"CIRB"
+
+# Assinatura, versão, um campo de 16 bits e os tamanhos das seções. O campo de 16
+# bits é reservado na AST; no intermediário, é a largura dos operandos (2 bytes se
+# a tabela tem menos de 65536 textos, 4 se tem mais)
+_CABECALHO_AST = struct.Struct("<4sHH6I")  # textos, bytes dos textos, nós, palavras, listas, raiz
+_CABECALHO_IR = struct.Struct("<4sHH3I")  # textos, bytes dos textos, instruções
+
+# Marcas dos valores dos campos (3 bits baixos)
+_NENHUM, _FALSO, _VERDADEIRO, _NO, _TEXTO, _LISTA = range(6)
+_BITS_MARCA = 3
+_MASCARA_MARCA = (1 << _BITS_MARCA) - 1
+_INDICE_MAXIMO = (1 << (32 - _BITS_MARCA)) - 1
+
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def _palavras(valores, formato="I"):
+    """array de inteiros sem sinal (I: 32 bits, H: 16 bits), na ordem de bytes do arquivo."""
+    result = array(formato, valores)
+    if not _LITTLE_ENDIAN:
+        result.byteswap()
+    return result
+
+
+def _alinhar(dados):
+    return dados + b"\0" * (-len(dados) % 4)
+
+
+class _TabelaTextos:
+    """Textos já vistos e o índice de cada um, na ordem em que apareceram."""
+
+    def __init__(self):
+        self.indices = {}
+
+    def indice(self, texto):
+        result = self.indices.get(texto)
+        if result is None:
+            result = self.indices[texto] = len(self.indices)
+        return result
+
+    def secoes(self):
+        """(quantidade, bytes dos textos, seções gravadas: inícios e bytes alinhados)."""
+        inicios = [0]
+        dados = bytearray()
+        for texto in self.indices:
+            dados += texto.encode("utf-8")
+            inicios.append(len(dados))
+        return len(self.indices), len(dados), [_palavras(inicios).tobytes(), _alinhar(bytes(dados))]
+
+
+def _marcar(marca, indice):
+    if indice > _INDICE_MAXIMO:
+        raise ValueError("AST grande demais para o formato serializado.")
+    return (indice << _BITS_MARCA) | marca
+
+
+def gravar_ast(ast, caminho):
+    """Grava a AST (a lista de comandos do programa) no formato binário."""
+    textos = _TabelaTextos()
+    indices = {}  # id(nó) -> índice do nó
+    inicios = []
+    palavras = []
+    listas = []
+
+    def valor(campo, item, no):
+        if item is None:
+            return _NENHUM
+        if item is True:
+            return _VERDADEIRO
+        if item is False:
+            return _FALSO
+        if isinstance(item, str):
+            return _marcar(_TEXTO, textos.indice(item))
+        if isinstance(item, ast_nodes.Node):
+            return _marcar(_NO, indices[id(item)])
+        if type(item) is list:
+            inicio = len(listas)
+            listas.append(len(item))
+            for elemento in item:
+                if not isinstance(elemento, ast_nodes.Node):
+                    raise ValueError(f"Elemento não serializável na lista {campo} de "
+                                     f"{ast_nodes.KIND_NAMES.get(no.kind)}: {elemento!r}")
+                listas.append(indices[id(elemento)])
+            return _marcar(_LISTA, inicio)
+        raise ValueError(f"Valor não serializável no campo {campo} de "
+                         f"{ast_nodes.KIND_NAMES.get(no.kind)}: {item!r}")
+
+    # Pós-ordem sem recursão: o nó volta à pilha marcado e é gravado depois dos filhos
+    pending = [(no, False) for no in reversed(ast)]
+    while pending:
+        no, filhos_gravados = pending.pop()
+        if not filhos_gravados:
+            pending.append((no, True))
+            pending.extend((filho, False) for filho in reversed(ast_nodes.children(no)))
+            continue
+        indices[id(no)] = len(inicios)
+        inicios.append(len(palavras))
+        palavras.append(no.kind)
+        palavras.append(no.lineno)
+        palavras.extend(valor(campo, getattr(no, campo), no) for campo in no.fields)
+    raiz = _marcar(_LISTA, len(listas))
+    listas.append(len(ast))
+    listas.extend(indices[id(no)] for no in ast)
+
+    n_textos, tamanho_textos, secoes_textos = textos.secoes()
+    with open(caminho, "wb") as f:
+        f.write(_CABECALHO_AST.pack(ASSINATURA_AST, VERSAO_FORMATO, 0, n_textos, tamanho_textos,
+                                    len(inicios), len(palavras), len(listas), raiz))
+        for secao in secoes_textos:
+            f.write(secao)
+        f.write(_palavras(inicios).tobytes())
+        f.write(_palavras(palavras).tobytes())
+        f.write(_palavras(listas).tobytes())
+
+
+def gravar_ir(codigo, caminho):
+    """Grava o código intermediário (IntermediateCode) no formato binário."""
+    textos = _TabelaTextos()
+    indice = textos.indice
+    operandos = [0 if operando is None else indice(operando) + 1 for operando in codigo.operands]
+    n_textos, tamanho_textos, secoes_textos = textos.secoes()
+    largura = 2 if n_textos < 0xFFFF else 4
+    with open(caminho, "wb") as f:
+        f.write(_CABECALHO_IR.pack(ASSINATURA_IR, VERSAO_FORMATO, largura, n_textos, tamanho_textos,
+                                   len(codigo)))
+        for secao in secoes_textos:
+            f.write(secao)
+        f.write(_alinhar(bytes(codigo.ops)))
+        f.write(_alinhar(_palavras(operandos, "H" if largura == 2 else "I").tobytes()))
+
+
+class _ArquivoMapeado:
+    """Arquivo serializado mapeado em memória, com as seções como vetores de inteiros."""
+
+    def __init__(self, caminho, cabecalho, assinatura, descricao):
+        self.caminho = os.fspath(caminho)
+        self._views = []
+        with open(self.caminho, "rb") as f:
+            if os.fstat(f.fileno()).st_size < cabecalho.size:
+                raise ValueError(f"{self.caminho}: não é {descricao}.")
+            self._mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        campos = cabecalho.unpack_from(self._mapa)
+        if campos[0] != assinatura:
+            self.close()
+            raise ValueError(f"{self.caminho}: não é {descricao}.")
+        if campos[1] != VERSAO_FORMATO:
+            self.close()
+            raise ValueError(f"{self.caminho}: versão {campos[1]} do formato "
+                             f"(esta versão do compilador lê a {VERSAO_FORMATO}).")
+        self.largura = campos[2]
+        self.tamanhos = campos[3:]
+        self._posicao = cabecalho.size
+        self._textos = {}
+
+    def _secao(self, quantidade, formato="I"):
+        """Próxima seção do arquivo: quantidade inteiros sem sinal (I ou H)."""
+        inicio = self._posicao
+        fim = inicio + array(formato).itemsize * quantidade
+        if fim > len(self._mapa):
+            self.close()
+            raise ValueError(f"{self.caminho}: arquivo truncado.")
+        self._posicao = fim + (-fim % 4)
+        if not _LITTLE_ENDIAN:
+            return _palavras(array(formato, self._mapa[inicio:fim]), formato)  # Cópia com os bytes invertidos
+        view = memoryview(self._mapa)[inicio:fim].cast(formato)
+        self._views.append(view)
+        return view
+
+    def _ler_textos(self, quantidade, tamanho):
+        self._inicios_textos = self._secao(quantidade + 1)
+        self._base_textos = self._posicao
+        self._posicao += tamanho + (-tamanho % 4)
+
+    def texto(self, indice):
+        """Texto da tabela, decodificado na primeira vez que é pedido."""
+        result = self._textos.get(indice)
+        if result is None:
+            inicios = self._inicios_textos
+            base = self._base_textos
+            result = self._mapa[base + inicios[indice]:base + inicios[indice + 1]].decode("utf-8")
+            self._textos[indice] = result
+        return result
+
+    def close(self):
+        for view in self._views:
+            view.release()
+        self._views = []
+        self._mapa.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class NoMapeado(ast_nodes.Node):
+    """Nó preguiçoso de um LeitorAST: os campos são lidos do arquivo a cada acesso.
+
+    Tem kind, lineno e fields como os nós de arvore_sintatica, então walk,
+    children e format_tree funcionam sobre ele; não tem symbol (é só leitura)."""
+    __slots__ = ("_leitor", "_indice", "kind")
+
+    def __init__(self, leitor, indice):
+        self._leitor = leitor
+        self._indice = indice
+        self.kind, self.lineno = leitor.cabecalho_no(indice)
+
+    @property
+    def fields(self):
+        return ast_nodes.NODE_CLASSES[self.kind].fields
+
+    def __getattr__(self, name):
+        fields = ast_nodes.NODE_CLASSES[self.kind].fields
+        if name not in fields:
+            raise AttributeError(name)
+        return self._leitor.campo(self._indice, fields.index(name))
+
+
+class LeitorAST(_ArquivoMapeado):
+    """AST serializada, lida sob demanda de um arquivo mapeado."""
+
+    def __init__(self, caminho):
+        super().__init__(caminho, _CABECALHO_AST, ASSINATURA_AST, "uma AST serializada")
+        n_textos, tamanho_textos, n_nos, n_palavras, n_listas, self._raiz = self.tamanhos
+        self._ler_textos(n_textos, tamanho_textos)
+        self._inicios = self._secao(n_nos)
+        self._palavras = self._secao(n_palavras)
+        self._listas = self._secao(n_listas)
+
+    def __len__(self):
+        """Quantidade de nós da árvore."""
+        return len(self._inicios)
+
+    def cabecalho_no(self, indice):
+        """(kind, linha) do nó."""
+        inicio = self._inicios[indice]
+        return self._palavras[inicio], self._palavras[inicio + 1]
+
+    def no(self, indice):
+        return NoMapeado(self, indice)
+
+    def raiz(self):
+        """Comandos do programa, como nós preguiçosos."""
+        return self._valor(self._raiz, self.no)
+
+    def campo(self, indice, posicao):
+        """Valor do campo na posição dada (de fields) do nó; nós vêm preguiçosos."""
+        return self._valor(self._palavras[self._inicios[indice] + 2 + posicao], self.no)
+
+    def _valor(self, palavra, construir):
+        marca, indice = palavra & _MASCARA_MARCA, palavra >> _BITS_MARCA
+        if marca == _NENHUM:
+            return None
+        if marca == _FALSO:
+            return False
+        if marca == _VERDADEIRO:
+            return True
+        if marca == _TEXTO:
+            return self.texto(indice)
+        if marca == _NO:
+            return construir(indice)
+        if marca == _LISTA:
+            listas = self._listas
+            return [construir(i) for i in listas[indice + 1:indice + 1 + listas[indice]]]
+        raise ValueError(f"{self.caminho}: valor inválido no arquivo ({palavra:#x}).")
+
+    def materializar(self):
+        """A AST inteira, com os nós de arvore_sintatica (sem recursão).
+
+        Como os filhos vêm antes do pai no arquivo, uma passada na ordem dos nós
+        constrói cada um com os filhos já prontos."""
+        nos = []
+        construir = nos.__getitem__
+        palavras, valor = self._palavras, self._valor
+        inicio_seguinte = list(self._inicios[1:]) + [len(palavras)]
+        for inicio, fim in zip(self._inicios, inicio_seguinte):
+            cls = ast_nodes.NODE_CLASSES[palavras[inicio]]
+            valores = [valor(palavra, construir) for palavra in palavras[inicio + 2:fim]]
+            nos.append(cls(*valores, lineno=palavras[inicio + 1]))
+        return self._valor(self._raiz, construir)
+
+
+class LeitorIR(_ArquivoMapeado):
+    """Código intermediário serializado; cada instrução é decodificada quando pedida."""
+
+    def __init__(self, caminho):
+        super().__init__(caminho, _CABECALHO_IR, ASSINATURA_IR, "um código intermediário serializado")
+        n_textos, tamanho_textos, n_instrucoes = self.tamanhos
+        self._ler_textos(n_textos, tamanho_textos)
+        if self.largura not in (2, 4):
+            self.close()
+            raise ValueError(f"{self.caminho}: largura inválida dos operandos ({self.largura}).")
+        self._ops = self._secao(n_instrucoes, "B")
+        self._operandos = self._secao(3 * n_instrucoes, "H" if self.largura == 2 else "I")
+        if n_instrucoes and max(self._ops) >= len(Op):
+            self.close()
+            raise ValueError(f"{self.caminho}: código de operação inválido.")
+
+    def __len__(self):
+        return len(self._ops)
+
+    def _operando(self, palavra):
+        return None if palavra == 0 else self.texto(palavra - 1)
+
+    def __getitem__(self, indice):
+        """(op, a, b, c) da instrução."""
+        if not -len(self) <= indice < len(self):
+            raise IndexError(indice)
+        indice %= len(self)
+        operando = self._operando
+        return (Op(self._ops[indice]),) + tuple(
+            operando(palavra) for palavra in self._operandos[3 * indice:3 * indice + 3])
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def materializar(self):
+        """O intermediário inteiro, como um IntermediateCode."""
+        codigo = IntermediateCode()
+        codigo.ops = bytearray(self._ops)
+        operando = self._operando
+        codigo.operands = [operando(palavra) for palavra in self._operandos]
+        return codigo
+
+
+def ler_ast(caminho):
+    """Lê a AST gravada por gravar_ast, com todos os nós materializados."""
+    with LeitorAST(caminho) as leitor:
+        return leitor.materializar()
+
+
+def ler_ir(caminho):
+    """Lê o código intermediário gravado por gravar_ir, como um IntermediateCode."""
+    with LeitorIR(caminho) as leitor:
+        return leitor.materializar()
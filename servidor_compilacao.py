@@ -0,0 +1,163 @@
+"""Servidor de compilação: mantém o compilador carregado e atende pedidos por um socket Unix.
+
+Cada execução do main.py paga a inicialização do interpretador, a importação dos
+módulos e a carga das tabelas do parser. O servidor faz isso uma única vez: os
+pedidos chegam pelo socket (protocolo em protocolo_compilacao.py), são aceitos
+com asyncio e as compilações, que usam CPU, rodam em um conjunto de processos já
+aquecidos. O cliente_compilacao.py tem a mesma linha de comando do main.py.
+
+    python servidor_compilacao.py [--socket CAMINHO] [-j PROCESSOS]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import analisador_sintatico as sin
+import main as principal
+import protocolo_compilacao as protocolo
+import rastreamento
+from cache_incremental import CacheIncremental
+from compilador import Compiler
+from estatisticas import Estatisticas
+
+_log = rastreamento.canal("compilador")
+
+
+def _iniciar_trabalhador():
+    """Carrega o parser antes do primeiro pedido e ignora Ctrl+C (quem encerra é o servidor)."""
+    sin.get_parser()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def compilar_pedido(pedido):
+    """Executa um pedido de compilação (em um processo do conjunto) e monta a resposta."""
+    inicio = time.perf_counter()
+    caminho = pedido.get("path")
+    stats = Estatisticas(caminho) if pedido.get("stats") else None
+    cache = CacheIncremental(pedido["cache"]) if pedido.get("cache") else None
+    resposta = {"id": pedido.get("id"), "ok": True, "erro": None, "errors": [],
+                "intermediate_code": None, "mips_code": None, "stats": None, "stats_relatorio": None}
+    rastreamento.configurar(pedido.get("nivel", rastreamento.ERRO))
+    saida = io.StringIO()
+    try:
+        # Tudo o que a compilação escreveria no terminal volta para o cliente
+        with contextlib.redirect_stdout(saida):
+            if caminho is not None:
+                result = principal.compilar(caminho, stats, cache)
+            else:
+                result = Compiler(stats, cache).compile(pedido["source"])
+        resposta["errors"] = list(result.errors)
+        resposta["intermediate_code"] = str(result.intermediate_code)
+        resposta["mips_code"] = result.mips_code
+    except Exception as e:
+        resposta["ok"] = False
+        resposta["erro"] = f"{type(e).__name__}: {e}"
+    if stats is not None:
+        resposta["stats"] = stats.as_dict()
+        resposta["stats_relatorio"] = stats.report()
+    if cache is not None:
+        resposta["cache_hits"], resposta["cache_misses"] = cache.hits, cache.misses
+    resposta["saida"] = saida.getvalue()
+    resposta["tempo"] = time.perf_counter() - inicio
+    return resposta
+
+
+class ServidorCompilacao:
+    """Aceita conexões no socket e distribui as compilações entre os processos."""
+
+    def __init__(self, caminho, jobs=None):
+        self.caminho = caminho
+        self.jobs = jobs or os.cpu_count() or 1
+        self.executor = None
+        self.encerrar = None  # asyncio.Event criado dentro do laço de eventos
+
+    async def _ler(self, reader):
+        cabecalho = await reader.readexactly(protocolo.TAMANHO_CABECALHO)
+        dados = await reader.readexactly(protocolo.decodificar_tamanho(cabecalho))
+        return protocolo.decodificar(dados)
+
+    async def _responder(self, pedido, writer, trava):
+        op = pedido.get("op", "compilar")
+        if op == "compilar":
+            loop = asyncio.get_running_loop()
+            resposta = await loop.run_in_executor(self.executor, compilar_pedido, pedido)
+        elif op == "ping":
+            resposta = {"id": pedido.get("id"), "ok": True, "processos": self.jobs}
+        elif op == "encerrar":
+            resposta = {"id": pedido.get("id"), "ok": True}
+            self.encerrar.set()
+        else:
+            resposta = {"id": pedido.get("id"), "ok": False, "erro": f"Operação desconhecida: {op}"}
+        async with trava:
+            writer.write(protocolo.codificar(resposta))
+            await writer.drain()
+
+    async def atender(self, reader, writer):
+        """Atende uma conexão; os pedidos dela são compilados em paralelo e cada
+        resposta leva o id do pedido, na ordem em que ficar pronta."""
+        trava = asyncio.Lock()
+        tarefas = set()
+        try:
+            while True:
+                try:
+                    pedido = await self._ler(reader)
+                except asyncio.IncompleteReadError:
+                    break  # Cliente fechou a conexão
+                tarefa = asyncio.create_task(self._responder(pedido, writer, trava))
+                tarefas.add(tarefa)
+                tarefa.add_done_callback(tarefas.discard)
+            if tarefas:
+                await asyncio.gather(*tarefas)
+        except (ValueError, ConnectionError) as e:
+            _log.erro("Conexão encerrada: %s", e)
+        except asyncio.CancelledError:
+            pass  # Servidor encerrando com a conexão aberta
+        finally:
+            writer.close()
+
+    async def executar(self):
+        self.encerrar = asyncio.Event()
+        # Um socket que sobrou de uma execução anterior impede o bind
+        if os.path.exists(self.caminho):
+            os.unlink(self.caminho)
+        self.executor = ProcessPoolExecutor(max_workers=self.jobs, initializer=_iniciar_trabalhador)
+        # Cria os processos agora, para que o primeiro pedido já os encontre prontos
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, os.getpid) for _ in range(self.jobs)))
+        for sinal in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sinal, self.encerrar.set)
+        server = await asyncio.start_unix_server(self.atender, path=self.caminho)
+        if _log.info:
+            _log.write("Servidor de compilação em %s (%d processos).", self.caminho, self.jobs)
+        try:
+            async with server:
+                await self.encerrar.wait()
+        finally:
+            self.executor.shutdown(cancel_futures=True)
+            if os.path.exists(self.caminho):
+                os.unlink(self.caminho)
+            if _log.info:
+                _log.write("Servidor encerrado.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor de compilação (socket Unix).")
+    parser.add_argument("--socket", default=protocolo.socket_padrao(),
+                        help="caminho do socket (padrão: %(default)s)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="número de processos de compilação (padrão: número de CPUs)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="mostra apenas erros")
+    args = parser.parse_args(argv)
+    rastreamento.configurar(rastreamento.ERRO if args.quiet else rastreamento.INFO, ["compilador"])
+    asyncio.run(ServidorCompilacao(args.socket, args.jobs).executar())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
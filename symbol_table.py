@@ -1,29 +1,87 @@
+import sys
+
+
+class Scope:
+    """Nó da árvore de escopos; continua disponível depois que o escopo é encerrado."""
+    __slots__ = ("id", "parent", "children", "symbols")
+
+    def __init__(self, scope_id, parent=None):
+        self.id = scope_id
+        self.parent = parent  # Scope que contém este, ou None para o global
+        self.children = []
+        # Símbolos declarados no escopo, na ordem de declaração. É também o registro
+        # do que desfazer no exit_scope: cada nome tem uma ligação empilhada aqui.
+        self.symbols = {}
+
+
 class SymbolTable:
+    """Tabela de símbolos com escopos aninhados.
+
+    Cada nome aponta para a pilha das suas ligações visíveis (a do escopo mais
+    interno no topo), então get_symbol e add_symbol não dependem da profundidade
+    do aninhamento, e exit_scope desfaz só as ligações do escopo que termina. Os
+    escopos formam uma árvore que é mantida depois da análise: get_scope(id)
+    devolve qualquer um deles, com os símbolos que declarou."""
+
     def __init__(self, raw_table=None, filename=None):
         # Inicializa a tabela de símbolos vazia se não for fornecida
         self.raw_table = raw_table if raw_table is not None else {}
         self.filename = filename
-        self.current_scope = [{}]  # Escopos empilhados para o controle de blocos
+        self.bindings = {}  # Nome -> pilha de (escopo, atributos) visíveis
+        self.global_scope = Scope(0)
+        self.scopes = [self.global_scope]  # Todos os escopos, indexados pelo identificador
+        self.current = self.global_scope
 
     def add_symbol(self, name, attributes):
-        """Adiciona um símbolo na tabela."""
-        if name in self.current_scope[-1]:
+        """Adiciona um símbolo no escopo atual."""
+        name = sys.intern(name)
+        stack = self.bindings.get(name)
+        if stack is None:
+            self.bindings[name] = [(self.current, attributes)]
+        elif stack and stack[-1][0] is self.current:
             raise RuntimeError(f"Erro: '{name}' já declarado no escopo atual.")
-        self.current_scope[-1][name] = attributes
+        else:
+            stack.append((self.current, attributes))
+        self.current.symbols[name] = attributes
+
+    def lookup(self, name):
+        """Busca um símbolo na tabela, respeitando os escopos; None se não existir."""
+        stack = self.bindings.get(name)
+        return stack[-1][1] if stack else None
 
     def get_symbol(self, name):
         """Busca um símbolo na tabela, respeitando os escopos."""
-        for scope in reversed(self.current_scope):
-            if name in scope:
-                return scope[name]
-        raise RuntimeError(f"Erro: '{name}' não declarado.")
+        stack = self.bindings.get(name)
+        if not stack:
+            raise RuntimeError(f"Erro: '{name}' não declarado.")
+        return stack[-1][1]
 
     def enter_scope(self):
-        """Entra em um novo escopo."""
-        self.current_scope.append({})
+        """Entra em um novo escopo, filho do atual."""
+        scope = Scope(len(self.scopes), self.current)
+        self.current.children.append(scope)
+        self.scopes.append(scope)
+        self.current = scope
+        return scope.id
 
     def exit_scope(self):
-        """Sai do escopo atual."""
-        if len(self.current_scope) == 1:
+        """Sai do escopo atual, desfazendo as ligações dos nomes declarados nele."""
+        scope = self.current
+        if scope.parent is None:
             raise RuntimeError("Erro: Tentativa de sair do escopo global.")
-        self.current_scope.pop()
+        bindings = self.bindings
+        for name in scope.symbols:
+            bindings[name].pop()
+        self.current = scope.parent
+
+    @property
+    def current_scope_id(self):
+        return self.current.id
+
+    def get_scope(self, scope_id):
+        """Escopo com o identificador dado (0 é o global), aberto ou já encerrado."""
+        return self.scopes[scope_id]
+
+    def symbol_counts(self):
+        """Quantidade de símbolos por escopo (abertos e encerrados), por identificador."""
+        return {scope.id: len(scope.symbols) for scope in self.scopes}
@@ -0,0 +1,50 @@
+import codigo_intermediario as ir
+import ParaMips as pmips
+from compilador import Compiler
+
+
+def mips(codigo):
+    compiler = Compiler()
+    ast = compiler.parse(compiler.lex(codigo))
+    compiler.analyze(ast)
+    return compiler.to_mips(compiler.generate_intermediate(ast)).split("\n")
+
+
+def executar(linhas, a):
+    """Executa as instruções de deslocamento e soma com $t1 = a e devolve $t0 (32 bits)."""
+    regs = {"$t1": a & 0xFFFFFFFF, "$zero": 0}
+    for linha in linhas:
+        nome, args = linha.split(" ", 1)
+        dest, *fontes = args.split(", ")
+        x = regs[fontes[0]]
+        y = int(fontes[1]) if fontes[1].lstrip("-").isdigit() else regs[fontes[1]]
+        com_sinal = x - (1 << 32) if x & 0x80000000 else x
+        regs[dest] = {"sll": lambda: x << y, "srl": lambda: x >> y, "sra": lambda: com_sinal >> y,
+                      "add": lambda: x + y, "addi": lambda: x + y, "sub": lambda: x - y,
+                      "andi": lambda: x & y}[nome]() & 0xFFFFFFFF
+    resultado = regs["$t0"]
+    return resultado - (1 << 32) if resultado & 0x80000000 else resultado
+
+
+def test_multiplicacao_divisao_e_resto_nativos():
+    linhas = mips("int f(int a, int b) { return a * b + a / b + a % b; }")
+    instrucoes = [linha.split(" ")[0] for linha in linhas]
+    assert instrucoes.count("mult") == 1 and instrucoes.count("div") == 2
+    assert instrucoes.count("mflo") == 2 and instrucoes.count("mfhi") == 1
+    # Nada de laços de somas ou subtrações repetidas
+    assert not any(linha.endswith(":") for linha in linhas[1:])
+
+
+def test_potencias_de_dois_viram_deslocamentos():
+    for op, divisor, esperado in ((ir.MUL, 8, lambda a: a * 8),
+                                  (ir.DIV, 4, lambda a: int(a / 4)),
+                                  (ir.MOD, 4, lambda a: a - 4 * int(a / 4))):
+        codigo = ir.IntermediateCode()
+        codigo.emit(ir.FUNCTION, "f", "int a", "int")
+        codigo.emit(op, "%t1", "a", str(divisor))
+        codigo.emit(ir.END_FUNCTION, "f")
+        linhas = pmips.MipsConverter().process_intermediate_to_mips(codigo).split("\n")[1:]
+        assert not any(linha.split(" ")[0] in ("mult", "div") for linha in linhas)
+        # Com sinal, como no C: a divisão trunca em direção ao zero
+        for a in range(-20, 21):
+            assert executar(linhas, a) == esperado(a), (op, a)
@@ -0,0 +1,36 @@
+import analisador_lexico as lex
+
+
+def test_listagem_de_arquivo_percorre_o_arquivo_sob_demanda(tmp_path, capsys, monkeypatch):
+    fonte = tmp_path / "prog.c"
+    fonte.write_text("int main() {\n    return 0;\n}\n", encoding="utf-8")
+    varreduras = []
+    scan = lex._scan
+    monkeypatch.setattr(lex, "_scan", lambda *args: varreduras.append(args[0]) or scan(*args))
+
+    tokens = lex.process_code(fonte, 1)
+    assert isinstance(tokens, lex.TokenStream)
+    assert "Token: ID, Valor: main, Linha: 1" in capsys.readouterr().out
+    # O parser percorre o arquivo de novo; nenhuma das varreduras usa o texto inteiro
+    token = tokens.token_function()
+    tipos = []
+    while (tok := token()) is not None:
+        tipos.append(tok.type)
+    assert tipos[:3] == ["TYPE", "ID", "LPAREN"]
+    assert len(tokens) == len(tipos)
+    assert len(varreduras) == 3
+    assert not any(isinstance(dados, str) for dados in varreduras)
+
+
+def test_lexpos_em_bytes_no_arquivo(tmp_path):
+    fonte = tmp_path / "prog.c"
+    fonte.write_text("// ação\nint x;\n", encoding="utf-8")
+    posicoes = [tok.lexpos for tok in lex.TokenStream(fonte).tokens()]
+    buffer = lex.tokenize(fonte.read_text(encoding="utf-8"))
+    assert posicoes[1] == buffer.starts[1] + 2  # ç e ã ocupam dois bytes
+
+
+def test_arquivo_sem_listagem_continua_sob_demanda(tmp_path):
+    fonte = tmp_path / "prog.c"
+    fonte.write_text("int x;\n", encoding="utf-8")
+    assert isinstance(lex.process_code(fonte, 0), lex.TokenStream)
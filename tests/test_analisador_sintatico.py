@@ -0,0 +1,27 @@
+import io
+
+import pytest
+
+import analisador_lexico as lex
+import analisador_sintatico as sin
+import rastreamento
+
+
+@pytest.fixture
+def diagnosticos(monkeypatch):
+    """Mensagens do rastreamento escritas durante o teste."""
+    saida = io.StringIO()
+    monkeypatch.setattr(rastreamento, "saida", saida)
+    return saida
+
+
+def test_erro_de_sintaxe_chega_ao_p_error(diagnosticos):
+    codigo = "int f(int a) {\n    return (a == a) + 1;\n}\n"
+    ast = sin.parse_code(lex.tokenize(codigo), 0)
+    assert ast is None
+    assert "Erro de sintaxe na linha 2: ==" in diagnosticos.getvalue()
+
+
+def test_erro_de_sintaxe_no_final(diagnosticos):
+    sin.parse_code(lex.tokenize("int f(int a) {"), 0)
+    assert "Erro de sintaxe: final inesperado." in diagnosticos.getvalue()
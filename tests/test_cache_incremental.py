@@ -0,0 +1,19 @@
+from compilador import Compiler
+from cache_incremental import CacheIncremental
+
+
+def mips(codigo, cache=None):
+    compiler = Compiler(cache=cache)
+    ast = compiler.parse(compiler.lex(codigo))
+    compiler.analyze(ast)
+    return compiler.to_mips(compiler.generate_intermediate(ast))
+
+
+def test_global_depois_da_funcao_muda_a_chave(tmp_path):
+    funcao = "int f() { int x = 1; x = x + 2; return x; }\n"
+    antes = "int x = 4;\n" + funcao
+    depois = funcao + "int x = 4;\n"
+    cache = CacheIncremental(str(tmp_path))
+    assert mips(antes, cache) == mips(antes)
+    assert mips(depois, cache) == mips(depois)
+    assert cache.hits == 0
@@ -0,0 +1,29 @@
+import codigo_intermediario as ir
+from compilador import Compiler
+
+
+def test_instrucoes_em_vetores_e_texto_sob_demanda():
+    codigo = ir.IntermediateCode()
+    codigo.emit(ir.LABEL, "L1")
+    codigo.emit(ir.ADD, "%t1", "a", "1")
+    codigo.emit(ir.IF_FALSE, "%t1", "L2")
+    codigo.emit(ir.GOTO, "L1")
+    assert len(codigo) == 4 and codigo.count_instructions() == 3
+    assert bytes(codigo.ops) == bytes((ir.LABEL, ir.ADD, ir.IF_FALSE, ir.GOTO))
+    assert codigo[1] == (ir.Op.ADD, "%t1", "a", "1") and codigo[-1][0] is ir.Op.GOTO
+    assert codigo.lines() == ["L1:", "%t1 = a + 1", "if_false %t1 goto L2", "goto L1"]
+    # Só os operandos de rótulo mudam ao renumerar
+    assert codigo.relabeled(4).lines() == ["L5:", "%t1 = a + 1", "if_false %t1 goto L6", "goto L5"]
+    assert codigo.slice(1, 3).lines() == ["%t1 = a + 1", "if_false %t1 goto L2"]
+
+
+def test_conversao_despacha_pela_operacao_e_nao_pelo_texto():
+    # Nomes que contêm "load", "if_false" ou ":" não mudam o tipo da instrução
+    compiler = Compiler()
+    ast = compiler.parse(compiler.lex("int f(int loaded, int if_false) { int x = loaded + if_false; return x; }"))
+    compiler.analyze(ast)
+    codigo = compiler.generate_intermediate(ast)
+    assert list(codigo.ops) == [ir.FUNCTION, ir.DECLARE, ir.ADD, ir.COPY, ir.RETURN, ir.END_FUNCTION]
+    mips = compiler.to_mips(codigo).split("\n")
+    assert not any(linha.startswith(("lw", "sw", "beq", "j ")) for linha in mips)
+    assert any(linha.startswith("add ") for linha in mips)
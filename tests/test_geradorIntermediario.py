@@ -0,0 +1,28 @@
+import analisador_lexico as lex
+import analisador_semantico as sem
+import analisador_sintatico as sin
+import geradorIntermediario as gi
+
+
+def intermediario(codigo):
+    """Linhas do intermediário (sem otimização) do programa."""
+    ast = sin.parse_code(lex.tokenize(codigo), 0)
+    sem.SemanticAnalyzer().analyze(ast)
+    return gi.IntermediateCodeGenerator().process_node(ast).lines()
+
+
+def test_laco_com_condicao_falsa_na_entrada_sai():
+    linhas = intermediario("int f() { int z = 5; int k = 0; while (z < 3) { k = k + 1; } return k; }")
+    assert not any(linha.endswith(":") for linha in linhas)
+    assert "return 0" in linhas
+    # O corpo altera z, mas nunca executa
+    linhas = intermediario("int f() { int z = 5; while (z < 3) { z = z + 1; } return z; }")
+    assert "return 5" in linhas
+    linhas = intermediario("int f() { int z = 5; int i; for (i = 0; z < 3; i++) { z = z + i; } return i; }")
+    assert "return 0" in linhas
+
+
+def test_laco_que_executa_esquece_os_valores():
+    linhas = intermediario("int f() { int z = 5; while (z < 9) { z = z + 1; } return z; }")
+    assert linhas[linhas.index("L1:") + 1] == "%t1 = z < 9"
+    assert "return z" in linhas
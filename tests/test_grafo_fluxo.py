@@ -0,0 +1,40 @@
+import analisador_lexico as lex
+import analisador_semantico as sem
+import analisador_sintatico as sin
+import geradorIntermediario as gi
+import grafo_fluxo
+
+
+def grafo(codigo):
+    """Grafo de fluxo da primeira função do programa (intermediário sem otimização)."""
+    ast = sin.parse_code(lex.tokenize(codigo), 0)
+    sem.SemanticAnalyzer().analyze(ast)
+    return grafo_fluxo.function_graphs(gi.IntermediateCodeGenerator().process_node(ast))[0]
+
+
+def test_dominadores_e_lacos_aninhados():
+    g = grafo("int f(int n) { int s = 0; int i; for (i = 0; i < n; i++) {"
+              " int j = 0; while (j < i) { s = s + j; j++; } }"
+              " if (s > 10) { s = 1; } else { s = 2; } return s; s = 3; }")
+    externo, interno = g.loops
+    assert interno.parent is externo and interno.depth == 2
+    assert externo.header is g.block_at("L1") and interno.header is g.block_at("L3")
+    assert set(interno.blocks) < set(externo.blocks)
+    assert g.dominates(externo.header, interno.header)
+    assert not g.dominates(interno.header, externo.header)
+    # O if/else depois do laço: os dois ramos e a junção são dominados pela condição
+    condicao = g.block_at("L2")
+    assert condicao.loop is None and condicao.idom is externo.header
+    assert g.block_at("L5").idom is condicao and g.block_at("L6").idom is condicao
+    assert all(g.dominates(g.entry, bloco) for bloco in g.reverse_postorder())
+    # O código depois do return não é alcançável
+    ultimo = g.blocks[-1]
+    assert not ultimo.reachable and ultimo.idom is None and not ultimo.predecessors
+
+
+def test_laco_do_while():
+    g = grafo("int f(int n) { int s = 0; do { s = s + n; n--; } while (n > 0); return s; }")
+    (laco,) = g.loops
+    assert laco.header is g.block_at("L1")
+    assert laco.header in laco.blocks[-1].successors
+    assert g.block_at("L2").loop is None
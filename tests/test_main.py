@@ -0,0 +1,16 @@
+import io
+
+import main
+import rastreamento
+
+
+def test_erro_semantico_conta_como_falha(tmp_path, monkeypatch):
+    monkeypatch.setattr(rastreamento, "saida", io.StringIO())
+    certo = tmp_path / "certo.c"
+    certo.write_text("int f(int a) { return a; }\n")
+    errado = tmp_path / "errado.c"
+    errado.write_text("int f(int a) { return b; }\n")
+    assert main._compilar_no_lote(str(certo))[1] is None
+    assert "b" in main._compilar_no_lote(str(errado))[1]
+    assert main.main(["-q", str(certo)]) == 0
+    assert main.main(["-q", str(errado)]) == 1
@@ -0,0 +1,93 @@
+import analisador_lexico as lex
+import analisador_semantico as sem
+import analisador_sintatico as sin
+import geradorIntermediario as gi
+import otimizacao
+
+
+def otimizado(codigo, counts=None):
+    """Linhas do intermediário otimizado do programa; os contadores vão para counts."""
+    ast = sin.parse_code(lex.tokenize(codigo), 0)
+    sem.SemanticAnalyzer().analyze(ast)
+    intermediario = gi.IntermediateCodeGenerator().process_node(ast)
+    counts = otimizacao.new_counts() if counts is None else counts
+    return otimizacao.optimize(intermediario, counts).lines()
+
+
+def test_base_de_endereco_de_vetor_fica_viva():
+    linhas = otimizado(
+        "int g(int *r) { return r[0]; }\n"
+        "int f(int *p, int *q, int i) { p = q; return g(&p[i]); }\n")
+    assert "p = q" in linhas
+
+
+def test_tamanho_de_vetor_fica_vivo():
+    linhas = otimizado("int f(int a) { int n = a + 1; int v[n]; v[0] = a; return v[0]; }")
+    assert "n = %t1" in linhas
+
+
+def test_leitura_de_vetor_depois_de_trocar_a_base():
+    linhas = otimizado("int f(int *p, int *q, int i) { int a = p[i]; p = q; int b = p[i]; return a + b; }")
+    assert "p = q" in linhas
+    assert linhas.count("%t2 = p[i]") == 1
+
+
+def definida_antes(linhas, copia):
+    """Se o temporário copiado na linha copia (x = tN) é calculado antes dela."""
+    posicao = linhas.index(next(linha for linha in linhas if linha.startswith(copia + " = ")))
+    temporario = linhas[posicao].split(" = ")[1]
+    return any(linha.startswith(temporario + " = ") for linha in linhas[:posicao])
+
+
+def test_laco_no_inicio_da_funcao_nao_herda_valores_do_fim():
+    corpo = "int a = y * 3; if (a < x) { x = x + 1; } int b = y * 3; x = x + b;"
+    linhas = otimizado("int f(int x, int y) { while (x < 100) { " + corpo + " } return x; }")
+    assert definida_antes(linhas, "a")
+    linhas = otimizado("int f(int x, int y) { do { " + corpo + " } while (x < 100); return x; }")
+    assert definida_antes(linhas, "a")
+
+
+def test_escrita_em_global_invalida_leituras_da_memoria():
+    linhas = otimizado("int g; int f(int *p) { int a = *p; g = 7; int b = *p; return a + b; }")
+    assert "b = %t1" not in linhas
+    assert linhas.count("load p %t2") == 1
+
+
+def test_variavel_chamada_t1_nao_e_temporario():
+    linhas = otimizado("int t1; int f(int x) { t1 = x + 1; return 0; }")
+    assert "t1 = %t1" in linhas
+    linhas = otimizado("int f(int x) { int t1 = x * 2; int a = x + 1; return t1 + a; }")
+    assert "t1 = %t1" in linhas
+    assert "%t3 = t1 + a" in linhas
+
+
+def test_codigo_morto_e_blocos_inalcancaveis_saem():
+    counts = otimizacao.new_counts()
+    linhas = otimizado("int g(int a) { return a; }\n"
+                       "int f(int a, int b) { a + b; g(a); int x = a * 3; x = a * 4;"
+                       " if (a > 0) { return x; } else { return 0; } x = 5; return x; }", counts)
+    assert "%t1 = a + b" not in linhas and not any(" = a * 3" in linha for linha in linhas)
+    assert any(linha.endswith(" = call g 1") for linha in linhas)  # A chamada pode ter efeitos
+    # Depois do if/else com return nos dois ramos nada é alcançável
+    assert "x = 5" not in linhas and "L2:" not in linhas and "goto L2" not in linhas
+    assert linhas[-2:] == ["return 0", "end_function f"]
+    assert counts["instructions_removed"] >= 6 and counts["blocks_removed"] >= 1
+
+
+def test_expressoes_repetidas_sao_calculadas_uma_vez():
+    counts = otimizacao.new_counts()
+    linhas = otimizado("int f(int *q, int i, int a, int b) { int x = q[i + 1]; int y = q[i + 1];"
+                       " int c = i + 1; int s = a + b; int t = b + a; return x + y + c + s + t; }", counts)
+    assert sum(linha.endswith(" = i + 1") for linha in linhas) == 1
+    assert sum(linha.endswith(" = q[%t1]") for linha in linhas) == 1
+    assert "y = %t2" in linhas and "c = %t1" in linhas
+    # a + b e b + a são o mesmo valor
+    assert sum(linha.endswith((" = a + b", " = b + a")) for linha in linhas) == 1
+    assert counts["expressions_eliminated"] >= 3
+
+
+def test_escrita_por_ponteiro_invalida_leituras_da_memoria():
+    linhas = otimizado("int f(int *p, int *q, int i) { int a = *q; int x = q[i]; *p = 1;"
+                       " int b = *q; int y = q[i]; return a + b + x + y; }")
+    assert sum(linha.startswith("load q ") for linha in linhas) == 2
+    assert sum(linha.endswith(" = q[i]") for linha in linhas) == 2
@@ -0,0 +1,31 @@
+import arvore_sintatica as ast_nodes
+import serializacao
+from compilador import Compiler
+
+PROGRAMA = """#include <stdio.h>
+int g = 3;
+int v[] = {1, 2};
+int f(int *p, int n) {
+    int s = 0;
+    for (int i = 0; i < n; i++) { s = s + p[i] * g; }
+    if (s > 10) { printf("grande\\n"); } else { s = 0 - s; }
+    return s;
+}
+"""
+
+
+def test_ast_e_intermediario_voltam_iguais(tmp_path):
+    compiler = Compiler()
+    ast = compiler.parse(compiler.lex(PROGRAMA))
+    serializacao.gravar_ast(ast, tmp_path / "prog.ast")
+    lida = serializacao.ler_ast(tmp_path / "prog.ast")
+    assert ast_nodes.format_tree(lida) == ast_nodes.format_tree(ast)
+
+    compiler.analyze(ast)
+    codigo = compiler.generate_intermediate(ast)
+    serializacao.gravar_ir(codigo, tmp_path / "prog.ir")
+    lido = serializacao.ler_ir(tmp_path / "prog.ir")
+    assert lido.ops == codigo.ops and lido.operands == codigo.operands
+    # O leitor preguiçoso devolve cada instrução sem materializar o resto
+    with serializacao.LeitorIR(tmp_path / "prog.ir") as leitor:
+        assert len(leitor) == len(codigo) and leitor[len(codigo) - 2] == codigo[len(codigo) - 2]